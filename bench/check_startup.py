@@ -0,0 +1,131 @@
+# 앱 시작(콜드 스타트) 비용 점검 스크립트
+# 모듈 import 시간을 -X importtime 으로 측정하고, 무거운 라이브러리가 실제로 필요해지기 전까지
+# 불러와지지 않는지 확인합니다. 위반 시 종료 코드 1을 반환합니다.
+#
+# 실행 방법 (저장소 루트에서):
+#   python -m bench.check_startup
+#   python -m bench.check_startup --budget-ms 800 --output startup.json
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "sm_activity_app.py")
+
+# 앱 모듈 import 시점에 불러오면 안 되는 모듈
+IMPORT_TIME_FORBIDDEN = ("pandas", "openpyxl", "gspread", "google.oauth2")
+# 첫 화면 렌더링 시 불러오면 안 되는 모듈 (엑셀 생성/업로드 시에만 필요)
+# pandas 는 st.dataframe 이 내부적으로 사용하므로 데이터 표시 시점에는 불러와짐
+FIRST_RENDER_FORBIDDEN = ("openpyxl",)
+# import 시간을 측정할 앱 모듈 (streamlit 포함)
+APP_MODULES = ("sm_sheets", "sheets_metrics")
+
+# 하위 프로세스에서 실행할 첫 화면 렌더링 코드 (부모 프로세스의 import 상태와 분리하기 위함)
+FIRST_RENDER_SCRIPT = r"""
+import json, sys, time
+from unittest import mock
+sys.path.insert(0, {repo_root!r})
+from bench.fake_gspread import FakeBackend, FakeClient
+from streamlit.testing.v1 import AppTest
+
+client = FakeClient(FakeBackend())
+for title in ("SM Activity Dashboard", "SM Activity Plan"):
+    client.seed_spreadsheet(title, {{
+        "SM Activity": [["NO", "월", "구분", "작업유형", "TASK", "요청일", "작업일",
+                         "요청자", "IT", "CNS", "개발자", "내용", "결과"]],
+        "현업문의": [["NO", "월", "문의방법", "문의유형", "요청부서", "문의사항", "요청일", "답변일",
+                     "요청자", "IT", "CNS", "개발자"]],
+    }}, share_with=["qhv147@gmail.com"])
+
+with mock.patch("gspread.authorize", return_value=client), \
+        mock.patch("google.oauth2.service_account.Credentials.from_service_account_info", return_value=object()):
+    at = AppTest.from_file({app_path!r}, default_timeout=120)
+    at.secrets["gcp_service_account"] = {{"type": "service_account"}}
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+
+print(json.dumps({{
+    "first_render_s": round(elapsed, 4),
+    "loaded_heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+    "exceptions": [e.value for e in at.exception],
+}}))
+"""
+
+
+def profile_imports(modules):
+    """-X importtime 결과에서 모듈별 누적 import 시간(마이크로초)을 읽어옵니다."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+            cumulative[name] = int(cumulative_us)
+        except ValueError:
+            continue  # 헤더 행
+    return cumulative
+
+
+def check_first_render():
+    """빈 시트로 첫 화면을 렌더링하고 불러온 무거운 모듈을 확인합니다."""
+    script = FIRST_RENDER_SCRIPT.format(repo_root=REPO_ROOT, app_path=APP_PATH, heavy=FIRST_RENDER_FORBIDDEN)
+    completed = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(budget_ms):
+    failures = []
+    cumulative = profile_imports(APP_MODULES)
+
+    app_import_ms = {m: round(cumulative.get(m, 0) / 1000, 2) for m in APP_MODULES + ("streamlit",)}
+    total_ms = round(sum(cumulative.get(m, 0) for m in APP_MODULES + ("streamlit",)) / 1000, 2)
+    eager_heavy = [m for m in IMPORT_TIME_FORBIDDEN if m in cumulative]
+    if eager_heavy:
+        failures.append(f"앱 모듈 import 시 무거운 모듈을 불러옴: {', '.join(eager_heavy)}")
+    if total_ms > budget_ms:
+        failures.append(f"import 시간 {total_ms}ms 가 예산 {budget_ms}ms 를 초과함")
+
+    first_render = check_first_render()
+    if first_render["loaded_heavy_modules"]:
+        failures.append(f"첫 화면 렌더링 시 무거운 모듈을 불러옴: {', '.join(first_render['loaded_heavy_modules'])}")
+    if first_render["exceptions"]:
+        failures.append(f"첫 화면 렌더링 중 예외 발생: {first_render['exceptions']}")
+
+    slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:15]
+    return {
+        "budget_ms": budget_ms,
+        "import_total_ms": total_ms,
+        "import_ms": app_import_ms,
+        "slowest_imports_ms": {name: round(us / 1000, 2) for name, us in slowest},
+        "first_render": first_render,
+        "failures": failures,
+        "ok": not failures,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="앱 시작 비용(import 시간, 지연 로딩) 점검")
+    parser.add_argument("--budget-ms", type=float, default=800, help="앱 모듈 import 시간 예산(ms)")
+    parser.add_argument("--output", help="결과 JSON 을 저장할 파일 경로")
+    args = parser.parse_args(argv)
+
+    report = run(args.budget_ms)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
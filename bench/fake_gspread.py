@@ -0,0 +1,397 @@
+# 벤치마크용 메모리 기반 gspread 대체 구현
+# 실제 Google API 없이 클라이언트/스프레드시트/워크시트 동작을 흉내 내며,
+# 호출별 지연 시간과 분당 할당량(쿼터)을 설정할 수 있습니다.
+from collections import Counter, deque
+import itertools
+import json
+import re
+import threading
+import time
+
+import gspread
+import requests
+
+# Google Sheets API 기본 분당 할당량 (사용자 기준)
+DEFAULT_READ_QUOTA_PER_MINUTE = 60
+DEFAULT_WRITE_QUOTA_PER_MINUTE = 60
+
+# 호출 종류 구분 (할당량 계산용)
+READ_METHODS = {
+    "open", "open_by_key", "worksheet", "worksheets", "get_all_values", "get",
+    "batch_get", "list_permissions", "get_lastUpdateTime",
+}
+WRITE_METHODS = {
+    "create", "add_worksheet", "append_row", "append_rows", "update",
+    "batch_update", "spreadsheet_batch_update", "share", "delete_rows",
+}
+
+
+class RealClock:
+    """실제 시간을 사용하는 시계 (지연 시간만큼 실제로 대기)"""
+
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """가상 시간 시계 - sleep 호출 시 실제로 대기하지 않고 시간만 증가시킴"""
+
+    def __init__(self):
+        self._now = 0.0
+        self._lock = threading.Lock()
+
+    def now(self):
+        return self._now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            with self._lock:
+                self._now += seconds
+
+
+class _FakeResponse:
+    """gspread.exceptions.APIError 생성을 위한 최소한의 응답 객체"""
+
+    def __init__(self, code, message, status):
+        self.status_code = code
+        self._payload = {"error": {"code": code, "message": message, "status": status}}
+        self.text = json.dumps(self._payload)
+
+    def json(self):
+        return self._payload
+
+
+def quota_exceeded_error(kind):
+    """할당량 초과 시 실제 API와 같은 형태(429)의 APIError를 만듭니다."""
+    return gspread.exceptions.APIError(_FakeResponse(
+        429,
+        f"Quota exceeded for quota metric '{kind} requests' and limit '{kind} requests per minute per user'",
+        "RESOURCE_EXHAUSTED",
+    ))
+
+
+class FakeBackend:
+    """
+    모든 가짜 객체가 공유하는 API 호출 계층.
+    latency: 기본 호출 지연 시간(초), latency_by_method: 메서드별 지연 시간
+    read_quota_per_minute / write_quota_per_minute: None이면 할당량 제한 없음
+    """
+
+    def __init__(self, latency=0.0, latency_by_method=None,
+                 read_quota_per_minute=None, write_quota_per_minute=None, clock=None):
+        self.latency = latency
+        self.latency_by_method = dict(latency_by_method or {})
+        self.quotas = {"read": read_quota_per_minute, "write": write_quota_per_minute}
+        self.clock = clock or RealClock()
+        self.timeout = None  # 클라이언트 응답 제한 시간(초) - 지연 시간이 더 길면 ReadTimeout
+        self.failure = None  # 설정하면 모든 호출이 이 예외로 실패 (장애 재현용)
+        self.calls = Counter()
+        self.quota_errors = Counter()
+        self.api_time = 0.0
+        self._windows = {"read": deque(), "write": deque()}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.spreadsheets = {}
+
+    def next_id(self):
+        return next(self._ids)
+
+    def api_call(self, method):
+        """API 호출 1회를 기록하고 할당량 확인 후 지연 시간만큼 대기합니다."""
+        kind = "write" if method in WRITE_METHODS else "read"
+        with self._lock:
+            now = self.clock.now()
+            window = self._windows[kind]
+            while window and now - window[0] >= 60:
+                window.popleft()
+            limit = self.quotas[kind]
+            if limit is not None and len(window) >= limit:
+                self.quota_errors[method] += 1
+                raise quota_exceeded_error(kind.capitalize())
+            window.append(now)
+            self.calls[method] += 1
+        if self.failure is not None:
+            raise self.failure
+        delay = self.latency_by_method.get(method, self.latency)
+        if self.timeout is not None and delay > self.timeout:
+            self.api_time += self.timeout
+            self.clock.sleep(self.timeout)
+            raise requests.exceptions.ReadTimeout(f"{method}: {self.timeout}초 안에 응답이 없습니다.")
+        self.api_time += delay
+        self.clock.sleep(delay)
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls.clear()
+            self.quota_errors.clear()
+            self.api_time = 0.0
+
+
+# A1 표기법 처리
+_CELL_RE = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+
+def column_letter_to_index(letters):
+    """'A' -> 1, 'M' -> 13, 'AA' -> 27"""
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + (ord(ch) - ord("A") + 1)
+    return index
+
+
+def parse_a1_range(range_name):
+    """
+    'A2', 'A2:M10', 'F2:F', 'A:A' 형태의 범위를 (시작 행, 시작 열, 끝 행, 끝 열)로 변환합니다.
+    행/열 번호는 1부터 시작하며 생략된 끝 값은 None 입니다.
+    """
+    if "!" in range_name:
+        range_name = range_name.split("!", 1)[1]
+    parts = range_name.split(":")
+    start = _CELL_RE.match(parts[0])
+    end = _CELL_RE.match(parts[1]) if len(parts) > 1 else start
+    if not start or not end:
+        raise gspread.exceptions.IncorrectCellLabel(range_name)
+    start_col = column_letter_to_index(start.group(1)) if start.group(1) else 1
+    start_row = int(start.group(2)) if start.group(2) else 1
+    end_col = column_letter_to_index(end.group(1)) if end.group(1) else None
+    end_row = int(end.group(2)) if end.group(2) else None
+    if len(parts) == 1 and start.group(1) and start.group(2):
+        # 단일 셀은 업데이트 시 시작 위치로만 사용
+        end_col, end_row = None, None
+    return start_row, start_col, end_row, end_col
+
+
+def _cell_value(value):
+    return "" if value is None else str(value)
+
+
+_WORKSHEET_WRITE_METHODS = {"append_row", "append_rows", "update", "batch_update", "delete_rows"}
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows=1000, cols=26):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = spreadsheet.backend.next_id()
+        self.row_count = rows
+        self.col_count = cols
+        self.values = []
+
+    @property
+    def spreadsheet_id(self):
+        return self.spreadsheet.id
+
+    def _call(self, method):
+        self.spreadsheet.backend.api_call(method)
+        # 쓰기 호출은 문서 수정 시각(get_lastUpdateTime)을 바꿈
+        if method in _WORKSHEET_WRITE_METHODS:
+            self.spreadsheet.last_update += 1
+
+    def _snapshot(self):
+        """gspread와 동일하게 직사각형으로 채운 값 복사본을 반환합니다."""
+        width = max((len(r) for r in self.values), default=0)
+        return [r + [""] * (width - len(r)) for r in self.values]
+
+    def _ensure_size(self, rows, cols):
+        while len(self.values) < rows:
+            self.values.append([])
+        for r in range(rows):
+            row = self.values[r]
+            if len(row) < cols:
+                row.extend([""] * (cols - len(row)))
+        self.row_count = max(self.row_count, rows)
+        self.col_count = max(self.col_count, cols)
+
+    def _write_block(self, start_row, start_col, block):
+        block = [[_cell_value(v) for v in row] for row in block]
+        if not block:
+            return
+        width = max(len(r) for r in block)
+        self._ensure_size(start_row + len(block) - 1, start_col + width - 1)
+        for r, row in enumerate(block):
+            target = self.values[start_row - 1 + r]
+            target[start_col - 1:start_col - 1 + len(row)] = row
+        self._trim()
+
+    def _trim(self):
+        while self.values and not any(self.values[-1]):
+            self.values.pop()
+
+    def _read_block(self, range_name, major_dimension=None):
+        data = self._snapshot()
+        start_row, start_col, end_row, end_col = parse_a1_range(range_name)
+        if end_row is None and end_col is None and ":" not in range_name:
+            end_row, end_col = start_row, start_col
+        end_row = end_row or len(data)
+        rows = []
+        for r in range(start_row - 1, min(end_row, len(data))):
+            row = data[r][start_col - 1:end_col]
+            while row and row[-1] == "":
+                row.pop()
+            rows.append(row)
+        while rows and not rows[-1]:
+            rows.pop()
+        if major_dimension in ("COLUMNS", "columns"):
+            width = max((len(r) for r in rows), default=0)
+            rows = [[r[c] if c < len(r) else "" for r in rows] for c in range(width)]
+            for col in rows:
+                while col and col[-1] == "":
+                    col.pop()
+        return rows
+
+    # 읽기 API
+    def get_all_values(self, **kwargs):
+        self._call("get_all_values")
+        return self._snapshot()
+
+    def get_values(self, range_name=None, **kwargs):
+        if range_name is None:
+            return self.get_all_values()
+        return self.get(range_name, **kwargs)
+
+    def get(self, range_name=None, major_dimension=None, value_render_option=None, **kwargs):
+        self._call("get")
+        if range_name is None:
+            return self._snapshot()
+        return self._read_block(range_name, major_dimension)
+
+    def batch_get(self, ranges, major_dimension=None, value_render_option=None, **kwargs):
+        self._call("batch_get")
+        return [self._read_block(r, major_dimension) for r in ranges]
+
+    # 쓰기 API
+    def append_row(self, values, **kwargs):
+        self._call("append_row")
+        self.values.append([_cell_value(v) for v in values])
+        self.row_count = max(self.row_count, len(self.values))
+
+    def append_rows(self, values, **kwargs):
+        self._call("append_rows")
+        for row in values:
+            self.values.append([_cell_value(v) for v in row])
+        self.row_count = max(self.row_count, len(self.values))
+
+    def update(self, values=None, range_name=None, **kwargs):
+        self._call("update")
+        start_row, start_col, _, _ = parse_a1_range(range_name or "A1")
+        self._write_block(start_row, start_col, values or [])
+
+    def batch_update(self, data, **kwargs):
+        self._call("batch_update")
+        for item in data:
+            start_row, start_col, _, _ = parse_a1_range(item["range"])
+            self._write_block(start_row, start_col, item["values"])
+
+    def delete_rows(self, start_index, end_index=None):
+        self._call("delete_rows")
+        end_index = end_index or start_index
+        del self.values[start_index - 1:end_index]
+
+
+class FakeSpreadsheet:
+    def __init__(self, backend, title):
+        self.backend = backend
+        self.title = title
+        self.id = f"fake-spreadsheet-{backend.next_id()}"
+        self.url = f"https://docs.google.com/spreadsheets/d/{self.id}"
+        self.permissions = []
+        self._worksheets = {}
+        self.last_update = 0.0
+
+    def worksheet(self, title):
+        self.backend.api_call("worksheet")
+        if title not in self._worksheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def worksheets(self, exclude_hidden=False):
+        self.backend.api_call("worksheets")
+        return list(self._worksheets.values())
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        self.backend.api_call("add_worksheet")
+        worksheet = FakeWorksheet(self, title, rows, cols)
+        self._worksheets[title] = worksheet
+        return worksheet
+
+    def list_permissions(self):
+        self.backend.api_call("list_permissions")
+        return [dict(p) for p in self.permissions]
+
+    def share(self, email_address, perm_type, role, **kwargs):
+        self.backend.api_call("share")
+        self.permissions.append({"emailAddress": email_address, "type": perm_type, "role": role})
+
+    def batch_update(self, body):
+        self.backend.api_call("spreadsheet_batch_update")
+        self.last_update += 1
+        by_id = {ws.id: ws for ws in self._worksheets.values()}
+        for request in body.get("requests", []):
+            if "deleteDimension" in request:
+                rng = request["deleteDimension"]["range"]
+                ws = by_id[rng["sheetId"]]
+                del ws.values[rng["startIndex"]:rng["endIndex"]]
+        return {"spreadsheetId": self.id, "replies": [{} for _ in body.get("requests", [])]}
+
+    def get_lastUpdateTime(self):
+        self.backend.api_call("get_lastUpdateTime")
+        return str(self.last_update)
+
+    # 테스트 데이터 준비용 (API 호출로 집계하지 않음)
+    def seed_worksheet(self, title, values):
+        worksheet = self._worksheets.get(title) or FakeWorksheet(self, title)
+        worksheet.values = [[_cell_value(v) for v in row] for row in values]
+        self._worksheets[title] = worksheet
+        # Google Sheets 화면에서 직접 수정한 것과 같이 문서 수정 시각을 바꿈
+        self.last_update += 1
+        return worksheet
+
+
+class FakeClient:
+    """gspread.Client 대체 구현"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or FakeBackend()
+        self.timeout = None
+        self.http_client = self  # gspread 6 은 client.http_client.set_timeout() 으로 제한 시간 설정
+
+    def set_timeout(self, timeout):
+        # (연결, 응답) 튜플이면 응답 제한 시간만 사용
+        self.timeout = timeout
+        self.backend.timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+
+    def open(self, title, folder_id=None):
+        self.backend.api_call("open")
+        if title not in self.backend.spreadsheets:
+            raise gspread.exceptions.SpreadsheetNotFound(title)
+        return self.backend.spreadsheets[title]
+
+    def open_by_key(self, key):
+        self.backend.api_call("open_by_key")
+        for spreadsheet in self.backend.spreadsheets.values():
+            if spreadsheet.id == key:
+                return spreadsheet
+        raise gspread.exceptions.SpreadsheetNotFound(key)
+
+    def create(self, title, folder_id=None):
+        self.backend.api_call("create")
+        spreadsheet = FakeSpreadsheet(self.backend, title)
+        self.backend.spreadsheets[title] = spreadsheet
+        return spreadsheet
+
+    # 테스트 데이터 준비용 (API 호출로 집계하지 않음)
+    def seed_spreadsheet(self, title, worksheets=None, share_with=None):
+        spreadsheet = self.backend.spreadsheets.get(title) or FakeSpreadsheet(self.backend, title)
+        self.backend.spreadsheets[title] = spreadsheet
+        for ws_title, values in (worksheets or {}).items():
+            spreadsheet.seed_worksheet(ws_title, values)
+        for email in share_with or []:
+            spreadsheet.permissions.append({"emailAddress": email, "type": "user", "role": "writer"})
+        return spreadsheet
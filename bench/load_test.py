@@ -0,0 +1,444 @@
+# SM Activity 앱 동시 세션 부하 테스트
+# 같은 프로세스에서 Streamlit 서버를 실제로 띄우고(인증은 가짜 Google Sheets 백엔드로 대체),
+# 브라우저 대신 웹소켓 클라이언트 여러 개가 동시에 양식 제출, 파일 업로드, 통합 다운로드, 화면 재실행을 반복합니다.
+# 동작별 응답 시간 백분위수, 초당 화면 실행 수, 세션당 메모리 증가량, Google Sheets API 호출 수를 JSON 으로 출력합니다.
+#
+# 실행 방법 (저장소 루트에서):
+#   python -m bench.load_test --sessions 20 --iterations 10
+#   python -m bench.load_test --sessions 50 --mix form=4 upload=1 export=1 rerun=4 --output load.json
+import argparse
+import asyncio
+import contextlib
+from datetime import datetime
+import json
+import os
+import platform
+import random
+import socket
+import sys
+import time
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from bench.fake_gspread import (  # noqa: E402
+    DEFAULT_READ_QUOTA_PER_MINUTE, DEFAULT_WRITE_QUOTA_PER_MINUTE, FakeBackend, FakeClient, RealClock,
+)
+from bench.run_benchmarks import (  # noqa: E402
+    APP_PATH, RESULT_SCHEMA_VERSION, git_revision, make_activity_frame, seed_documents,
+)
+from upload_journal import list_unfinished  # noqa: E402
+
+# 세션별 동작 비율 기본값
+DEFAULT_MIX = {"form": 4, "upload": 1, "export": 1, "rerun": 4}
+# 앱 화면의 위젯 이름
+FORM_TASK_LABEL = "TASK 제목"
+FORM_REQUESTER_LABEL = "요청자"
+FORM_SUBMIT_LABEL = "추가하기"
+UPLOADER_LABEL = "SM Activity 양식의 엑셀/CSV/Parquet 파일을 업로드하세요"
+UPLOAD_BUTTON_LABEL = "데이터 추가하기"
+EXPORT_BUTTON_LABEL = "전체 데이터 엑셀 파일 다운로드"
+EXPORT_DOWNLOAD_LABEL = "📥 통합 엑셀 파일 다운로드"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb():
+    """현재 프로세스의 메모리 사용량(MB) - Linux 가 아니면 최대 사용량으로 대체"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentiles(values):
+    if not values:
+        return {"p50_s": None, "p95_s": None, "p99_s": None, "max_s": None}
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+    return {"p50_s": pick(0.5), "p95_s": pick(0.95), "p99_s": pick(0.99), "max_s": round(ordered[-1], 4)}
+
+
+def parse_mix(items):
+    mix = dict(DEFAULT_MIX)
+    if items:
+        mix = {}
+        for item in items:
+            name, _, weight = item.partition("=")
+            if name not in DEFAULT_MIX:
+                raise SystemExit(f"알 수 없는 동작: {name} (사용 가능: {', '.join(DEFAULT_MIX)})")
+            mix[name] = float(weight or 1)
+    return mix
+
+
+class LoadStats:
+    """모든 세션이 함께 기록하는 부하 테스트 결과"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.error_samples = []
+        self.script_runs = 0
+
+    def observe(self, interaction, seconds, errors):
+        self.latencies.setdefault(interaction, []).append(seconds)
+        self.errors[interaction] = self.errors.get(interaction, 0) + len(errors)
+        for message in errors:
+            if len(self.error_samples) < 20:
+                self.error_samples.append(f"{interaction}: {message[:200]}")
+
+
+class LoadSession:
+    """웹소켓으로 앱에 접속한 가상 사용자 하나 (브라우저가 보내는 메시지를 그대로 흉내 냄)"""
+
+    def __init__(self, index, port, stats, upload_rows):
+        self.index = index
+        self.port = port
+        self.stats = stats
+        self.upload_rows = upload_rows
+        self.ws = None
+        self.session_id = None
+        self.widgets = {}  # (위젯 종류, 이름) -> (위젯 ID, 프래그먼트 ID)
+        self.download_urls = {}
+        self.sequence = 0
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        self.ws = await websocket_connect(f"ws://127.0.0.1:{self.port}/_stcore/stream",
+                                          max_message_size=512 * 1024 * 1024)
+        return await self.rerun()
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    async def _read(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        data = await self.ws.read_message()
+        if data is None:
+            raise ConnectionError("웹소켓 연결이 끊어졌습니다.")
+        message = ForwardMsg()
+        message.ParseFromString(data)
+        return message
+
+    def _collect(self, message, errors):
+        """화면 요소에서 위젯 ID, 다운로드 주소, 오류 메시지를 모읍니다."""
+        if message.delta.WhichOneof("type") != "new_element":
+            return
+        element = message.delta.new_element
+        kind = element.WhichOneof("type")
+        body = getattr(element, kind)
+        if kind == "alert" and body.format == body.ERROR:
+            errors.append(body.body)
+        elif kind == "exception":
+            errors.append(f"{body.type}: {body.message}")
+        elif getattr(body, "id", "") and hasattr(body, "label"):
+            self.widgets[(kind, body.label)] = (body.id, message.delta.fragment_id)
+            if kind == "download_button":
+                self.download_urls[body.label] = body.url
+
+    async def rerun(self, widget_states=(), fragment_id=""):
+        """화면 실행을 요청하고 (st.rerun 으로 이어지는 실행까지) 끝날 때까지 기다립니다. 오류 메시지 목록 반환"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        message.rerun_script.fragment_id = fragment_id
+        message.rerun_script.widget_states.widgets.extend(widget_states)
+        await self.ws.write_message(message.SerializeToString(), binary=True)
+
+        errors = []
+        while True:
+            reply = await self._read()
+            kind = reply.WhichOneof("type")
+            if kind == "new_session":
+                self.session_id = reply.new_session.initialize.session_id or self.session_id
+            elif kind == "delta":
+                self._collect(reply, errors)
+            elif kind == "script_finished":
+                self.stats.script_runs += 1
+                if reply.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return errors
+
+    def widget(self, kind, label):
+        if (kind, label) not in self.widgets:
+            raise LookupError(f"화면에 '{label}' {kind} 위젯이 없습니다.")
+        return self.widgets[(kind, label)]
+
+    def _state(self, kind, label, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id, fragment_id = self.widget(kind, label)
+        state = WidgetState(id=widget_id)
+        for field, field_value in value.items():
+            if field == "file_uploader_state_value":
+                state.file_uploader_state_value.CopyFrom(field_value)
+            else:
+                setattr(state, field, field_value)
+        return state, fragment_id
+
+    async def click(self, label):
+        state, fragment_id = self._state("button", label, trigger_value=True)
+        return await self.rerun([state], fragment_id)
+
+    # 가상 사용자 동작
+    async def submit_form(self):
+        self.sequence += 1
+        task, _ = self._state("text_input", FORM_TASK_LABEL,
+                              string_value=f"부하 테스트 {self.index}-{self.sequence}")
+        requester, _ = self._state("text_input", FORM_REQUESTER_LABEL, string_value=f"세션{self.index}")
+        submit, fragment_id = self._state("button", FORM_SUBMIT_LABEL, trigger_value=True)
+        return await self.rerun([task, requester, submit], fragment_id)
+
+    async def upload(self):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.Common_pb2 import FileUploaderState, UploadedFileInfo
+        from tornado.httpclient import AsyncHTTPClient
+
+        self.sequence += 1
+        df = make_activity_frame(self.upload_rows, seed=self.index * 1000 + self.sequence)
+        df["TASK"] = [f"부하 업로드 {self.index}-{self.sequence}-{i}" for i in range(len(df))]
+        body = df.to_csv(index=False).encode("utf-8-sig")
+        name = f"load_{self.index}_{self.sequence}.csv"
+
+        # 업로드 주소 요청 (브라우저의 file_urls_request 와 같음)
+        request = BackMsg()
+        request.file_urls_request.request_id = name
+        request.file_urls_request.file_names.append(name)
+        request.file_urls_request.session_id = self.session_id
+        await self.ws.write_message(request.SerializeToString(), binary=True)
+        while True:
+            reply = await self._read()
+            if reply.WhichOneof("type") == "file_urls_response" and reply.file_urls_response.response_id == name:
+                break
+        file_urls = reply.file_urls_response.file_urls[0]
+
+        boundary = f"load{self.index}x{self.sequence}"
+        payload = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{name}\"\r\n"
+            f"Content-Type: text/csv\r\n\r\n"
+        ).encode() + body + f"\r\n--{boundary}--\r\n".encode()
+        await AsyncHTTPClient().fetch(
+            f"http://127.0.0.1:{self.port}{file_urls.upload_url}", method="PUT", body=payload,
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+
+        uploader_state = FileUploaderState(max_file_id=self.sequence)
+        uploader_state.uploaded_file_info.append(UploadedFileInfo(
+            file_id=file_urls.file_id, name=name, size=len(body), file_urls=file_urls,
+        ))
+        state, fragment_id = self._state("file_uploader", UPLOADER_LABEL, file_uploader_state_value=uploader_state)
+        errors = await self.rerun([state], fragment_id)
+        return errors + await self.click(UPLOAD_BUTTON_LABEL)
+
+    async def export(self):
+        from tornado.httpclient import AsyncHTTPClient
+
+        self.download_urls.pop(EXPORT_DOWNLOAD_LABEL, None)
+        errors = await self.click(EXPORT_BUTTON_LABEL)
+        url = self.download_urls.get(EXPORT_DOWNLOAD_LABEL)
+        if url is None:
+            return errors + ["통합 다운로드 버튼이 표시되지 않았습니다."]
+        await AsyncHTTPClient().fetch(f"http://127.0.0.1:{self.port}{url}")
+        return errors
+
+    async def run(self, interaction):
+        started = time.perf_counter()
+        try:
+            errors = await getattr(self, {"form": "submit_form"}.get(interaction, interaction))()
+        except Exception as e:
+            errors = [f"{type(e).__name__}: {e}"]
+        self.stats.observe(interaction, time.perf_counter() - started, errors)
+
+
+async def run_session(index, args, port, stats, connected, start_event):
+    rng = random.Random(index)
+    session = LoadSession(index, port, stats, args.upload_rows)
+    try:
+        started = time.perf_counter()
+        errors = await session.connect()
+        stats.observe("connect", time.perf_counter() - started, errors)
+        connected.append(session)
+        await start_event.wait()
+        names, weights = zip(*args.mix.items())
+        for _ in range(args.iterations):
+            await asyncio.sleep(rng.uniform(0, args.think * 2))
+            await session.run(rng.choices(names, weights)[0])
+    except Exception as e:
+        stats.observe("connect", 0.0, [f"{type(e).__name__}: {e}"])
+    return session
+
+
+async def wait_for_uploads(timeout):
+    """백그라운드 업로드 작업이 모두 끝날 때까지 기다립니다. (끝난 업로드는 체크포인트 기록이 삭제됨)"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if not list_unfinished():
+            return round(time.perf_counter() - started, 4)
+        await asyncio.sleep(0.5)
+    return None
+
+
+async def run_load(args, backend):
+    import streamlit as st
+    from streamlit import config
+    from streamlit.runtime.secrets import Secrets
+    from streamlit.web.server import Server
+
+    port = free_port()
+    for option, value in (
+        ("server.headless", True), ("server.port", port), ("server.address", "127.0.0.1"),
+        ("server.enableXsrfProtection", False), ("server.fileWatcherType", "none"),
+        ("server.runOnSave", False), ("global.developmentMode", False), ("browser.gatherUsageStats", False),
+    ):
+        config.set_option(option, value)
+    secrets = Secrets()
+    # 백그라운드 워머의 호출이 측정에 섞이지 않도록 끔
+    secrets._secrets = {"gcp_service_account": {"type": "service_account"}, "snapshot_warmer": False}
+    st.secrets = secrets
+
+    server = Server(APP_PATH, False)
+    await server.start()
+    stats = LoadStats()
+    rss_start = rss_mb()
+    backend.reset_counters()
+
+    # 모든 세션 접속 (ramp 초 동안 나누어 접속)
+    connected = []
+    start_event = asyncio.Event()
+    tasks = []
+    for index in range(args.sessions):
+        tasks.append(asyncio.create_task(run_session(index, args, port, stats, connected, start_event)))
+        await asyncio.sleep(args.ramp / max(1, args.sessions))
+    while len(connected) < args.sessions and not all(task.done() for task in tasks):
+        await asyncio.sleep(0.05)
+    rss_connected = rss_mb()
+    connect_calls = backend.total_calls()
+
+    # 동작 반복
+    runs_before = stats.script_runs
+    started = time.perf_counter()
+    start_event.set()
+    sessions = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    rss_end = rss_mb()
+    drain_s = await wait_for_uploads(args.drain_timeout)
+
+    for session in sessions:
+        session.close()
+    # 서버 종료 메시지가 결과 JSON 과 섞이지 않도록 stderr 로 출력
+    with contextlib.redirect_stdout(sys.stderr):
+        server.stop()
+
+    interactions = sum(len(v) for k, v in stats.latencies.items() if k != "connect")
+    results = [
+        {"name": "load_interaction",
+         "params": {"interaction": name, "sessions": args.sessions},
+         "metrics": {"count": len(values), "errors": stats.errors.get(name, 0), **percentiles(values)}}
+        for name, values in sorted(stats.latencies.items())
+    ]
+    results.append({
+        "name": "load_summary",
+        "params": {"sessions": args.sessions, "iterations": args.iterations, "mix": args.mix},
+        "metrics": {
+            "connected_sessions": len(connected),
+            "elapsed_s": round(elapsed, 4),
+            "interactions": interactions,
+            "interactions_per_s": round(interactions / elapsed, 2) if elapsed else None,
+            "script_runs": stats.script_runs - runs_before,
+            "reruns_per_s": round((stats.script_runs - runs_before) / elapsed, 2) if elapsed else None,
+            "rss_start_mb": round(rss_start, 1),
+            "rss_per_session_mb": round((rss_connected - rss_start) / max(1, len(connected)), 2),
+            "rss_growth_during_run_mb": round(rss_end - rss_connected, 1),
+            "api_calls_connect": connect_calls,
+            "api_calls": backend.total_calls(),
+            "api_calls_per_interaction": round((backend.total_calls() - connect_calls) / interactions, 2)
+            if interactions else None,
+            "api_calls_by_method": dict(backend.calls),
+            "quota_errors": sum(backend.quota_errors.values()),
+            "upload_drain_s": drain_s,
+            "error_samples": stats.error_samples,
+        },
+    })
+    return results
+
+
+def run(args):
+    backend = FakeBackend(
+        latency=args.latency,
+        read_quota_per_minute=args.read_quota,
+        write_quota_per_minute=args.write_quota,
+        clock=RealClock(),
+    )
+    client = FakeClient(backend)
+    seed_documents(client, args.existing_rows)
+    with mock.patch("gspread.authorize", return_value=client), \
+            mock.patch("google.oauth2.service_account.Credentials.from_service_account_info",
+                       return_value=object()):
+        results = asyncio.run(run_load(args, backend))
+    return {
+        "schema_version": RESULT_SCHEMA_VERSION,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "latency_s": args.latency,
+            "read_quota_per_minute": args.read_quota,
+            "write_quota_per_minute": args.write_quota,
+            "sessions": args.sessions,
+            "iterations": args.iterations,
+            "existing_rows": args.existing_rows,
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SM Activity 앱 동시 세션 부하 테스트 (가짜 Google Sheets 백엔드 사용)")
+    parser.add_argument("--sessions", type=int, default=20, help="동시 접속 세션 수")
+    parser.add_argument("--iterations", type=int, default=10, help="세션당 동작 횟수")
+    parser.add_argument("--mix", nargs="+", metavar="동작=비율",
+                        help="동작 비율 (form, upload, export, rerun) 예: form=4 upload=1 export=1 rerun=4")
+    parser.add_argument("--think", type=float, default=0.5, help="동작 사이 평균 대기 시간(초)")
+    parser.add_argument("--ramp", type=float, default=2.0, help="모든 세션이 접속하는 데 걸리는 시간(초)")
+    parser.add_argument("--upload-rows", type=int, default=50, help="업로드 파일당 행 수")
+    parser.add_argument("--existing-rows", type=int, default=500, help="미리 채워 둘 행 수")
+    parser.add_argument("--latency", type=float, default=0.05, help="API 호출당 지연 시간(초, 실제로 대기)")
+    parser.add_argument("--read-quota", type=int, default=DEFAULT_READ_QUOTA_PER_MINUTE, help="분당 읽기 할당량")
+    parser.add_argument("--write-quota", type=int, default=DEFAULT_WRITE_QUOTA_PER_MINUTE, help="분당 쓰기 할당량")
+    parser.add_argument("--drain-timeout", type=float, default=300, help="업로드 작업 완료를 기다리는 최대 시간(초)")
+    parser.add_argument("--output", help="결과 JSON 을 저장할 파일 경로")
+    args = parser.parse_args(argv)
+    args.mix = parse_mix(args.mix)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,868 @@
+# SM Activity 앱 벤치마크 실행 스크립트
+# 실제 Google API 대신 bench/fake_gspread.py 의 가짜 백엔드를 사용하며,
+# 결과는 릴리스 간 비교가 가능하도록 JSON 으로 출력합니다.
+#
+# 실행 방법 (저장소 루트에서):
+#   python -m bench.run_benchmarks --output bench_results.json
+#   python -m bench.run_benchmarks --sizes 1000 --latency 0.2
+import argparse
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import pandas as pd  # noqa: E402
+
+import legacy_backfill  # noqa: E402
+import sm_sheets  # noqa: E402
+from sheet_cache import SnapshotStore, WorksheetSnapshot, worksheet_key  # noqa: E402
+from bench.fake_gspread import (  # noqa: E402
+    DEFAULT_READ_QUOTA_PER_MINUTE, DEFAULT_WRITE_QUOTA_PER_MINUTE,
+    FakeBackend, FakeClient, RealClock, VirtualClock,
+)
+
+APP_PATH = os.path.join(REPO_ROOT, "sm_activity_app.py")
+RESULT_SCHEMA_VERSION = 1
+
+# 앱에서 사용하는 문서/워크시트 이름
+DEFAULT_SPREADSHEET = "SM Activity Dashboard"
+OTHER_SPREADSHEET = "SM Activity Plan"
+ACTIVITY_WORKSHEET = "SM Activity"
+INQUIRY_WORKSHEET = "현업문의"
+OWNER_EMAIL = "qhv147@gmail.com"
+
+
+class _VirtualTimeModule:
+    """sm_sheets 모듈의 time 참조를 대체하여 배치 사이 대기를 가상 시계로 처리"""
+
+    def __init__(self, clock):
+        self.sleep = clock.sleep
+        self.time = time.time
+        self.monotonic = time.monotonic
+        self.perf_counter = time.perf_counter
+
+
+# 테스트 데이터 생성
+def make_activity_frame(n, seed=0):
+    """업로드용 SM Activity 데이터프레임 (요청일은 무작위 순서)"""
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    return pd.DataFrame({
+        '구분': [rng.choice(['정기', '비정기']) for _ in range(n)],
+        '작업유형': [rng.choice(['조간점검', '재적재', '인프라 작업', 'SI 지원']) for _ in range(n)],
+        'TASK': [f"작업 {i}" for i in range(n)],
+        '요청일': [(base + timedelta(days=rng.randrange(730))).strftime("%Y-%m-%d") for _ in range(n)],
+        '요청자': [rng.choice(['홍길동', '김철수', '이영희']) for _ in range(n)],
+        'IT': ['한상욱'] * n,
+        'CNS': ['이정인'] * n,
+        '개발자': ['위승빈'] * n,
+        '결과': [rng.choice(['완료', '진행 중']) for _ in range(n)],
+    })
+
+
+def make_inquiry_frame(n, seed=0):
+    """업로드용 현업문의 데이터프레임 (요청일은 무작위 순서)"""
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    return pd.DataFrame({
+        '문의방법': [rng.choice(['Social Desk', 'MAIL', '메신저', '전화']) for _ in range(n)],
+        '문의유형': [rng.choice(['개발사전검토', '데이터확인', '공통']) for _ in range(n)],
+        '요청부서': [rng.choice(['인사팀', '마케팅팀', '영업팀']) for _ in range(n)],
+        '문의사항': [f"문의 {i}" for i in range(n)],
+        '요청일': [(base + timedelta(days=rng.randrange(730))).strftime("%Y-%m-%d") for _ in range(n)],
+        '요청자': [rng.choice(['홍길동', '김철수', '이영희']) for _ in range(n)],
+    })
+
+
+def make_sheet_values(kind, n, shuffled=False, seed=0):
+    """워크시트에 미리 채워 둘 값 (헤더 포함)"""
+    if kind == "activity":
+        rows, _ = sm_sheets.build_activity_rows(make_activity_frame(n, seed), 0)
+        date_idx, headers = sm_sheets.ACTIVITY_DATE_COL_IDX, sm_sheets.ACTIVITY_HEADERS
+    else:
+        rows, _ = sm_sheets.build_inquiry_rows(make_inquiry_frame(n, seed), 0)
+        date_idx, headers = sm_sheets.INQUIRY_DATE_COL_IDX, sm_sheets.INQUIRY_HEADERS
+    if not shuffled:
+        rows.sort(key=lambda r: r[date_idx])
+    return [list(headers)] + rows
+
+
+def make_backend(args, clock=None):
+    return FakeBackend(
+        latency=args.latency,
+        read_quota_per_minute=args.read_quota,
+        write_quota_per_minute=args.write_quota,
+        clock=clock or VirtualClock(),
+    )
+
+
+def seed_documents(client, rows):
+    """앱이 사용하는 두 문서를 미리 생성해 둡니다."""
+    for title in (DEFAULT_SPREADSHEET, OTHER_SPREADSHEET):
+        client.seed_spreadsheet(title, {
+            ACTIVITY_WORKSHEET: make_sheet_values("activity", rows),
+            INQUIRY_WORKSHEET: make_sheet_values("inquiry", rows),
+        }, share_with=[OWNER_EMAIL])
+
+
+@contextmanager
+def virtual_sleep(clock):
+    """sm_sheets 내부의 time.sleep 을 가상 시계로 대체"""
+    with mock.patch.object(sm_sheets, "time", _VirtualTimeModule(clock)):
+        yield
+
+
+@contextmanager
+def app_with_fake_client(client):
+    """가짜 클라이언트로 인증되도록 패치한 AppTest 를 생성합니다."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # 인증 클라이언트와 시트 데이터는 프로세스 단위로 캐싱되므로 벤치마크마다 초기화
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    with mock.patch("gspread.authorize", return_value=client), \
+            mock.patch("google.oauth2.service_account.Credentials.from_service_account_info",
+                       return_value=object()), \
+            virtual_sleep(client.backend.clock):
+        at = AppTest.from_file(APP_PATH, default_timeout=600)
+        at.secrets["gcp_service_account"] = {"type": "service_account"}
+        # 백그라운드 워머의 호출이 측정에 섞이지 않도록 끔
+        at.secrets["snapshot_warmer"] = False
+        yield at
+
+
+def find_widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+def measure(client, action):
+    """action 실행 시 벽시계 시간, 가상 API 시간, 호출 수를 측정합니다."""
+    backend = client.backend
+    backend.reset_counters()
+    clock_start = backend.clock.now()
+    started = time.perf_counter()
+    action()
+    wall = time.perf_counter() - started
+    return {
+        "wall_s": round(wall, 4),
+        "simulated_s": round(backend.clock.now() - clock_start, 4),
+        "api_calls": backend.total_calls(),
+        "api_calls_by_method": dict(backend.calls),
+        "quota_errors": sum(backend.quota_errors.values()),
+    }
+
+
+# 벤치마크 항목
+def bench_api_calls_per_rerun(args, existing_rows):
+    client = FakeClient(make_backend(args))
+    seed_documents(client, existing_rows)
+    results = []
+    with app_with_fake_client(client) as at:
+        results.append(("cold_start", measure(client, at.run)))
+
+        def change_request_date():
+            at.date_input(key="req_date").set_value(datetime.today() - timedelta(days=1)).run()
+        results.append(("date_picker_change", measure(client, change_request_date)))
+
+        def switch_document():
+            at.selectbox[0].select(at.selectbox[0].options[1]).run()
+        results.append(("document_switch", measure(client, switch_document)))
+    return [
+        {"name": "api_calls_per_rerun", "params": {"interaction": name, "existing_rows": existing_rows},
+         "metrics": metrics}
+        for name, metrics in results
+    ]
+
+
+def bench_rerun_sections(args, existing_rows, reruns=5):
+    """화면 실행 구간별(시작, 사이드바, 탭 등) 실행 시간 p50/p95 를 측정합니다."""
+    from rerun_profiler import get_rerun_profiler
+
+    client = FakeClient(make_backend(args))
+    seed_documents(client, existing_rows)
+    with app_with_fake_client(client) as at:
+        for _ in range(reruns):
+            at.run()
+        sections = get_rerun_profiler().to_dict()
+    return [
+        {"name": "rerun_sections", "params": {"section": name, "reruns": reruns, "existing_rows": existing_rows},
+         "metrics": {key: round(value, 6) if isinstance(value, float) else value for key, value in stats.items()}}
+        for name, stats in sections.items()
+    ]
+
+
+def bench_submit_latency(args, existing_rows):
+    client = FakeClient(make_backend(args))
+    seed_documents(client, existing_rows)
+    with app_with_fake_client(client) as at:
+        at.run()
+        find_widget(at.text_input, "TASK 제목").input("벤치마크 작업")
+
+        def submit():
+            find_widget(at.button, "추가하기").click().run()
+        metrics = measure(client, submit)
+        metrics["errors"] = [e.value for e in at.error]
+    return [{"name": "submit_latency", "params": {"form": "activity_form", "existing_rows": existing_rows},
+             "metrics": metrics}]
+
+
+def bench_bulk_upload(args, kind, n):
+    client = FakeClient(make_backend(args))
+    if kind == "activity":
+        headers, frame = sm_sheets.ACTIVITY_HEADERS, make_activity_frame(n, seed=n)
+        builder, date_idx = sm_sheets.build_activity_rows, sm_sheets.ACTIVITY_DATE_COL_IDX
+    else:
+        headers, frame = sm_sheets.INQUIRY_HEADERS, make_inquiry_frame(n, seed=n)
+        builder, date_idx = sm_sheets.build_inquiry_rows, sm_sheets.INQUIRY_DATE_COL_IDX
+    spreadsheet = client.seed_spreadsheet(DEFAULT_SPREADSHEET, {"target": [list(headers)]})
+    worksheet = spreadsheet.seed_worksheet("target", [list(headers)])
+
+    stages = {}
+    with virtual_sleep(client.backend.clock):
+        rows_box = {}
+
+        def build():
+            rows_box["rows"], _ = builder(frame, 0)
+        stages["build_rows"] = measure(client, build)
+        stages["append_batches"] = measure(
+            client, lambda: sm_sheets.append_rows_in_batches(worksheet, rows_box["rows"]))
+        stages["sort"] = measure(
+            client, lambda: sm_sheets.sort_worksheet_by_date(worksheet, date_col_idx=date_idx))
+
+    total_wall = sum(s["wall_s"] for s in stages.values())
+    total_simulated = sum(s["simulated_s"] for s in stages.values())
+    metrics = {
+        "rows": n,
+        "wall_s": round(total_wall, 4),
+        "simulated_s": round(total_simulated, 4),
+        "rows_per_s_wall": round(n / total_wall, 2) if total_wall else None,
+        "rows_per_s_simulated": round(n / (total_wall + total_simulated), 4),
+        "api_calls": sum(s["api_calls"] for s in stages.values()),
+        "quota_errors": sum(s["quota_errors"] for s in stages.values()),
+        "stages": stages,
+    }
+    return [{"name": "bulk_upload_throughput", "params": {"kind": kind, "rows": n}, "metrics": metrics}]
+
+
+def bench_dedup(args, n):
+    """기존 n행으로 중복 확인 인덱스를 만들고, 절반이 겹치는 n행을 검사합니다."""
+    existing = make_sheet_values("activity", n, seed=n)
+    incoming = [list(row) for row in existing[1 + n // 2:]]
+    incoming += make_sheet_values("activity", n - len(incoming), seed=n + 1)[1:]
+    key_indices = sm_sheets.dedup_key_indices(sm_sheets.ACTIVITY_HEADERS, sm_sheets.ACTIVITY_DEDUP_KEY_COLUMNS)
+    date_idx = sm_sheets.ACTIVITY_DATE_COL_IDX
+
+    started = time.perf_counter()
+    index = sm_sheets.build_dedup_index(existing, key_indices, date_idx)
+    build_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    new_rows, duplicates = sm_sheets.split_duplicate_rows(incoming, index, key_indices, date_idx, n)
+    check_s = time.perf_counter() - started
+    return [{"name": "dedup_check", "params": {"existing_rows": n, "incoming_rows": len(incoming)},
+             "metrics": {
+                 "index_build_s": round(build_s, 4),
+                 "check_s": round(check_s, 4),
+                 "check_us_per_row": round(check_s / max(len(incoming), 1) * 1e6, 2),
+                 "duplicates": len(duplicates),
+                 "new_rows": len(new_rows),
+             }}]
+
+
+def bench_outage_render(args, existing_rows):
+    """
+    Google Sheets 가 연결 오류만 반환하는 상황에서 화면 실행 시간과 API 호출 수를 측정합니다.
+    회로가 열린 뒤에는 API를 호출하지 않고 캐시된 데이터로 바로 그려야 합니다.
+    """
+    import requests
+
+    client = FakeClient(make_backend(args))
+    seed_documents(client, existing_rows)
+    results = []
+    with app_with_fake_client(client) as at:
+        at.run()
+        client.backend.failure = requests.exceptions.ConnectionError("connection reset")
+        for i in range(4):
+            metrics = measure(client, at.run)
+            metrics["degraded"] = any("⚠️" in w.value for w in at.warning)
+            metrics["errors"] = [e.value for e in at.error]
+            results.append({"name": "outage_render", "params": {"rerun": i + 1, "existing_rows": existing_rows},
+                            "metrics": metrics})
+    return results
+
+
+def bench_cache_stampede(args, existing_rows):
+    """
+    캐시가 비어 있을 때 여러 세션이 동시에 같은 워크시트를 읽는 상황을 재현합니다.
+    동시 조회가 하나로 합쳐지는지 확인하기 위해 지연 시간을 실제로 기다리는 시계를 사용합니다.
+    """
+    client = FakeClient(FakeBackend(latency=args.latency, clock=RealClock()))
+    worksheet = client.seed_spreadsheet(DEFAULT_SPREADSHEET).seed_worksheet(
+        ACTIVITY_WORKSHEET, make_sheet_values("activity", existing_rows)
+    )
+    store = SnapshotStore()
+    key = worksheet_key(worksheet)
+    barrier = threading.Barrier(args.sessions)
+
+    def session():
+        barrier.wait()
+        store.get(key, worksheet.get_all_values)
+
+    threads = [threading.Thread(target=session) for _ in range(args.sessions)]
+
+    def run_sessions():
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    metrics = measure(client, run_sessions)
+    metrics["coalesced"] = store.coalesced_count
+    return [{"name": "cache_stampede", "params": {"sessions": args.sessions, "existing_rows": existing_rows},
+             "metrics": metrics}]
+
+
+def bench_sort(args, n):
+    results = []
+    for order in ("sorted", "shuffled"):
+        client = FakeClient(make_backend(args))
+        values = make_sheet_values("activity", n, shuffled=(order == "shuffled"), seed=n)
+        worksheet = client.seed_spreadsheet(DEFAULT_SPREADSHEET, {ACTIVITY_WORKSHEET: values}) \
+            .seed_worksheet(ACTIVITY_WORKSHEET, values)
+        with virtual_sleep(client.backend.clock):
+            metrics = measure(client, lambda: sm_sheets.sort_worksheet_by_date(worksheet))
+        results.append({"name": "sort_worksheet_by_date", "params": {"rows": n, "order": order},
+                        "metrics": metrics})
+    return results
+
+
+def bench_projected_reads(args, n):
+    """행 수(NO 계산)와 정렬 확인에 필요한 열만 읽을 때와 전체 데이터를 읽을 때의 읽은 셀 수 비교"""
+    client = FakeClient(make_backend(args))
+    values = make_sheet_values("activity", n, seed=n)
+    worksheet = client.seed_spreadsheet(DEFAULT_SPREADSHEET, {ACTIVITY_WORKSHEET: values}) \
+        .seed_worksheet(ACTIVITY_WORKSHEET, values)
+    reads = {
+        "full": lambda: worksheet.get_all_values(),
+        # count_data_rows 와 같은 열 (NO 가 빈 마지막 행도 세도록 요청일 열 포함)
+        "row_count": lambda: sm_sheets.read_columns(worksheet, [0, sm_sheets.ACTIVITY_DATE_COL_IDX]),
+        "sort_check": lambda: sm_sheets.read_columns(worksheet, [0, sm_sheets.ACTIVITY_DATE_COL_IDX]),
+    }
+    results = []
+    for operation, read in reads.items():
+        outcome = []
+        metrics = measure(client, lambda: outcome.append(read()))
+        metrics["cells_read"] = sum(map(len, outcome[0]))
+        results.append({"name": "projected_read", "params": {"rows": n, "operation": operation},
+                        "metrics": metrics})
+    return results
+
+
+def bench_sla_metrics(args, n, appends=100):
+    """
+    현업문의 응답 시간 분포를 전체 행으로 처음 집계하는 시간과
+    이후 추가된 행을 하나씩 반영하는 시간(행당) 비교
+    """
+    from sla_metrics import SlaMetrics
+
+    rng = random.Random(n)
+    values = make_sheet_values("inquiry", n + appends, seed=n)
+    request_idx = sm_sheets.INQUIRY_HEADERS.index("요청일")
+    response_idx = sm_sheets.INQUIRY_HEADERS.index("답변일")
+    for row in values[1:]:
+        # 응답 시간 0~14일 (대부분 당일~이틀)
+        delay = min(int(rng.expovariate(0.5)), 14)
+        row[response_idx] = (datetime.strptime(row[request_idx], "%Y-%m-%d")
+                             + timedelta(days=delay)).strftime("%Y-%m-%d")
+
+    started = time.perf_counter()
+    metrics = SlaMetrics.from_values(values[:n + 1])
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for row in values[n + 1:]:
+        metrics.add_row(row)
+    incremental = time.perf_counter() - started
+    return [{"name": "sla_metrics", "params": {"rows": n, "appends": appends},
+             "metrics": {"full_build_s": round(build, 4),
+                         "append_per_row_s": round(incremental / appends, 7),
+                         **metrics.overall.to_dict()}}]
+
+
+def bench_reconcile(args, n, edited_cells=3):
+    """
+    Google Sheets 에서 직접 수정한 내용 확인 비용 비교 (현업문의 n행)
+    - full_reload: 캐시를 비우고 다시 읽은 뒤 응답 시간 집계를 전체 다시 계산 (기존 '캐시 수동 갱신')
+    - unchanged: 워머가 문서 수정 시각만 확인 (데이터를 읽지 않음)
+    - edited: 셀 몇 개를 직접 수정한 뒤 워머가 다시 읽고 바뀐 블록만 스냅샷과 응답 시간 집계에 반영
+    - check_date_edited: 요청일 몇 개를 직접 수정한 뒤 '시트 직접 수정 확인' (NO·요청일 열로 찾은 블록만 읽음)
+    """
+    from sheet_cache import SnapshotStore, SnapshotWarmer, worksheet_key
+    from sla_metrics import SlaMetrics, SlaTracker
+
+    rng = random.Random(n)
+    client = FakeClient(make_backend(args))
+    values = make_sheet_values("inquiry", n, seed=n)
+    spreadsheet = client.seed_spreadsheet(DEFAULT_SPREADSHEET, {INQUIRY_WORKSHEET: values})
+    worksheet = spreadsheet.seed_worksheet(INQUIRY_WORKSHEET, values)
+    key = worksheet_key(worksheet)
+    store = SnapshotStore()
+    tracker = SlaTracker()
+    # 갱신 기준 나이 0: 확인할 때마다 갱신 대상
+    warmer = SnapshotWarmer(store, client, [(DEFAULT_SPREADSHEET, INQUIRY_WORKSHEET)], refresh_age=0)
+    warmer.warm_once()
+    tracker.summary(key, store.peek(key))
+    results = []
+
+    def full_reload():
+        store.invalidate(key)
+        snapshot = store.refresh(key, worksheet.get_all_values)
+        SlaMetrics.from_values(snapshot.values, snapshot.version)
+
+    def sync():
+        warmer.warm_once()
+        tracker.summary(key, store.peek(key))
+
+    def edit():
+        # 답변일을 요청일 다음 날로 수정
+        request_idx, response_idx = (sm_sheets.INQUIRY_HEADERS.index(column) for column in ("요청일", "답변일"))
+        edited = [list(row) for row in worksheet.values]
+        for _ in range(edited_cells):
+            row = edited[rng.randint(1, n)]
+            row[response_idx] = (datetime.strptime(row[request_idx], "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        spreadsheet.seed_worksheet(INQUIRY_WORKSHEET, edited)
+
+    def edit_dates():
+        # 요청일을 하루 앞당김
+        request_idx = sm_sheets.INQUIRY_DATE_COL_IDX
+        edited = [list(row) for row in worksheet.values]
+        for _ in range(edited_cells):
+            row = edited[rng.randint(1, n)]
+            row[request_idx] = (datetime.strptime(row[request_idx], "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+        spreadsheet.seed_worksheet(INQUIRY_WORKSHEET, edited)
+
+    def check():
+        store.check_drift(
+            key, spreadsheet.get_lastUpdateTime(), worksheet.get_all_values,
+            lambda cached: sm_sheets.read_drifted_values(worksheet, cached, sm_sheets.INQUIRY_DATE_COL_IDX),
+        )
+        tracker.summary(key, store.peek(key))
+
+    for mode, action in (("full_reload", full_reload), ("unchanged", sync), ("edited", sync),
+                         ("check_date_edited", check)):
+        if mode == "edited":
+            edit()
+        elif mode == "check_date_edited":
+            edit_dates()
+        version = store.peek(key).version
+        metrics = measure(client, action)
+        snapshot = store.peek(key)
+        metrics["version_changed"] = snapshot.version != version
+        metrics["changed_rows"] = snapshot.changed_rows
+        results.append({"name": "reconcile", "params": {"rows": n, "mode": mode}, "metrics": metrics})
+    # 처음 한 번 외에는 응답 시간 집계를 전체 다시 계산하지 않아야 함
+    results[-1]["metrics"]["sla_full_rebuilds"] = tracker.rebuild_count
+    return results
+
+
+def bench_date_range_read(args, n, days=31):
+    """
+    캐시가 빈 상태에서 한 달 범위의 행을 조회할 때 전체 데이터를 읽는 경우와
+    요청일 열만 읽어 이진 탐색으로 찾은 행 범위만 읽는 경우의 API 호출 수와 읽은 셀 수 비교
+    """
+    client = FakeClient(make_backend(args))
+    values = make_sheet_values("activity", n, seed=n)
+    worksheet = client.seed_spreadsheet(DEFAULT_SPREADSHEET, {ACTIVITY_WORKSHEET: values}) \
+        .seed_worksheet(ACTIVITY_WORKSHEET, values)
+    date_from = datetime(2024, 3, 1).date()
+    date_to = date_from + timedelta(days=days - 1)
+    date_idx = sm_sheets.ACTIVITY_DATE_COL_IDX
+    results = []
+
+    def full_read():
+        data = worksheet.get_all_values()
+        rows = sm_sheets.select_rows(data, date_col_idx=date_idx, date_range=(date_from, date_to))
+        return sum(map(len, data)), len(rows)
+
+    def ranged_read():
+        column = sm_sheets.read_date_column(worksheet, date_idx)
+        bounds = sm_sheets.date_row_bounds(sm_sheets.build_date_index(column, 0, 0), date_from, date_to)
+        rows = sm_sheets.read_row_range(worksheet, *bounds, len(sm_sheets.ACTIVITY_HEADERS)) if bounds else []
+        return len(column) + sum(map(len, rows)), len(rows)
+
+    for mode, read in (("full", full_read), ("ranged", ranged_read)):
+        outcome = {}
+        metrics = measure(client, lambda: outcome.update(zip(("cells_read", "rows"), read())))
+        metrics.update(outcome)
+        results.append({"name": "date_range_read", "params": {"rows": n, "days": days, "mode": mode},
+                        "metrics": metrics})
+    return results
+
+
+def bench_upload_readers(args, n):
+    """같은 n행 데이터를 형식/엔진별로 읽는 시간을 비교합니다."""
+    from io import BytesIO
+
+    frame = make_activity_frame(n, seed=n)
+    xlsx_buffer, parquet_buffer = BytesIO(), BytesIO()
+    frame.to_excel(xlsx_buffer, index=False)
+    frame.to_parquet(parquet_buffer, index=False)
+    payloads = {
+        "xlsx": xlsx_buffer.getvalue(),
+        "csv": frame.to_csv(index=False).encode("utf-8-sig"),
+        "parquet": parquet_buffer.getvalue(),
+    }
+
+    readers = [
+        ("xlsx", "openpyxl", lambda data: pd.read_excel(BytesIO(data), sheet_name=0, engine="openpyxl")),
+        ("xlsx", sm_sheets.excel_engine(), sm_sheets.read_excel_bytes),
+        ("csv", "pandas", sm_sheets.read_csv_bytes),
+        ("parquet", "pyarrow", sm_sheets.read_parquet_bytes),
+    ]
+    results = []
+    seen = set()
+    for file_format, engine, reader in readers:
+        if (file_format, engine) in seen:
+            continue  # calamine 이 없으면 기본 엔진과 같으므로 한 번만 측정
+        seen.add((file_format, engine))
+        started = time.perf_counter()
+        df = reader(payloads[file_format])
+        wall = time.perf_counter() - started
+        results.append({"name": "upload_reader", "params": {"rows": n, "format": file_format, "engine": engine},
+                        "metrics": {"wall_s": round(wall, 4), "bytes": len(payloads[file_format]),
+                                    "rows_per_s": round(len(df) / wall, 1) if wall else None}})
+    return results
+
+
+def bench_multi_file_parse(args, n):
+    """
+    n행을 여러 엑셀 파일로 나누어 순서대로 읽을 때와 스레드 풀로 병렬로 읽을 때를 비교합니다.
+    앱은 순서대로 읽으므로 병렬로 읽어도 빨라지지 않는지 확인하는 용도입니다.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from io import BytesIO
+
+    rows_per_file = max(1, n // args.parse_files)
+    files = []
+    for i in range(args.parse_files):
+        buffer = BytesIO()
+        make_activity_frame(rows_per_file, seed=i).to_excel(buffer, index=False)
+        files.append((f"{i:02d}.xlsx", buffer.getvalue()))
+
+    metrics = {"files": len(files), "rows_per_file": rows_per_file}
+    started = time.perf_counter()
+    sm_sheets.parse_upload_files(files, sm_sheets.ACTIVITY_REQUIRED_COLUMNS)
+    metrics["sequential_s"] = round(time.perf_counter() - started, 4)
+
+    workers = min(4, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        started = time.perf_counter()
+        sm_sheets.parse_upload_files(files, sm_sheets.ACTIVITY_REQUIRED_COLUMNS, executor=pool)
+        metrics["thread_pool_s"] = round(time.perf_counter() - started, 4)
+    metrics["workers"] = workers
+    metrics["engine"] = sm_sheets.excel_engine()
+    metrics["speedup"] = round(metrics["sequential_s"] / metrics["thread_pool_s"], 2)
+    return [{"name": "multi_file_parse", "params": {"rows": n}, "metrics": metrics}]
+
+
+def bench_legacy_backfill(args, n):
+    """
+    n행짜리 예전 엑셀 파일을 절반이 이미 기록된 시트로 이관합니다.
+    UI 업로드 배치(25행/3초)로 같은 행을 추가할 때의 예상 호출 수와 함께 기록합니다.
+    """
+    import tempfile
+
+    values = make_sheet_values("activity", n, shuffled=True, seed=n)
+    client = FakeClient(make_backend(args))
+    worksheet = client.seed_spreadsheet(DEFAULT_SPREADSHEET).seed_worksheet(
+        ACTIVITY_WORKSHEET, values[:1 + n // 2]
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "legacy.xlsx")
+        pd.DataFrame(values[1:], columns=values[0]).to_excel(path, index=False)
+        started = time.perf_counter()
+        rows_by_kind, _ = legacy_backfill.collect_legacy_rows([path])
+        read_s = time.perf_counter() - started
+
+    results = {}
+    with virtual_sleep(client.backend.clock):
+        metrics = measure(client, lambda: results.update(
+            legacy_backfill.backfill_worksheet(worksheet, "activity", rows_by_kind["activity"])
+        ))
+    metrics["read_s"] = round(read_s, 4)
+    metrics.update(results)
+    metrics["ui_upload_append_calls"] = -(-results["new"] // sm_sheets.UPLOAD_BATCH_SIZE)
+    return [{"name": "legacy_backfill", "params": {"rows": n, "existing_rows": n // 2}, "metrics": metrics}]
+
+
+def bench_export(args, n):
+    activity_df = sm_sheets.values_to_dataframe(make_sheet_values("activity", n))
+    inquiry_df = sm_sheets.values_to_dataframe(make_sheet_values("inquiry", n))
+    started = time.perf_counter()
+    buffer = sm_sheets.build_excel_file([
+        (ACTIVITY_WORKSHEET, activity_df, sm_sheets.ACTIVITY_COLUMN_WIDTHS),
+        (INQUIRY_WORKSHEET, inquiry_df, sm_sheets.INQUIRY_COLUMN_WIDTHS),
+    ])
+    wall = time.perf_counter() - started
+    return [{"name": "combined_export", "params": {"rows_per_sheet": n},
+             "metrics": {"wall_s": round(wall, 4), "bytes": len(buffer.getvalue())}}]
+
+
+def bench_snapshot_frames(args, n, accesses=4):
+    """
+    한 번의 화면 실행에서 같은 워크시트 데이터를 여러 번(탭 조회, 입력, 다운로드) 사용할 때
+    접근할 때마다 데이터프레임으로 변환하는 경우와 스냅샷 버전마다 한 번 만든 읽기 전용 데이터프레임을 공유하는 경우 비교
+    """
+    values = make_sheet_values("activity", n)
+    started = time.perf_counter()
+    snapshot = WorksheetSnapshot(1, values, time.time())
+    freeze = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(accesses):
+        sm_sheets.values_to_dataframe(values)
+    per_access = time.perf_counter() - started
+
+    started = time.perf_counter()
+    sm_sheets.values_to_dataframe(snapshot.values, read_only=True)
+    shared = time.perf_counter() - started
+    return [{"name": "snapshot_frames", "params": {"rows": n, "accesses": accesses},
+             "metrics": {"freeze_s": round(freeze, 4), "per_access_decode_s": round(per_access, 4),
+                         "shared_decode_s": round(shared, 4)}}]
+
+
+def bench_all_documents_export(args, existing_rows):
+    """
+    모든 문서 통합 다운로드를 캐시가 빈 상태에서 실행합니다. 문서/워크시트를 동시에 조회하므로
+    지연 시간을 실제로 기다리는 시계를 사용해 조회 구간 시간(fetch_s)을 측정합니다.
+    """
+    from rerun_profiler import get_rerun_profiler
+
+    client = FakeClient(FakeBackend(latency=args.latency, clock=RealClock()))
+    seed_documents(client, existing_rows)
+    results = []
+    with app_with_fake_client(client) as at:
+        at.run()
+        for layout in ("문서별 시트", "워크시트별로 합치기"):
+            # 화면 실행 중 읽어 둔 스냅샷을 비워 모든 워크시트를 새로 조회
+            at.button[[b.label for b in at.button].index("캐시 수동 갱신")].click().run()
+            at.radio(key="export_scope").set_value("모든 문서").run()
+            at.radio(key="export_layout").set_value(layout).run()
+
+            def export():
+                at.button[[b.label for b in at.button].index("전체 데이터 엑셀 파일 다운로드")].click().run()
+            metrics = measure(client, export)
+            metrics["fetch_s"] = round(get_rerun_profiler().sections["모든 문서 조회"].recent[-1], 4)
+            metrics["errors"] = [e.value for e in at.error]
+            results.append({"name": "all_documents_export",
+                            "params": {"layout": layout, "existing_rows": existing_rows}, "metrics": metrics})
+    return results
+
+
+def bench_grid_edit(args, existing_rows):
+    """
+    편집 그리드에서 결과 일괄 변경을 저장합니다. 바뀐 셀 수와 관계없이 저장 요청은
+    충돌 확인용 batch_get 1회와 batch_update 1회여야 합니다.
+    """
+    client = FakeClient(make_backend(args))
+    seed_documents(client, existing_rows)
+    with app_with_fake_client(client) as at:
+        at.run()
+        at.toggle(key="activity_edit_mode").set_value(True).run()
+        at.multiselect(key="sm_activity_editor_bulk_current").set_value(["진행 중", "완료"]).run()
+        at.selectbox(key="sm_activity_editor_bulk_new").set_value("보류").run()
+        save = next(b for b in at.button if b.key == "sm_activity_editor_save")
+        changed_cells = int(save.label.split("(")[1].split("개")[0])
+        metrics = measure(client, save.click().run)
+        metrics["changed_cells"] = changed_cells
+        metrics["errors"] = [e.value for e in at.error]
+    return [{"name": "grid_edit", "params": {"edit": "bulk_status", "existing_rows": existing_rows},
+             "metrics": metrics}]
+
+
+def bench_recurring_generation(args, existing_rows, year=2024, month=3):
+    """
+    기본 정기 작업 템플릿으로 한 달 치 행을 생성해 추가합니다. 기본 배치 크기로 나누어 추가하는 경우와
+    한 번에 추가하는 경우의 API 호출 수/시간을 비교하고, 같은 월을 다시 생성하면 추가되는 행이 없어야 합니다.
+    """
+    from recurring_tasks import DEFAULT_RECURRING_TASKS, build_recurring_rows
+
+    key_indices = sm_sheets.dedup_key_indices(sm_sheets.ACTIVITY_HEADERS, sm_sheets.ACTIVITY_DEDUP_KEY_COLUMNS)
+    date_idx = sm_sheets.ACTIVITY_DATE_COL_IDX
+    results = []
+    for mode, batch_size in (("default_batches", sm_sheets.UPLOAD_BATCH_SIZE), ("single_append", None)):
+        client = FakeClient(make_backend(args))
+        values = make_sheet_values("activity", existing_rows, seed=existing_rows)
+        worksheet = client.seed_spreadsheet(DEFAULT_SPREADSHEET, {ACTIVITY_WORKSHEET: values}) \
+            .seed_worksheet(ACTIVITY_WORKSHEET, values)
+        added = []
+
+        def generate():
+            data = worksheet.get_all_values()
+            rows = build_recurring_rows(DEFAULT_RECURRING_TASKS, year, month, len(data) - 1)
+            new_rows, _ = sm_sheets.split_duplicate_rows(
+                rows, sm_sheets.build_dedup_index(data, key_indices, date_idx), key_indices, date_idx, len(data) - 1
+            )
+            added.append(len(new_rows))
+            if new_rows:
+                sm_sheets.append_rows_in_batches(worksheet, new_rows, batch_size=batch_size or len(new_rows))
+                sm_sheets.sort_worksheet_by_date(worksheet, date_col_idx=date_idx)
+
+        with virtual_sleep(client.backend.clock):
+            metrics = measure(client, generate)
+            # 같은 월을 다시 생성
+            generate()
+        metrics["rows_added"], metrics["rerun_rows_added"] = added
+        results.append({"name": "recurring_generation",
+                        "params": {"existing_rows": existing_rows, "month": f"{year}{month:02d}", "mode": mode},
+                        "metrics": metrics})
+    return results
+
+
+def bench_upload_rollback(args, n):
+    """
+    기존 n행에 n행을 업로드하고 정렬한 뒤 작업 ID로 되돌립니다. 업로드한 행이 정렬로 흩어져 있어도
+    되돌리기는 최신 데이터 조회 1회와 삭제 batch_update 1회여야 하고, 시트는 업로드 전과 같아야 합니다.
+    업로드한 행과 같은 내용의 행이 따로 있으면 어느 행인지 알 수 없으므로 아무것도 삭제하지 않아야 합니다.
+    """
+    import tempfile
+    from upload_jobs import UploadJobRunner
+    from upload_journal import UploadJournal
+
+    client = FakeClient(make_backend(args))
+    values = make_sheet_values("activity", n, seed=n)
+    worksheet = client.seed_spreadsheet(DEFAULT_SPREADSHEET, {ACTIVITY_WORKSHEET: values}) \
+        .seed_worksheet(ACTIVITY_WORKSHEET, values)
+    key_indices = sm_sheets.dedup_key_indices(sm_sheets.ACTIVITY_HEADERS, sm_sheets.ACTIVITY_DEDUP_KEY_COLUMNS)
+    date_idx = sm_sheets.ACTIVITY_DATE_COL_IDX
+    # 화면 업로드와 같이 이미 기록된 행은 제외
+    rows, _ = sm_sheets.split_duplicate_rows(
+        make_sheet_values("activity", n, seed=n + 1)[1:],
+        sm_sheets.build_dedup_index(values, key_indices, date_idx), key_indices, date_idx, n
+    )
+
+    with tempfile.TemporaryDirectory() as tmp, virtual_sleep(client.backend.clock):
+        runner = UploadJobRunner(journal_dir=tmp)
+        journal = UploadJournal.start("bench/activity", "activity", ACTIVITY_WORKSHEET, rows, journal_dir=tmp)
+        job = runner.submit(journal, worksheet, key_indices, date_idx, batch_size=len(rows))
+        while job.is_active:
+            time.sleep(0.01)
+        uploaded = [list(row) for row in worksheet.values]
+        row_numbers, _, _ = sm_sheets.find_rows_by_content(uploaded, job.load_batch_rows())
+
+        # 업로드한 행과 같은 내용의 행을 따로 추가하면 되돌리지 않아야 함 (확인 후 그 행만 삭제)
+        worksheet.append_rows([list(rows[0])])
+        try:
+            runner.rollback(job.job_id, worksheet)
+            ambiguous_aborted = False
+        except Exception:
+            ambiguous_aborted = worksheet.values[:-1] == uploaded
+        sm_sheets.delete_sheet_rows(worksheet, [len(worksheet.values)])
+
+        outcome = {}
+        metrics = measure(client, lambda: outcome.update(
+            zip(("values", "deleted"), runner.rollback(job.job_id, worksheet))))
+    metrics["ambiguous_aborted"] = ambiguous_aborted
+    metrics["deleted_rows"] = outcome["deleted"]
+    metrics["delete_ranges"] = len(sm_sheets.contiguous_row_ranges(row_numbers))
+    metrics["restored"] = worksheet.values == values and outcome["values"] == values
+    return [{"name": "upload_rollback", "params": {"existing_rows": n, "uploaded_rows": len(rows)},
+             "metrics": metrics}]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def run(args):
+    results = []
+    results += bench_api_calls_per_rerun(args, args.existing_rows)
+    results += bench_rerun_sections(args, args.existing_rows)
+    results += bench_submit_latency(args, args.existing_rows)
+    results += bench_cache_stampede(args, args.existing_rows)
+    results += bench_outage_render(args, args.existing_rows)
+    results += bench_all_documents_export(args, args.existing_rows)
+    results += bench_grid_edit(args, args.existing_rows)
+    results += bench_recurring_generation(args, args.existing_rows)
+    for n in args.sizes:
+        results += bench_bulk_upload(args, "activity", n)
+        results += bench_bulk_upload(args, "inquiry", n)
+        results += bench_dedup(args, n)
+        results += bench_sort(args, n)
+        results += bench_snapshot_frames(args, n)
+        results += bench_date_range_read(args, n)
+        results += bench_projected_reads(args, n)
+        results += bench_sla_metrics(args, n)
+        results += bench_upload_rollback(args, n)
+        results += bench_reconcile(args, n)
+        if n <= args.max_export_rows:
+            results += bench_upload_readers(args, n)
+            results += bench_multi_file_parse(args, n)
+            results += bench_legacy_backfill(args, n)
+            results += bench_export(args, n)
+    return {
+        "schema_version": RESULT_SCHEMA_VERSION,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "latency_s": args.latency,
+            "read_quota_per_minute": args.read_quota,
+            "write_quota_per_minute": args.write_quota,
+            "sizes": args.sizes,
+            "existing_rows": args.existing_rows,
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SM Activity 앱 벤치마크 (가짜 Google Sheets 백엔드 사용)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="일괄 업로드/정렬 벤치마크 행 수")
+    parser.add_argument("--max-export-rows", type=int, default=10000,
+                        help="엑셀 내보내기를 측정할 최대 행 수")
+    parser.add_argument("--parse-files", type=int, default=8,
+                        help="여러 파일 업로드 벤치마크에서 나눌 파일 수")
+    parser.add_argument("--existing-rows", type=int, default=500,
+                        help="화면/제출 벤치마크용으로 미리 채워 둘 행 수")
+    parser.add_argument("--sessions", type=int, default=20,
+                        help="동시 캐시 조회 벤치마크의 세션 수")
+    parser.add_argument("--latency", type=float, default=0.15, help="API 호출당 가상 지연 시간(초)")
+    parser.add_argument("--read-quota", type=int, default=DEFAULT_READ_QUOTA_PER_MINUTE,
+                        help="분당 읽기 할당량")
+    parser.add_argument("--write-quota", type=int, default=DEFAULT_WRITE_QUOTA_PER_MINUTE,
+                        help="분당 쓰기 할당량")
+    parser.add_argument("--output", help="결과 JSON 을 저장할 파일 경로")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
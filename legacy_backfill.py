@@ -0,0 +1,319 @@
+# 로컬 엑셀 시절 기록을 Google Sheets 로 옮기는 일괄 이관 도구
+# data/ 폴더와 루트의 예전 엑셀 파일을 한 행씩 읽어 SM Activity/현업문의 양식으로 변환하고,
+# 이미 시트에 있는 행과 파일 사이의 중복을 제외한 뒤 큰 배치로 추가하고 마지막에 한 번만 정렬합니다.
+# 이미 추가된 행은 중복으로 제외되므로 중간에 실패해도 같은 명령을 다시 실행하면 이어서 진행됩니다.
+#
+# 사용 예:
+#   python legacy_backfill.py --dry-run
+#   python legacy_backfill.py --spreadsheet "SM Activity Dashboard"
+#   python legacy_backfill.py data/SM_Activity_Dashboard.xlsx --credentials service_account.json
+import argparse
+from datetime import date, datetime
+import glob
+import json
+import os
+import sys
+import time
+
+from sm_sheets import (
+    ACTIVITY_HEADERS, INQUIRY_HEADERS, ACTIVITY_DATE_COL_IDX, INQUIRY_DATE_COL_IDX,
+    ACTIVITY_DEDUP_KEY_COLUMNS, INQUIRY_DEDUP_KEY_COLUMNS,
+    append_rows_in_batches, build_dedup_index, dedup_key_indices, parse_sheet_date,
+    sort_worksheet_by_date, split_duplicate_rows,
+)
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 기본 이관 대상 파일 (로컬 엑셀 시절 파일)
+LEGACY_FILE_PATTERNS = [
+    "data/SM_Activity_Dashboard.xlsx",
+    "data/SM_Activity_New_Format*.xlsx",
+    "data/Meeting_Record.xlsx",
+    "SM_Activity_*.xlsx",
+]
+
+# 이관 배치 설정 (UI 업로드보다 훨씬 큰 배치로 추가하고 정렬 결과도 크게 나누어 씀)
+BACKFILL_BATCH_SIZE = 2000  # 한 번에 추가할 최대 행 수
+BACKFILL_BATCH_DELAY = 1  # 배치 사이 대기 시간(초)
+BACKFILL_SORT_BATCH_SIZE = 20000  # 정렬 결과를 한 번에 쓸 최대 행 수
+
+# 대상 시트 설정
+BACKFILL_TARGETS = {
+    "activity": {
+        "worksheet_name": "SM Activity",
+        "headers": ACTIVITY_HEADERS,
+        "date_col_idx": ACTIVITY_DATE_COL_IDX,
+        "dedup_key_columns": ACTIVITY_DEDUP_KEY_COLUMNS,
+    },
+    "inquiry": {
+        "worksheet_name": "현업문의",
+        "headers": INQUIRY_HEADERS,
+        "date_col_idx": INQUIRY_DATE_COL_IDX,
+        "dedup_key_columns": INQUIRY_DEDUP_KEY_COLUMNS,
+    },
+}
+
+# 예전 엑셀 양식 (헤더로 구분)
+# columns: {대상 열: 원본 열} - 원본에 없는 열은 아래 기본값 규칙으로 채움
+LEGACY_LAYOUTS = [
+    {
+        # 현재와 같은 13열 양식 (SM_Activity_Dashboard.xlsx, SM_Activity_New_Format*.xlsx)
+        "name": "SM Activity",
+        "kind": "activity",
+        "headers": ACTIVITY_HEADERS,
+        "columns": {column: column for column in ACTIVITY_HEADERS},
+    },
+    {
+        # 초기 자동 생성 양식 (SM_Activity_Auto_Streamlit.xlsx) - TASK 열 없이 작업유형에 작업명을 기록함
+        "name": "SM Activity (초기 양식)",
+        "kind": "activity",
+        "headers": ["NO", "요청일", "구분", "작업유형", "요청자", "작성일자"],
+        "columns": {
+            "요청일": "요청일", "구분": "구분", "작업유형": "작업유형", "TASK": "작업유형",
+            "요청자": "요청자", "작업일": "작성일자",
+        },
+    },
+    {
+        # 현업문의 양식
+        "name": "현업문의",
+        "kind": "inquiry",
+        "headers": INQUIRY_HEADERS,
+        "columns": {column: column for column in INQUIRY_HEADERS},
+    },
+]
+
+
+def legacy_cell_text(value):
+    """엑셀 셀 값을 시트에 기록할 문자열로 변환합니다."""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def find_legacy_layout(header):
+    """헤더 행에 맞는 예전 양식을 찾습니다. 없으면 None을 반환합니다."""
+    names = {legacy_cell_text(value) for value in header}
+    for layout in LEGACY_LAYOUTS:
+        if set(layout["headers"]) <= names:
+            return layout
+    return None
+
+
+def convert_legacy_row(layout, header_index, values):
+    """
+    예전 양식의 행 하나를 대상 시트 행으로 변환합니다.
+    요청일을 날짜로 해석할 수 없으면 ValueError를 발생시킵니다.
+    """
+    target = BACKFILL_TARGETS[layout["kind"]]
+    record = {}
+    for column, source in layout["columns"].items():
+        i = header_index[source]
+        record[column] = legacy_cell_text(values[i]) if i < len(values) else ""
+
+    req_date = parse_sheet_date(record.get("요청일", ""))
+    if req_date.year == 1900:
+        raise ValueError(f"요청일을 해석할 수 없습니다: {record.get('요청일', '')!r}")
+    record["요청일"] = req_date.strftime("%Y-%m-%d")
+    # 원본에 없는 열 채우기 (월은 요청일 기준, 작업일/답변일은 요청일, 내용은 TASK)
+    if not record.get("월"):
+        record["월"] = req_date.strftime("%Y%m")
+    if layout["kind"] == "activity":
+        record["작업일"] = record.get("작업일") or record["요청일"]
+        record["내용"] = record.get("내용") or record.get("TASK", "")
+    else:
+        record["답변일"] = record.get("답변일") or record["요청일"]
+    return [record.get(column, "") for column in target["headers"]]
+
+
+def iter_legacy_rows(path):
+    """
+    엑셀 파일의 모든 시트를 한 행씩 읽습니다. (읽기 전용 모드로 파일 전체를 메모리에 올리지 않음)
+    반환값(제너레이터): (시트 이름, 양식 또는 None, 엑셀 행 번호, 변환된 행 또는 None, 오류 메시지 또는 None)
+    양식을 알 수 없는 시트는 행 없이 (시트 이름, None, 0, None, 사유) 한 번만 반환합니다.
+    """
+    import openpyxl  # 엑셀 파일 읽기
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            layout = find_legacy_layout(header or [])
+            if layout is None:
+                yield sheet.title, None, 0, None, "SM Activity/현업문의 양식이 아니므로 건너뜁니다."
+                continue
+            header_index = {legacy_cell_text(value): i for i, value in enumerate(header)}
+            for row_number, values in enumerate(rows, 2):
+                # 빈 행은 건너뜀
+                if not any(legacy_cell_text(value) for value in values):
+                    continue
+                try:
+                    yield sheet.title, layout, row_number, convert_legacy_row(layout, header_index, values), None
+                except ValueError as e:
+                    yield sheet.title, layout, row_number, None, str(e)
+    finally:
+        workbook.close()
+
+
+def collect_legacy_rows(paths):
+    """
+    여러 파일의 행을 대상 시트별로 모읍니다.
+    파일은 한 행씩 읽지만, 시트 전체를 한 번에 중복 확인하고 요청일 순서로 추가하기 위해 변환된 행은 모두 메모리에 모읍니다.
+    반환값: ({"activity": [행, ...], "inquiry": [...]}, [(파일, 시트, 양식 이름, 읽은 행 수, 오류 목록), ...])
+    """
+    rows_by_kind = {kind: [] for kind in BACKFILL_TARGETS}
+    sources = []
+    for path in paths:
+        summary = {}
+        for sheet_title, layout, row_number, row, error in iter_legacy_rows(path):
+            entry = summary.setdefault(sheet_title, [layout["name"] if layout else None, 0, []])
+            if row is not None:
+                rows_by_kind[layout["kind"]].append(row)
+                entry[1] += 1
+            elif layout is None:
+                entry[2].append(error)
+            else:
+                entry[2].append(f"{row_number}행: {error}")
+        for sheet_title, (layout_name, count, errors) in summary.items():
+            sources.append((path, sheet_title, layout_name, count, errors))
+    return rows_by_kind, sources
+
+
+def backfill_worksheet(worksheet, kind, rows, dry_run=False, batch_size=BACKFILL_BATCH_SIZE,
+                       delay=BACKFILL_BATCH_DELAY, sort_batch_size=BACKFILL_SORT_BATCH_SIZE, on_progress=None):
+    """
+    시트에 없는 행만 요청일 순서로 추가하고 마지막에 한 번 정렬합니다.
+    worksheet 가 None 이면 (dry_run 에서 아직 없는 시트) 빈 시트로 보고 추가될 행 수만 계산합니다.
+    반환값: {"new": 추가할 행 수, "duplicates": 중복으로 제외한 행 수, "added": 실제로 추가한 행 수}
+    """
+    target = BACKFILL_TARGETS[kind]
+    date_col_idx = target["date_col_idx"]
+    key_indices = dedup_key_indices(target["headers"], target["dedup_key_columns"])
+
+    # 시트 데이터는 중복 확인을 위해 한 번만 읽음
+    existing = worksheet.get_all_values() if worksheet is not None else []
+    current_row_count = len(existing) - 1 if len(existing) > 0 else 0
+    rows = sorted(rows, key=lambda row: row[date_col_idx])
+    new_rows, duplicates = split_duplicate_rows(
+        rows, build_dedup_index(existing, key_indices, date_col_idx), key_indices, date_col_idx, current_row_count
+    )
+    result = {"new": len(new_rows), "duplicates": len(duplicates), "added": 0}
+    if dry_run or not new_rows:
+        return result
+
+    # 빈 시트면 헤더부터 기록
+    if not existing:
+        worksheet.append_row(target["headers"])
+
+    result["added"] = append_rows_in_batches(worksheet, new_rows, batch_size, delay, on_progress=on_progress)
+
+    # 모든 행을 추가한 뒤 한 번만 정렬
+    sort_worksheet_by_date(worksheet, date_col_idx=date_col_idx, batch_size=sort_batch_size, delay=delay)
+    return result
+
+
+def load_service_account_info(credentials_path=None):
+    """서비스 계정 정보: --credentials JSON 파일 또는 .streamlit/secrets.toml 의 gcp_service_account"""
+    if credentials_path:
+        with open(credentials_path, encoding="utf-8") as f:
+            return json.load(f)
+    import tomllib  # secrets.toml 읽기
+
+    for path in (os.path.join(REPO_ROOT, ".streamlit", "secrets.toml"),
+                 os.path.join(os.path.expanduser("~"), ".streamlit", "secrets.toml")):
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                secrets = tomllib.load(f)
+            if "gcp_service_account" in secrets:
+                return secrets["gcp_service_account"]
+    raise Exception("서비스 계정 정보를 찾을 수 없습니다. --credentials 로 JSON 파일을 지정하세요.")
+
+
+def authorize(credentials_path=None):
+    import gspread  # Google Sheets API 연동
+    from google.oauth2.service_account import Credentials  # Google API 인증
+
+    scope = [
+        'https://spreadsheets.google.com/feeds',
+        'https://www.googleapis.com/auth/spreadsheets',
+        'https://www.googleapis.com/auth/drive'
+    ]
+    credentials = Credentials.from_service_account_info(load_service_account_info(credentials_path), scopes=scope)
+    return gspread.authorize(credentials)
+
+
+def open_target_worksheet(spreadsheet, kind, dry_run=False):
+    """
+    대상 워크시트를 열고, 없으면 헤더와 함께 만듭니다.
+    dry_run 이면 시트를 만들지 않고 None 을 반환합니다. (빈 시트로 간주)
+    """
+    import gspread  # Google Sheets API 연동
+
+    target = BACKFILL_TARGETS[kind]
+    try:
+        return spreadsheet.worksheet(target["worksheet_name"])
+    except gspread.exceptions.WorksheetNotFound:
+        if dry_run:
+            return None
+        worksheet = spreadsheet.add_worksheet(title=target["worksheet_name"], rows=1000, cols=20)
+        worksheet.append_row(target["headers"])
+        return worksheet
+
+
+def default_legacy_files():
+    paths = []
+    for pattern in LEGACY_FILE_PATTERNS:
+        for path in sorted(glob.glob(os.path.join(REPO_ROOT, pattern))):
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def run(args, client=None):
+    paths = args.files or default_legacy_files()
+    rows_by_kind, sources = collect_legacy_rows(paths)
+    report = {"spreadsheet": args.spreadsheet, "dry_run": args.dry_run, "sources": [], "targets": {}}
+    for path, sheet_title, layout_name, count, errors in sources:
+        report["sources"].append({
+            "file": os.path.relpath(path, REPO_ROOT), "sheet": sheet_title, "layout": layout_name,
+            "rows": count, "errors": errors,
+        })
+
+    if client is None:
+        client = authorize(args.credentials)
+    spreadsheet = client.open(args.spreadsheet)
+    for kind, rows in rows_by_kind.items():
+        if not rows:
+            continue
+        worksheet = open_target_worksheet(spreadsheet, kind, dry_run=args.dry_run)
+        started = time.perf_counter()
+        result = backfill_worksheet(
+            worksheet, kind, rows, dry_run=args.dry_run, batch_size=args.batch_size,
+            on_progress=lambda done, total: print(f"  {worksheet.title}: {done}/{total}행 추가", file=sys.stderr),
+        )
+        result["seconds"] = round(time.perf_counter() - started, 2)
+        report["targets"][BACKFILL_TARGETS[kind]["worksheet_name"]] = result
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="예전 엑셀 기록을 Google Sheets 로 일괄 이관")
+    parser.add_argument("files", nargs="*", help="이관할 엑셀 파일 (기본값: data/ 와 루트의 예전 파일)")
+    parser.add_argument("--spreadsheet", default="SM Activity Dashboard", help="대상 스프레드시트 이름")
+    parser.add_argument("--credentials", help="서비스 계정 JSON 파일 (기본값: .streamlit/secrets.toml)")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="한 번에 추가할 행 수")
+    parser.add_argument("--dry-run", action="store_true", help="시트에 쓰지 않고 추가될 행 수만 확인")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    report = run(parse_args(argv))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
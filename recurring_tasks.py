@@ -0,0 +1,112 @@
+# 정기 작업 템플릿과 월 단위 일괄 생성
+# 매일/평일/매월 반복되는 정기 작업(조간점검, 월정기작업 등)을 템플릿으로 저장해 두고,
+# 선택한 월의 SM Activity 행을 한 번에 만듭니다. 같은 월을 다시 생성해도 요청일·TASK·요청자가 같은
+# 행은 중복 확인에서 제외되므로 결과가 같습니다.
+#
+# 템플릿 파일: data/recurring_tasks.json (없으면 기본 템플릿 사용)
+import calendar
+from datetime import date
+import json
+import os
+
+from upload_journal import write_json_atomic
+
+# 템플릿 저장 위치
+RECURRING_TASKS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "recurring_tasks.json")
+
+# 반복 주기
+SCHEDULE_DAILY = "매일"
+SCHEDULE_WEEKDAY = "평일"  # 월~금 (공휴일은 구분하지 않음)
+SCHEDULE_MONTHLY = "매월"  # '일' 열의 날짜 (그 달에 없는 날짜면 말일)
+SCHEDULES = [SCHEDULE_DAILY, SCHEDULE_WEEKDAY, SCHEDULE_MONTHLY]
+
+# 템플릿 열 (화면 편집 순서)
+TEMPLATE_COLUMNS = ["TASK", "작업유형", "주기", "일", "요청자", "IT", "CNS", "개발자", "결과"]
+
+# 기본 템플릿
+DEFAULT_RECURRING_TASKS = [
+    {"TASK": "조간점검", "작업유형": "조간점검", "주기": SCHEDULE_DAILY, "일": None,
+     "요청자": "", "IT": "한상욱", "CNS": "이정인", "개발자": "위승빈", "결과": "완료"},
+    {"TASK": "월정기작업", "작업유형": "월정기작업", "주기": SCHEDULE_MONTHLY, "일": 1,
+     "요청자": "", "IT": "한상욱", "CNS": "이정인", "개발자": "위승빈", "결과": "완료"},
+]
+
+
+def normalize_recurring_task(task):
+    """
+    화면에서 편집한 템플릿 한 건을 저장 형식으로 정리합니다. (빈 값/NaN 처리)
+    TASK 가 없거나 주기를 알 수 없으면 None 을 반환합니다.
+    """
+    def text(value):
+        # 편집 그리드의 빈 칸은 None 또는 NaN 으로 전달됨
+        if value is None or value != value:
+            return ""
+        return str(value).strip()
+
+    normalized = {column: text(task.get(column)) for column in TEMPLATE_COLUMNS if column != "일"}
+    if not normalized["TASK"] or normalized["주기"] not in SCHEDULES:
+        return None
+    day = task.get("일")
+    normalized["일"] = None
+    if normalized["주기"] == SCHEDULE_MONTHLY:
+        try:
+            normalized["일"] = min(max(int(float(day)), 1), 31)
+        except (TypeError, ValueError):
+            normalized["일"] = 1
+    return {column: normalized[column] for column in TEMPLATE_COLUMNS}
+
+
+def load_recurring_tasks(path=RECURRING_TASKS_PATH):
+    """저장된 템플릿 목록 (파일이 없으면 기본 템플릿)"""
+    if not os.path.exists(path):
+        return [dict(task) for task in DEFAULT_RECURRING_TASKS]
+    with open(path, encoding="utf-8") as f:
+        return [task for task in map(normalize_recurring_task, json.load(f)) if task is not None]
+
+
+def save_recurring_tasks(tasks, path=RECURRING_TASKS_PATH):
+    """템플릿 목록을 저장하고 저장한 (정리된) 목록을 반환합니다."""
+    tasks = [task for task in map(normalize_recurring_task, tasks) if task is not None]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_json_atomic(path, tasks)
+    return tasks
+
+
+def schedule_dates(task, year, month):
+    """템플릿의 주기에 따라 해당 월에 작업할 날짜 목록"""
+    last_day = calendar.monthrange(year, month)[1]
+    if task["주기"] == SCHEDULE_MONTHLY:
+        return [date(year, month, min(task["일"] or 1, last_day))]
+    days = [date(year, month, day) for day in range(1, last_day + 1)]
+    if task["주기"] == SCHEDULE_WEEKDAY:
+        days = [day for day in days if day.weekday() < 5]
+    return days
+
+
+def build_recurring_rows(tasks, year, month, current_row_count):
+    """
+    템플릿 목록으로 해당 월의 SM Activity 행 목록을 만듭니다. (요청일 순서)
+    요청일과 작업일은 작업 날짜, 구분은 '정기', 내용은 TASK 와 같게 기록합니다.
+    """
+    entries = sorted(
+        ((day, task) for task in tasks for day in schedule_dates(task, year, month)),
+        key=lambda entry: entry[0],
+    )
+    rows = []
+    for offset, (day, task) in enumerate(entries, 1):
+        rows.append([
+            str(current_row_count + offset),  # NO
+            day.strftime("%Y%m"),  # 월
+            "정기",  # 구분
+            task["작업유형"],
+            task["TASK"],
+            day.strftime("%Y-%m-%d"),  # 요청일
+            day.strftime("%Y-%m-%d"),  # 작업일
+            task["요청자"],
+            task["IT"],
+            task["CNS"],
+            task["개발자"],
+            task["TASK"],  # 내용
+            task["결과"] or "완료",
+        ])
+    return rows
@@ -0,0 +1,255 @@
+# 화면 실행(rerun) 구간별 시간 측정과 cProfile 수집
+# 스크립트의 주요 구간(시작, 스프레드시트 목록, 사이드바, 통합 다운로드, 탭, 엑셀 생성)의 실행 시간을
+# 프로세스 단위로 모아 최근 값 기준 p50/p95 를 계산합니다.
+# 관리자가 요청하면 현재 세션의 다음 N회 실행을 cProfile 로 수집해 내려받을 수 있게 합니다.
+# cProfile 은 가장 바깥 구간(profile_section)에서 켜고 끄므로 st.stop/st.rerun 으로 실행이 중단되어도
+# 켠 스레드에서 끕니다. (구간 밖의 세션 상태 초기화, 함수 정의 등은 수집하지 않음)
+from collections import deque
+from contextlib import contextmanager
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# 구간별 최근 실행 시간 보관 개수 (백분위수 계산용)
+RECENT_SECTION_DURATIONS = 200
+# 전체 실행 시간을 기록하는 구간 이름
+TOTAL_SECTION = "전체 실행"
+# 한 번에 수집할 수 있는 최대 실행 수
+MAX_CAPTURE_RERUNS = 20
+# 프로파일 보고서에 표시할 함수 수
+PROFILE_REPORT_LINES = 60
+
+
+class SectionStats:
+    """구간 하나의 실행 횟수와 최근 실행 시간"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.recent = deque(maxlen=RECENT_SECTION_DURATIONS)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        self.recent.append(seconds)
+
+    def percentile(self, q):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+            "max_seconds": max(self.recent) if self.recent else None,
+        }
+
+
+class RerunProfiler:
+    """프로세스 단위 구간별 실행 시간 통계 (모든 세션이 공유)"""
+
+    def __init__(self):
+        self.sections = {}
+        self._lock = threading.Lock()
+
+    def observe(self, section, seconds):
+        with self._lock:
+            self.sections.setdefault(section, SectionStats()).observe(seconds)
+
+    def to_dict(self):
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self.sections.items()}
+
+
+@st.cache_resource
+def get_rerun_profiler():
+    return RerunProfiler()
+
+
+def _in_script():
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+
+def record_section(section, started):
+    """perf_counter() 기준 started 부터 지금까지를 구간 실행 시간으로 기록합니다."""
+    seconds = time.perf_counter() - started
+    get_rerun_profiler().observe(section, seconds)
+    if _in_script():
+        current = st.session_state.get("rerun_profile_current")
+        if current is not None:
+            current[section] = current.get(section, 0.0) + seconds
+
+
+def _enable_capture_profile():
+    """
+    이번 실행의 cProfile 을 수집 중이고 아직 켜져 있지 않으면 켜고 (수집 정보, 프로파일) 을 반환합니다.
+    이미 바깥 구간에서 켰거나 수집 중이 아니면 None 을 반환합니다.
+    """
+    if not _in_script():
+        return None
+    capture = st.session_state.get("rerun_profile_capture")
+    if capture is None or capture["profile"] is None or capture["enabled"]:
+        return None
+    profile = capture["profile"]
+    try:
+        profile.enable()
+    except ValueError:
+        # 다른 세션의 프로파일러가 켜져 있으면 (Python 3.12+) 이 구간은 건너뜀
+        return None
+    capture["enabled"] = True
+    return capture, profile
+
+
+@contextmanager
+def profile_section(section):
+    """
+    with 블록의 실행 시간을 구간 실행 시간으로 기록합니다. (st.stop/st.rerun 으로 중단되어도 기록)
+    cProfile 을 수집 중이면 가장 바깥 구간에서 켜고, 블록이 끝나면 (중단되어도) 같은 스레드에서 끕니다.
+    """
+    started = time.perf_counter()
+    enabled = _enable_capture_profile()
+    try:
+        yield
+    finally:
+        if enabled is not None:
+            capture, profile = enabled
+            profile.disable()
+            capture["enabled"] = False
+        record_section(section, started)
+
+
+def _finish_capture_rerun():
+    """직전 실행에서 수집한 cProfile 결과를 합칩니다. (프로파일은 구간이 끝날 때 이미 꺼져 있음)"""
+    capture = st.session_state.get("rerun_profile_capture")
+    if capture is None or capture["profile"] is None:
+        return
+    profile = capture["profile"]
+    capture["profile"] = None
+    profile.create_stats()
+    if not profile.stats:
+        return  # 구간에 들어가기 전에 끝난 실행은 세지 않음
+    if capture["stats"] is None:
+        capture["stats"] = pstats.Stats(profile)
+    else:
+        capture["stats"].add(profile)
+    capture["captured"] += 1
+    if capture["captured"] >= capture["reruns"]:
+        capture["report"] = _profile_report(capture["stats"])
+        capture["raw"] = marshal.dumps(capture["stats"].stats)
+
+
+def _profile_report(stats):
+    buffer = io.StringIO()
+    stats.stream = buffer
+    stats.sort_stats("cumulative").print_stats(PROFILE_REPORT_LINES)
+    return buffer.getvalue()
+
+
+def begin_profiled_rerun(fragment=None):
+    """
+    스크립트 실행(rerun) 시작 시 호출하고 시작 시각(perf_counter)을 반환합니다.
+    fragment 만 다시 실행될 때도 fragment 이름과 함께 호출합니다. (전체 실행 시간은 기록하지 않고 cProfile 수집 횟수에는 포함)
+    직전 실행의 구간 시간을 보관하고, 수집을 요청했으면 이번 실행의 cProfile 을 준비합니다. (구간에서 켜고 끔)
+    """
+    started = time.perf_counter()
+    # st.stop()/st.rerun() 으로 끝난 직전 실행의 수집 정리
+    _finish_capture_rerun()
+    previous = st.session_state.get("rerun_profile_current")
+    if previous:
+        st.session_state.rerun_profile_last = previous
+    st.session_state.rerun_profile_current = {}
+    st.session_state.rerun_profile_started = started if fragment is None else None
+
+    capture = st.session_state.get("rerun_profile_capture")
+    if capture is not None and capture["captured"] < capture["reruns"]:
+        capture["profile"] = cProfile.Profile()
+    return started
+
+
+def end_profiled_rerun():
+    """스크립트 마지막에 호출합니다. 전체 실행 시간을 기록하고 이번 실행의 cProfile 수집을 마칩니다."""
+    started = st.session_state.get("rerun_profile_started")
+    if started is not None:
+        record_section(TOTAL_SECTION, started)
+    _finish_capture_rerun()
+
+
+def start_capture(reruns):
+    """현재 세션의 다음 reruns 회 실행을 cProfile 로 수집합니다."""
+    st.session_state.rerun_profile_capture = {
+        "reruns": reruns,
+        "captured": 0,
+        "profile": None,
+        "enabled": False,  # 구간에서 프로파일을 켠 상태
+        "stats": None,
+        "report": None,
+        "raw": None,
+    }
+
+
+def cancel_capture():
+    # 켜져 있는 프로파일은 그 구간이 끝날 때 꺼짐
+    st.session_state.pop("rerun_profile_capture", None)
+
+
+def render_profiler_sidebar(admin=False):
+    """사이드바 '시스템 정보'에 구간별 실행 시간을 표시합니다. (admin: cProfile 수집 기능 표시)"""
+    with st.expander("화면 실행 구간별 시간"):
+        sections = get_rerun_profiler().to_dict()
+        last = st.session_state.get("rerun_profile_last", {})
+        if sections:
+            st.dataframe(
+                [
+                    {
+                        "구간": name,
+                        "직전(ms)": round(last[name] * 1000, 1) if name in last else None,
+                        "p50(ms)": round(stats["p50_seconds"] * 1000, 1),
+                        "p95(ms)": round(stats["p95_seconds"] * 1000, 1),
+                        "횟수": stats["count"],
+                    }
+                    for name, stats in sections.items()
+                ],
+                hide_index=True,
+            )
+            st.caption(f"최근 {RECENT_SECTION_DURATIONS}회 기준 (전체 세션) · 구간은 겹칠 수 있음 · "
+                       "직전 실행이 fragment 만 다시 실행한 것이면 직전(ms)은 그 fragment 구간만 표시")
+        else:
+            st.caption("아직 기록된 실행이 없습니다.")
+
+        if not admin:
+            return
+        st.markdown("**cProfile 수집 (관리자)**")
+        capture = st.session_state.get("rerun_profile_capture")
+        if capture is None:
+            reruns = st.number_input("수집할 실행 수", min_value=1, max_value=MAX_CAPTURE_RERUNS, value=3,
+                                     key="rerun_profile_reruns")
+            if st.button("다음 실행부터 수집 시작", key="rerun_profile_start"):
+                start_capture(int(reruns))
+                st.rerun()
+        elif capture["report"] is None:
+            st.info(f"수집 중: {capture['captured']}/{capture['reruns']}회 실행")
+            if st.button("수집 취소", key="rerun_profile_cancel"):
+                cancel_capture()
+                st.rerun()
+        else:
+            st.success(f"✅ {capture['reruns']}회 실행의 프로파일이 수집되었습니다.")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("보고서", data=capture["report"], file_name="rerun_profile.txt",
+                                   mime="text/plain", key="rerun_profile_txt")
+            with col2:
+                # pstats / snakeviz 로 열 수 있는 형식
+                st.download_button("pstats", data=capture["raw"], file_name="rerun_profile.prof",
+                                   mime="application/octet-stream", key="rerun_profile_prof")
+            if st.button("결과 삭제", key="rerun_profile_clear"):
+                cancel_capture()
+                st.rerun()
@@ -0,0 +1,371 @@
+# 워크시트 스냅샷 캐시 (stale-while-revalidate) 와 백그라운드 캐시 워머
+# 읽기는 항상 마지막으로 가져온 스냅샷을 바로 반환하고, 유효 시간이 지난 스냅샷은
+# 백그라운드 스레드에서 새로 가져옵니다. 워머 스레드는 모든 문서의 워크시트를 시작할 때
+# 미리 읽어 두고 유효 시간이 지나기 전에 주기적으로 갱신하므로, 화면 실행(rerun) 중에
+# get_all_values() 를 기다리는 경우는 캐시가 비어 있거나 데이터를 변경한 직후뿐입니다.
+# 같은 워크시트를 여러 세션이 동시에 새로 가져와야 할 때는 한 번만 조회하고 결과를 함께 사용합니다.
+# 새로 가져온 데이터는 저장된 스냅샷과 블록 해시로 비교해, 바뀐 블록이 없으면 스냅샷 버전을 유지합니다.
+# 워머와 '시트 직접 수정 확인'은 문서 수정 시각(Drive 메타데이터)이 마지막으로 전체를 읽을 때와 같으면 데이터를 다시 읽지 않습니다.
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+import itertools
+import logging
+import threading
+import time
+
+from sheet_reconcile import block_hashes, changed_blocks, changed_row_ranges, merge_blocks
+
+# 스냅샷 유효 시간(초) - 지나면 이전 스냅샷을 반환하면서 백그라운드에서 갱신
+SNAPSHOT_TTL = 300
+# 이보다 오래된 스냅샷은 반환하지 않고 바로 새로 가져옴 (워머가 멈춘 경우 대비)
+SNAPSHOT_MAX_STALE = 1800
+# 백그라운드 갱신 작업자 수
+REFRESH_WORKERS = 2
+
+# 워머가 스냅샷을 확인하는 주기(초)
+WARM_CHECK_INTERVAL = 30
+# 워머가 스냅샷을 갱신하는 기준 나이(초) - 유효 시간이 지나기 전에 갱신
+WARM_REFRESH_AGE = 240
+
+
+def worksheet_key(worksheet):
+    """캐시에서 워크시트를 구분하는 키 (스프레드시트 ID/워크시트 ID)"""
+    return f"{worksheet.spreadsheet_id}/{worksheet.id}"
+
+
+def derived_key(key, name):
+    """
+    워크시트 일부(날짜 열 등)를 따로 캐시할 때 사용하는 키
+    원래 워크시트 키를 무효화하면 파생된 키도 함께 무효화됩니다.
+    """
+    return f"{key}#{name}"
+
+
+class WorksheetSnapshot:
+    """한 시점의 워크시트 데이터 (여러 세션이 읽기 전용으로 공유)"""
+
+    def __init__(self, version, values, fetched_at, hashes=None, changed_rows=None):
+        self.version = version  # 프로세스 단위로 증가하는 스냅샷 번호
+        # 모든 세션이 복사 없이 같은 객체를 읽으므로 수정할 수 없는 튜플로 보관
+        self.values = tuple(tuple(row) for row in values)
+        self.fetched_at = fetched_at  # time.time() 기준
+        self._block_hashes = hashes
+        # 이전 스냅샷과 비교해 바뀐 시트 행 구간 [(첫 행, 마지막 행), ...] (처음 읽었으면 None)
+        self.changed_rows = changed_rows
+
+    @property
+    def block_hashes(self):
+        """행 블록별 해시 목록 (처음 사용할 때 한 번만 계산)"""
+        if self._block_hashes is None:
+            self._block_hashes = block_hashes(self.values)
+        return self._block_hashes
+
+    def refreshed(self, fetched_at=None):
+        """원본이 바뀌지 않은 것을 확인했을 때 사용하는 같은 버전의 스냅샷"""
+        return WorksheetSnapshot(self.version, self.values, fetched_at or time.time(), self._block_hashes, [])
+
+    def age(self, now=None):
+        return (now if now is not None else time.time()) - self.fetched_at
+
+    @property
+    def fetched_at_text(self):
+        return datetime.fromtimestamp(self.fetched_at).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class _Flight:
+    """진행 중인 워크시트 조회 하나 (같은 키의 동시 조회가 결과를 기다림)"""
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.future = Future()
+
+
+class SnapshotStore:
+    """프로세스 단위 워크시트 스냅샷 저장소"""
+
+    def __init__(self, ttl=SNAPSHOT_TTL, max_stale=SNAPSHOT_MAX_STALE, max_workers=REFRESH_WORKERS):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapshot-refresh")
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._fallbacks = {}  # 무효화된 스냅샷 (새로 가져오지 못할 때만 사용)
+        self._refreshing = set()
+        self._inflight = {}  # 키별 진행 중인 조회
+        self.fetch_count = 0  # 실제로 조회한 횟수
+        self.coalesced_count = 0  # 진행 중인 조회를 기다려 결과를 함께 사용한 횟수
+        self.unchanged_count = 0  # 새로 읽었지만 바뀐 블록이 없어 버전을 유지한 횟수
+        self.drift_count = 0  # 새로 읽은 데이터에서 바뀐 블록을 찾은 횟수
+        self.skipped_count = 0  # 문서 수정 시각이 같아 다시 읽지 않은 횟수
+        self.partial_count = 0  # 직접 수정 확인에서 바뀐 블록만 읽은 횟수
+        self._read_modified = {}  # 키별로 마지막으로 전체를 읽을 때의 문서 수정 시각
+        self._versions = itertools.count(1)
+        # 캐시를 비울 때마다 증가 (비우기 전에 시작한 조회 결과는 저장하지 않음)
+        self._epoch = 0
+        self._generations = {}
+
+    def peek(self, key):
+        """저장된 스냅샷 (없으면 None, 새로 가져오지 않음)"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def snapshots(self):
+        """저장된 스냅샷 목록 {키: 스냅샷}"""
+        with self._lock:
+            return dict(self._entries)
+
+    def get(self, key, fetch):
+        """
+        스냅샷을 반환합니다. 유효 시간이 지났으면 저장된 스냅샷을 그대로 반환하고 백그라운드에서 갱신합니다.
+        저장된 스냅샷이 없거나 너무 오래되었으면 fetch() 로 바로 가져옵니다.
+        가져오지 못하면 (Google Sheets 장애 등) 오래된 스냅샷이라도 있으면 그대로 반환합니다.
+        """
+        snapshot = self.peek(key)
+        if snapshot is not None:
+            age = snapshot.age()
+            if age <= self.max_stale:
+                if age > self.ttl:
+                    self.refresh_async(key, fetch)
+                return snapshot
+        try:
+            return self.refresh(key, fetch)
+        except Exception as e:
+            if snapshot is None:
+                with self._lock:
+                    snapshot = self._fallbacks.get(key)
+            if snapshot is None:
+                raise
+            logging.warning(f"스냅샷 조회 실패, 이전 스냅샷 사용 ({key}): {str(e)[:200]}")
+            return snapshot
+
+    def refresh(self, key, fetch):
+        """
+        fetch() 로 데이터를 가져와 스냅샷을 교체합니다.
+        같은 키의 조회가 이미 진행 중이면 새로 조회하지 않고 그 결과를 기다려 반환합니다.
+        (캐시를 비우기 전에 시작한 조회에는 합류하지 않음)
+        """
+        with self._lock:
+            generation = (self._epoch, self._generations.get(key, 0))
+            flight = self._inflight.get(key)
+            if flight is not None and flight.generation == generation:
+                self.coalesced_count += 1
+                leader = False
+            else:
+                flight = _Flight(generation)
+                self._inflight[key] = flight
+                self.fetch_count += 1
+                leader = True
+        if not leader:
+            # 조회가 실패하면 기다리던 쪽에도 같은 예외가 전달됨
+            return flight.future.result()
+
+        try:
+            snapshot = self._reconcile(key, fetch())
+            with self._lock:
+                if generation == (self._epoch, self._generations.get(key, 0)):
+                    self._entries[key] = snapshot
+                    self._fallbacks.pop(key, None)
+            flight.future.set_result(snapshot)
+            return snapshot
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+
+    def _reconcile(self, key, values):
+        """
+        새로 읽은 데이터를 저장된 스냅샷과 블록 해시로 비교해 저장할 스냅샷을 만듭니다.
+        바뀐 블록이 없으면 같은 버전을 유지하므로 버전별로 만든 파생 데이터(데이터프레임, 중복 확인/요청일
+        인덱스 등)를 계속 사용하고, 바뀐 블록이 있으면 바뀌지 않은 블록의 행은 이전 스냅샷의 행을 그대로 씁니다.
+        """
+        now = time.time()
+        current = self.peek(key)
+        values = tuple(tuple(row) for row in values)
+        hashes = block_hashes(values)
+        if current is None:
+            return WorksheetSnapshot(next(self._versions), values, now, hashes)
+        blocks = changed_blocks(current.block_hashes, hashes)
+        if not blocks:
+            with self._lock:
+                self.unchanged_count += 1
+            return current.refreshed(now)
+        with self._lock:
+            self.drift_count += 1
+        changed_rows = changed_row_ranges(blocks, max(len(current.values), len(values)))
+        return WorksheetSnapshot(
+            next(self._versions), merge_blocks(current.values, values, blocks), now, hashes, changed_rows
+        )
+
+    def read_modified(self, key):
+        """마지막으로 전체를 읽을 때의 문서 수정 시각 (모르면 None)"""
+        with self._lock:
+            return self._read_modified.get(key)
+
+    def record_modified(self, key, modified):
+        """전체를 읽기 직전에 확인한 문서 수정 시각을 기록합니다."""
+        with self._lock:
+            self._read_modified[key] = modified
+
+    def check_drift(self, key, modified, fetch, read_changed):
+        """
+        Google Sheets 에서 직접 수정한 내용을 확인합니다.
+        modified: 읽기 전에 확인한 문서 수정 시각 - 마지막으로 전체를 읽을 때와 같으면 다시 읽지 않습니다.
+        read_changed(캐시된 데이터): (새 데이터, 전체를 읽었는지) - 바뀐 블록만 읽어 캐시된 데이터와 합친 결과
+        일부만 읽었으면 다른 열만 수정된 블록을 놓칠 수 있으므로 수정 시각을 기록하지 않습니다. (워머가 다음 주기에 전체를 읽음)
+        반환값: (스냅샷, "skipped" / "partial" / "full")
+        """
+        snapshot = self.peek(key)
+        if snapshot is not None and modified is not None and modified == self.read_modified(key):
+            self.touch(key)
+            return self.peek(key), "skipped"
+        values, full = read_changed(snapshot.values if snapshot is not None else ())
+        current = self.peek(key)
+        if not full and (current is None or current.version != snapshot.version):
+            # 확인하는 동안 다른 곳에서 스냅샷이 바뀌었으면 일부만 읽은 데이터를 합치지 않고 전체를 다시 읽음
+            values, full = fetch(), True
+        snapshot = self.refresh(key, lambda: values)
+        if full and self.peek(key) is snapshot:
+            self.record_modified(key, modified)
+        else:
+            with self._lock:
+                self.partial_count += 1
+        return snapshot, "full" if full else "partial"
+
+    def touch(self, key):
+        """원본이 바뀌지 않은 것을 확인한 스냅샷을 다시 읽지 않고 방금 읽은 것으로 표시합니다."""
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries[key] = snapshot.refreshed()
+                self.skipped_count += 1
+
+    def refresh_async(self, key, fetch):
+        """백그라운드에서 스냅샷을 갱신합니다. 같은 키의 조회가 이미 진행 중이면 아무것도 하지 않습니다."""
+        with self._lock:
+            if key in self._refreshing or key in self._inflight:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.refresh(key, fetch)
+            except Exception as e:
+                # 갱신에 실패해도 이전 스냅샷을 계속 사용
+                logging.warning(f"스냅샷 갱신 실패 ({key}): {str(e)[:200]}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(run)
+
+    def invalidate(self, key=None):
+        """
+        스냅샷을 삭제합니다. (key 가 없으면 전체 삭제)
+        데이터를 변경한 뒤 호출하면 다음 읽기는 변경된 데이터를 새로 가져옵니다.
+        삭제한 스냅샷은 새로 가져오지 못할 때(Google Sheets 장애)를 대비해 따로 보관합니다.
+        """
+        with self._lock:
+            if key is None:
+                self._epoch += 1
+                self._fallbacks.update(self._entries)
+                self._entries.clear()
+                return
+            # 워크시트에서 파생된 키(날짜 열 등)도 함께 삭제
+            prefix = derived_key(key, "")
+            keys = {key} | {k for k in itertools.chain(self._entries, self._inflight) if k.startswith(prefix)}
+            for k in keys:
+                self._generations[k] = self._generations.get(k, 0) + 1
+                if k in self._entries:
+                    self._fallbacks[k] = self._entries.pop(k)
+
+    def replace(self, key, values):
+        """
+        데이터를 직접 변경한 뒤 변경 결과로 스냅샷을 교체합니다. (다시 읽지 않음)
+        변경 전에 시작한 조회 결과와 파생된 키(날짜 열 등)는 버립니다.
+        """
+        self.invalidate(key)
+        snapshot = WorksheetSnapshot(next(self._versions), values, time.time())
+        with self._lock:
+            self._entries[key] = snapshot
+            self._fallbacks.pop(key, None)
+        return snapshot
+
+
+class SnapshotWarmer:
+    """모든 문서의 워크시트 스냅샷을 미리 읽어 두고 주기적으로 갱신하는 스레드"""
+
+    def __init__(self, store, client, targets, check_interval=WARM_CHECK_INTERVAL,
+                 refresh_age=WARM_REFRESH_AGE):
+        self.store = store
+        self.client = client
+        self.targets = list(targets)  # [(스프레드시트 이름, 워크시트 이름), ...]
+        self.check_interval = check_interval
+        self.refresh_age = refresh_age
+        self._worksheets = {}
+        self._failed_at = {}  # 실패한 대상은 갱신 기준 시간이 지난 뒤 다시 시도
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="snapshot-warmer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _open(self, target):
+        """(스프레드시트, 워크시트) 객체 (한 번 연 워크시트는 다시 열지 않음)"""
+        opened = self._worksheets.get(target)
+        if opened is None:
+            spreadsheet_name, worksheet_name = target
+            spreadsheet = self.client.open(spreadsheet_name)
+            opened = (spreadsheet, spreadsheet.worksheet(worksheet_name))
+            self._worksheets[target] = opened
+        return opened
+
+    def _modified_time(self, spreadsheet, checked):
+        """문서 수정 시각 (한 번의 확인 주기 안에서는 문서마다 한 번만 조회, 조회하지 못하면 None)"""
+        if spreadsheet.id not in checked:
+            try:
+                checked[spreadsheet.id] = spreadsheet.get_lastUpdateTime()
+            except Exception as e:
+                logging.warning(f"문서 수정 시각 조회 실패 ({spreadsheet.id}): {str(e)[:200]}")
+                checked[spreadsheet.id] = None
+        return checked[spreadsheet.id]
+
+    def warm_once(self):
+        """
+        스냅샷이 없거나 갱신 기준보다 오래된 워크시트를 새로 가져옵니다.
+        문서 수정 시각이 마지막으로 읽을 때와 같으면 다시 읽지 않고 스냅샷을 갱신한 것으로 표시합니다.
+        """
+        checked = {}
+        for target in self.targets:
+            if self._stop.is_set():
+                return
+            if time.time() - self._failed_at.get(target, 0) < self.refresh_age:
+                continue
+            try:
+                spreadsheet, worksheet = self._open(target)
+                key = worksheet_key(worksheet)
+                snapshot = self.store.peek(key)
+                if snapshot is None or snapshot.age() >= self.refresh_age:
+                    # 수정 시각은 읽기 전에 확인 (읽는 동안 수정되면 다음 주기에 다시 읽음)
+                    modified = self._modified_time(spreadsheet, checked)
+                    if snapshot is not None and modified is not None and modified == self.store.read_modified(key):
+                        self.store.touch(key)
+                    else:
+                        self.store.refresh(key, worksheet.get_all_values)
+                        self.store.record_modified(key, modified)
+                self._failed_at.pop(target, None)
+            except Exception as e:
+                self._failed_at[target] = time.time()
+                # 아직 만들어지지 않은 문서/워크시트나 일시적인 API 오류는 나중에 다시 시도
+                logging.warning(f"스냅샷 미리 읽기 실패 {target}: {str(e)[:200]}")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.warm_once()
+            self._stop.wait(self.check_interval)
@@ -0,0 +1,63 @@
+# 워크시트 데이터 블록 해시 비교 (Google Sheets 에서 직접 수정한 내용 찾기)
+# 데이터(헤더 포함)를 고정 크기 행 블록으로 나누어 블록마다 해시를 계산하고, 캐시된 데이터와 새로 읽은
+# 데이터의 블록 해시를 비교해 달라진 블록만 찾습니다. 달라지지 않은 블록은 이전 행 객체를 그대로 사용하고,
+# 파생 데이터(응답 시간 집계 등)는 달라진 블록의 행만 빼고 더해 갱신합니다.
+import hashlib
+
+# 블록 하나의 행 수
+RECONCILE_BLOCK_ROWS = 256
+
+
+def block_hashes(values, block_rows=RECONCILE_BLOCK_ROWS, start_block=0):
+    """start_block 번째 블록부터 끝까지의 블록 해시 목록"""
+    hashes = []
+    for start in range(start_block * block_rows, len(values), block_rows):
+        # 셀은 단위 구분 문자, 행은 레코드 구분 문자로 이어 붙여 해시
+        text = "\x1e".join("\x1f".join(map(str, row)) for row in values[start:start + block_rows])
+        hashes.append(hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+    return hashes
+
+
+def changed_blocks(old_hashes, new_hashes):
+    """해시가 다른 블록 번호 목록 (한쪽에만 있는 블록 포함)"""
+    return [
+        block for block in range(max(len(old_hashes), len(new_hashes)))
+        if block >= len(old_hashes) or block >= len(new_hashes) or old_hashes[block] != new_hashes[block]
+    ]
+
+
+def block_data_rows(values, blocks, block_rows=RECONCILE_BLOCK_ROWS):
+    """블록 번호 목록에 해당하는 데이터 행 (헤더 제외)"""
+    rows = []
+    for block in blocks:
+        start = max(block * block_rows, 1)
+        rows.extend(values[start:(block + 1) * block_rows])
+    return rows
+
+
+def changed_row_ranges(blocks, row_count, block_rows=RECONCILE_BLOCK_ROWS):
+    """
+    달라진 블록을 시트 행 번호 구간 [(첫 행, 마지막 행), ...] 으로 변환합니다. (이어진 블록은 합침)
+    row_count: 이전/새 데이터 중 긴 쪽의 행 수 (헤더 포함)
+    """
+    ranges = []
+    for block in blocks:
+        first, last = block * block_rows + 1, min((block + 1) * block_rows, row_count)
+        if ranges and ranges[-1][1] >= first - 1:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], last))
+        else:
+            ranges.append((first, last))
+    return ranges
+
+
+def merge_blocks(old_values, new_values, blocks, block_rows=RECONCILE_BLOCK_ROWS):
+    """
+    새 데이터와 내용이 같은 블록은 이전 데이터의 행 객체를 그대로 사용한 새 데이터 (튜플)
+    blocks: 달라진 블록 번호 목록 (changed_blocks 결과)
+    """
+    changed = set(blocks)
+    merged = []
+    for start in range(0, len(new_values), block_rows):
+        source = new_values if start // block_rows in changed else old_values
+        merged.extend(source[start:start + block_rows])
+    return tuple(merged)
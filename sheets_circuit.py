@@ -0,0 +1,109 @@
+# Google Sheets 연결 보호 (호출 제한 시간, 회로 차단기)
+# 응답이 없거나 서버 오류가 연속으로 발생하면 회로를 열어 한동안 API 호출을 즉시 실패시킵니다.
+# 회로가 열린 동안 앱은 마지막으로 가져온 스냅샷으로 화면을 그리고, 입력한 데이터는 대기열에 저장합니다.
+# 일정 시간이 지나면 호출 하나를 시험 삼아 보내 성공하면 회로를 닫습니다.
+import threading
+import time
+
+# API 호출 제한 시간(초) - (연결, 응답) 제한 시간
+SHEETS_TIMEOUT = (5, 20)
+# 이만큼 연속으로 실패하면 회로를 엶
+CIRCUIT_FAILURE_THRESHOLD = 3
+# 회로를 연 뒤 시험 호출을 보내기까지 기다리는 시간(초)
+CIRCUIT_RESET_TIMEOUT = 30
+
+# 회로 상태
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"  # 시험 호출 진행 중
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 API 호출을 보내지 않았을 때 발생하는 예외"""
+
+
+def is_dependency_failure(exc):
+    """
+    Google Sheets 장애로 보는 오류인지 확인합니다. (제한 시간 초과, 연결 오류, 5xx 응답)
+    시트/워크시트 없음 같은 4xx 응답과 할당량 초과(429)는 서버가 정상 응답한 것이므로 제외합니다.
+    """
+    if isinstance(exc, (CircuitOpenError, TimeoutError, ConnectionError)):
+        return True
+    import requests  # gspread 가 사용하는 HTTP 라이브러리 (오류가 발생한 경우에만 불러옴)
+
+    if isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    response = getattr(exc, "response", None)
+    status_code = getattr(response, "status_code", None)
+    return isinstance(status_code, int) and status_code >= 500
+
+
+class CircuitBreaker:
+    """프로세스 단위 Google Sheets 회로 차단기 (모든 세션과 백그라운드 작업이 공유)"""
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0  # 연속 실패 횟수
+        self.opened_at = None
+        self.last_error = None
+
+    def before_call(self):
+        """
+        API 호출 전에 호출합니다. 회로가 열려 있으면 CircuitOpenError를 발생시킵니다.
+        열린 뒤 reset_timeout 이 지났으면 이 호출을 시험 호출로 허용합니다.
+        """
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return
+            if self.state == CIRCUIT_OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+                self.state = CIRCUIT_HALF_OPEN
+                return
+            raise CircuitOpenError(f"Google Sheets 연결이 차단되어 있습니다. (마지막 오류: {self.last_error})")
+
+    def record_success(self):
+        with self._lock:
+            self.state = CIRCUIT_CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self, exc):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(exc)[:200]
+            if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = CIRCUIT_OPEN
+                self.opened_at = self._clock()
+
+    def record_result(self, exc=None):
+        """호출 결과를 기록합니다. 장애가 아닌 오류(4xx 등)는 서버가 응답한 것이므로 성공으로 봅니다."""
+        if exc is not None and is_dependency_failure(exc):
+            self.record_failure(exc)
+        else:
+            self.record_success()
+
+    def is_open(self):
+        """API 호출이 즉시 실패하는 상태인지 (시험 호출을 보낼 수 있게 되면 False)"""
+        with self._lock:
+            if self.state == CIRCUIT_HALF_OPEN:
+                return True
+            return self.state == CIRCUIT_OPEN and self._clock() - self.opened_at < self.reset_timeout
+
+    def status(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "retry_in": (max(0.0, self.reset_timeout - (self._clock() - self.opened_at))
+                             if self.state == CIRCUIT_OPEN else None),
+                "last_error": self.last_error,
+            }
+
+
+def set_client_timeout(client, timeout=SHEETS_TIMEOUT):
+    """gspread 클라이언트의 모든 HTTP 요청에 제한 시간을 설정합니다."""
+    client.http_client.set_timeout(timeout)
@@ -0,0 +1,362 @@
+# Google Sheets API 호출 계측 (호출 수, 지연 시간 히스토그램, 할당량 사용량)
+# gspread 클라이언트/스프레드시트/워크시트를 감싸 모든 API 호출을 기록하고
+# 프로세스, 세션, 실행(rerun) 단위로 집계합니다. 회로 차단기를 함께 넘기면 호출 결과를 차단기에도 기록합니다.
+from collections import deque
+from datetime import datetime
+import json
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Google Sheets API 분당 할당량 (사용자 기준)
+READ_QUOTA_PER_MINUTE = 60
+WRITE_QUOTA_PER_MINUTE = 60
+
+# 지연 시간 히스토그램 구간(초) - Prometheus 히스토그램 형식
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 계측 대상 메서드
+CLIENT_METHODS = ("open", "open_by_key", "create")
+SPREADSHEET_METHODS = ("worksheet", "add_worksheet", "list_permissions", "share", "batch_update", "get_lastUpdateTime")
+WORKSHEET_METHODS = (
+    "get_all_values", "get", "batch_get", "append_row", "append_rows",
+    "update", "batch_update", "delete_rows",
+)
+WRITE_METHODS = {
+    "create", "add_worksheet", "share", "spreadsheet_batch_update", "batch_update",
+    "append_row", "append_rows", "update", "delete_rows",
+}
+
+# 최근 호출 시간 보관 개수 (백분위수 계산용)
+RECENT_DURATIONS = 500
+
+
+def call_kind(method):
+    """할당량 계산을 위한 호출 종류 (read / write)"""
+    return "write" if method in WRITE_METHODS else "read"
+
+
+class MethodStats:
+    """메서드 하나의 호출 수, 오류 수, 지연 시간 히스토그램"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # 마지막은 +Inf
+        self.recent = deque(maxlen=RECENT_DURATIONS)
+
+    def observe(self, seconds, error=False):
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.recent.append(seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, q):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_seconds": round(self.total_seconds, 6),
+            "avg_seconds": round(self.total_seconds / self.count, 6) if self.count else None,
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+            "max_seconds": round(self.max_seconds, 6),
+            "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], self.buckets)),
+        }
+
+
+class SheetsMetrics:
+    """API 호출 통계 묶음 (프로세스/세션/실행 단위로 하나씩 사용)"""
+
+    def __init__(self, scope, fragment=None):
+        self.scope = scope
+        self.fragment = fragment  # fragment 만 다시 실행된 경우 fragment 이름
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.methods = {}
+        self.window = {"read": deque(), "write": deque()}  # 최근 60초 호출 시각
+        self._lock = threading.Lock()
+
+    def observe(self, method, seconds, error=False, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.methods.setdefault(method, MethodStats()).observe(seconds, error)
+            self.window[call_kind(method)].append(now)
+
+    def total_calls(self):
+        return sum(s.count for s in self.methods.values())
+
+    def total_seconds(self):
+        return sum(s.total_seconds for s in self.methods.values())
+
+    def quota_usage(self, now=None):
+        """최근 60초 동안의 읽기/쓰기 호출 수와 할당량"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for window in self.window.values():
+                while window and now - window[0] >= 60:
+                    window.popleft()
+            return {
+                "read": {"used": len(self.window["read"]), "limit": READ_QUOTA_PER_MINUTE},
+                "write": {"used": len(self.window["write"]), "limit": WRITE_QUOTA_PER_MINUTE},
+            }
+
+    def to_dict(self):
+        with self._lock:
+            methods = {name: stats.to_dict() for name, stats in sorted(self.methods.items())}
+        return {
+            "scope": self.scope,
+            "fragment": self.fragment,
+            "started_at": self.started_at,
+            "total_calls": sum(m["count"] for m in methods.values()),
+            "total_seconds": round(sum(m["total_seconds"] for m in methods.values()), 6),
+            "quota_last_minute": self.quota_usage(),
+            "methods": methods,
+        }
+
+
+@st.cache_resource
+def get_process_metrics():
+    """프로세스 전체(모든 세션)에서 공유하는 API 호출 통계"""
+    return SheetsMetrics("process")
+
+
+def _session_scopes():
+    """현재 스크립트 실행 중이면 세션/실행 단위 통계를 반환합니다. (백그라운드 스레드에서는 빈 목록)"""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return []
+    scopes = []
+    for key in ("sheets_metrics_session", "sheets_metrics_rerun"):
+        metrics = st.session_state.get(key)
+        if metrics is not None:
+            scopes.append(metrics)
+    return scopes
+
+
+def record_call(method, seconds, error=False):
+    """API 호출 1회를 모든 집계 단위에 기록합니다."""
+    now = time.monotonic()
+    get_process_metrics().observe(method, seconds, error, now)
+    for metrics in _session_scopes():
+        metrics.observe(method, seconds, error, now)
+
+
+def begin_rerun(fragment=None):
+    """
+    스크립트 실행(rerun) 시작 시 호출합니다. fragment 만 다시 실행될 때도 fragment 이름과 함께 호출합니다.
+    직전 실행의 통계를 last_rerun 으로 보관하고 새 실행 통계를 시작합니다.
+    """
+    if 'sheets_metrics_session' not in st.session_state:
+        st.session_state.sheets_metrics_session = SheetsMetrics("session")
+    previous = st.session_state.get('sheets_metrics_rerun')
+    if previous is not None:
+        st.session_state.sheets_metrics_last_rerun = previous
+    st.session_state.sheets_metrics_rerun = SheetsMetrics("rerun", fragment)
+
+
+def _timed(method, func, breaker=None):
+    def wrapper(*args, **kwargs):
+        # 회로가 열려 있으면 API를 호출하지 않고 바로 실패 (호출 수에는 포함하지 않음)
+        if breaker is not None:
+            breaker.before_call()
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            record_call(method, time.perf_counter() - started, error=True)
+            if breaker is not None:
+                breaker.record_result(e)
+            raise
+        record_call(method, time.perf_counter() - started)
+        if breaker is not None:
+            breaker.record_result()
+        return result
+    wrapper.__name__ = method
+    return wrapper
+
+
+class _InstrumentedProxy:
+    """원본 객체를 감싸 지정된 메서드 호출을 계측하는 프록시"""
+
+    _methods = ()
+    _metric_names = {}  # 메서드 이름과 다르게 기록할 통계 이름
+
+    def __init__(self, wrapped, breaker=None):
+        object.__setattr__(self, "_wrapped", wrapped)
+        object.__setattr__(self, "_breaker", breaker)
+
+    def __getattr__(self, name):
+        attr = getattr(self._wrapped, name)
+        if name in self._methods and callable(attr):
+            return self._wrap_result(name, _timed(self._metric_names.get(name, name), attr, self._breaker))
+        return attr
+
+    def __setattr__(self, name, value):
+        setattr(self._wrapped, name, value)
+
+    def __repr__(self):
+        return f"<계측 {self._wrapped!r}>"
+
+    def _wrap_result(self, name, func):
+        return func
+
+
+class InstrumentedWorksheet(_InstrumentedProxy):
+    _methods = WORKSHEET_METHODS
+
+    def __getattr__(self, name):
+        attr = super().__getattr__(name)
+        # 워크시트가 속한 스프레드시트 호출(여러 행 삭제 등)도 계측
+        if name == "spreadsheet":
+            return InstrumentedSpreadsheet(attr, self._breaker)
+        return attr
+
+
+class InstrumentedSpreadsheet(_InstrumentedProxy):
+    _methods = SPREADSHEET_METHODS
+    _metric_names = {"batch_update": "spreadsheet_batch_update"}  # 워크시트 batch_update 와 구분
+
+    def _wrap_result(self, name, func):
+        if name not in ("worksheet", "add_worksheet"):
+            return func
+
+        def wrapper(*args, **kwargs):
+            return InstrumentedWorksheet(func(*args, **kwargs), self._breaker)
+        return wrapper
+
+
+class InstrumentedClient(_InstrumentedProxy):
+    _methods = CLIENT_METHODS
+
+    def _wrap_result(self, name, func):
+        def wrapper(*args, **kwargs):
+            return InstrumentedSpreadsheet(func(*args, **kwargs), self._breaker)
+        return wrapper
+
+
+def instrument_client(client, breaker=None):
+    """gspread 클라이언트를 계측 프록시로 감쌉니다. (breaker: 호출 결과를 기록할 회로 차단기)"""
+    return InstrumentedClient(client, breaker)
+
+
+def metrics_snapshot():
+    """프로세스/세션/직전 실행 통계를 JSON 직렬화 가능한 딕셔너리로 반환합니다."""
+    snapshot = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "process": get_process_metrics().to_dict(),
+    }
+    if get_script_run_ctx(suppress_warning=True) is not None:
+        for name, key in (("session", "sheets_metrics_session"), ("last_rerun", "sheets_metrics_last_rerun")):
+            metrics = st.session_state.get(key)
+            if metrics is not None:
+                snapshot[name] = metrics.to_dict()
+    return snapshot
+
+
+def metrics_json():
+    return json.dumps(metrics_snapshot(), ensure_ascii=False, indent=2)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def metrics_prometheus():
+    """Prometheus 텍스트 노출 형식으로 통계를 반환합니다."""
+    snapshot = metrics_snapshot()
+    scopes = [snapshot[name] for name in ("process", "session", "last_rerun") if name in snapshot]
+    lines = [
+        "# HELP sheets_api_calls_total Google Sheets API 호출 수",
+        "# TYPE sheets_api_calls_total counter",
+    ]
+    for scope in scopes:
+        for method, stats in scope["methods"].items():
+            labels = f'scope="{scope["scope"]}",method="{_escape_label(method)}"'
+            lines.append(f"sheets_api_calls_total{{{labels}}} {stats['count']}")
+    lines += [
+        "# HELP sheets_api_errors_total Google Sheets API 호출 오류 수",
+        "# TYPE sheets_api_errors_total counter",
+    ]
+    for scope in scopes:
+        for method, stats in scope["methods"].items():
+            labels = f'scope="{scope["scope"]}",method="{_escape_label(method)}"'
+            lines.append(f"sheets_api_errors_total{{{labels}}} {stats['errors']}")
+    lines += [
+        "# HELP sheets_api_call_duration_seconds Google Sheets API 호출 지연 시간",
+        "# TYPE sheets_api_call_duration_seconds histogram",
+    ]
+    for scope in scopes:
+        for method, stats in scope["methods"].items():
+            labels = f'scope="{scope["scope"]}",method="{_escape_label(method)}"'
+            cumulative = 0
+            for bound, count in stats["buckets"].items():
+                cumulative += count
+                lines.append(f'sheets_api_call_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"sheets_api_call_duration_seconds_sum{{{labels}}} {stats['total_seconds']}")
+            lines.append(f"sheets_api_call_duration_seconds_count{{{labels}}} {stats['count']}")
+    lines += [
+        "# HELP sheets_api_quota_used 최근 60초 동안의 호출 수 (할당량 대비)",
+        "# TYPE sheets_api_quota_used gauge",
+        "# HELP sheets_api_quota_limit 분당 호출 할당량",
+        "# TYPE sheets_api_quota_limit gauge",
+    ]
+    for kind, usage in snapshot["process"]["quota_last_minute"].items():
+        lines.append(f'sheets_api_quota_used{{kind="{kind}"}} {usage["used"]}')
+        lines.append(f'sheets_api_quota_limit{{kind="{kind}"}} {usage["limit"]}')
+    return "\n".join(lines) + "\n"
+
+
+def render_metrics_sidebar():
+    """사이드바 '시스템 정보'에 API 호출 통계를 표시합니다."""
+    snapshot = metrics_snapshot()
+    with st.expander("API 호출 통계"):
+        for name, label in (("last_rerun", "직전 실행"), ("session", "현재 세션"), ("process", "전체 프로세스")):
+            scope = snapshot.get(name)
+            if scope is None:
+                continue
+            # 직전 실행이 fragment 만 다시 실행한 것이면 (2초마다 갱신하는 업로드 진행 상황 등) 이름 표시
+            if scope.get("fragment"):
+                label = f"{label} (fragment: {scope['fragment']})"
+            st.markdown(f"**{label}**: {scope['total_calls']}회 / {scope['total_seconds']:.2f}초")
+            if scope["methods"]:
+                st.dataframe(
+                    [
+                        {
+                            "메서드": method,
+                            "호출": stats["count"],
+                            "오류": stats["errors"],
+                            "평균(ms)": round((stats["avg_seconds"] or 0) * 1000, 1),
+                            "p95(ms)": round((stats["p95_seconds"] or 0) * 1000, 1),
+                        }
+                        for method, stats in scope["methods"].items()
+                    ],
+                    hide_index=True,
+                )
+
+        st.markdown("**할당량 사용량 (최근 60초, 전체 프로세스)**")
+        for kind, label in (("read", "읽기"), ("write", "쓰기")):
+            usage = snapshot["process"]["quota_last_minute"][kind]
+            st.progress(min(1.0, usage["used"] / usage["limit"]), text=f"{label}: {usage['used']}/{usage['limit']}")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("JSON", data=metrics_json(), file_name="sheets_metrics.json",
+                               mime="application/json", key="sheets_metrics_json")
+        with col2:
+            st.download_button("Prometheus", data=metrics_prometheus(), file_name="sheets_metrics.prom",
+                               mime="text/plain", key="sheets_metrics_prom")
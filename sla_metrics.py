@@ -0,0 +1,243 @@
+# 현업문의 응답 시간(SLA) 집계
+# 답변일 - 요청일(일 단위)의 분포를 문의유형, 문의방법, 요청부서, 월별로 유지합니다.
+# 응답 시간은 일 단위 정수이므로 일수별 건수 히스토그램을 분위수 스케치로 사용합니다.
+# (추가는 O(1), 분위수는 정확한 값, 여러 스케치를 합칠 수 있음)
+# 이 프로세스에서 추가한 행은 바로 반영하고, 다른 곳에서 시트가 바뀌면 바뀐 행 블록만 빼고 더해 반영합니다.
+from collections import Counter
+import math
+import threading
+import time
+
+from sheet_reconcile import RECONCILE_BLOCK_ROWS, block_data_rows, block_hashes, changed_blocks
+from sm_sheets import parse_sheet_date
+
+# 집계 기준 열
+SLA_DIMENSIONS = ["문의유형", "문의방법", "요청부서", "월"]
+# 표시할 분위수
+SLA_QUANTILES = (0.5, 0.9, 0.99)
+# 이 시간(초)이 지나면 바뀐 블록만 반영하지 않고 전체를 다시 집계
+SLA_REBUILD_INTERVAL = 1800
+
+# 응답 시간 계산에 사용하는 열
+REQUEST_DATE_COLUMN = "요청일"
+RESPONSE_DATE_COLUMN = "답변일"
+
+
+class ResponseTimeSketch:
+    """응답 시간(일) 분포 - 일수별 건수 히스토그램"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.count = 0
+        self.total_days = 0
+
+    def add(self, days):
+        self.counts[days] += 1
+        self.count += 1
+        self.total_days += days
+
+    def remove(self, days):
+        self.counts[days] -= 1
+        if self.counts[days] <= 0:
+            del self.counts[days]
+        self.count -= 1
+        self.total_days -= days
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total_days += other.total_days
+
+    def quantile(self, q):
+        """q 분위수 (nearest-rank, 건수가 없으면 None)"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for days in sorted(self.counts):
+            seen += self.counts[days]
+            if seen >= rank:
+                return days
+        return max(self.counts)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_days": round(self.total_days / self.count, 2) if self.count else None,
+            **{f"p{round(q * 100)}_days": self.quantile(q) for q in SLA_QUANTILES},
+        }
+
+
+def response_days(request_date, response_date):
+    """답변일 - 요청일 (일). 답변일이 없거나 날짜가 올바르지 않으면 None"""
+    if not str(response_date).strip():
+        return None
+    requested = parse_sheet_date(str(request_date))
+    responded = parse_sheet_date(str(response_date))
+    # 읽을 수 없는 날짜는 1900-01-01 로 변환됨
+    if requested.year == 1900 or responded.year == 1900 or responded < requested:
+        return None
+    return (responded - requested).days
+
+
+class SlaMetrics:
+    """워크시트 하나의 응답 시간 분포 (전체 + 기준 열 값별)"""
+
+    def __init__(self, headers):
+        self.headers = list(headers)
+        self._request_idx = self.headers.index(REQUEST_DATE_COLUMN)
+        self._response_idx = self.headers.index(RESPONSE_DATE_COLUMN)
+        self._dimension_idx = {
+            dimension: self.headers.index(dimension) for dimension in SLA_DIMENSIONS if dimension in self.headers
+        }
+        self.overall = ResponseTimeSketch()
+        self.groups = {dimension: {} for dimension in self._dimension_idx}
+        self.row_count = 0  # 집계한 데이터 행 수 (답변 없는 행 포함)
+        self.unanswered = 0  # 답변일이 없는 행 수
+        self.invalid = 0  # 날짜를 읽을 수 없거나 답변일이 요청일보다 빠른 행 수
+        self.version = None  # 마지막으로 맞춰 본 스냅샷 버전
+        self.values = [list(self.headers)]  # 집계한 행 (헤더 포함, 바뀐 블록을 찾는 기준)
+        self._hashes = None  # self.values 의 블록 해시 (필요할 때 계산)
+        self.built_at = time.time()
+
+    @classmethod
+    def from_values(cls, values, version=None, hashes=None):
+        """get_all_values() 결과 (헤더 포함) 전체를 집계합니다."""
+        metrics = cls(values[0])
+        metrics.add_rows(values[1:])
+        metrics.values = list(values)
+        metrics._hashes = hashes
+        metrics.version = version
+        return metrics
+
+    @property
+    def block_hashes(self):
+        if self._hashes is None:
+            self._hashes = block_hashes(self.values)
+        return self._hashes
+
+    def append_rows(self, rows):
+        """시트 끝에 추가한 행을 집계에 반영합니다. (바뀐 마지막 블록부터 해시를 다시 계산)"""
+        self.add_rows(rows)
+        if self._hashes is not None:
+            start_block = len(self.values) // RECONCILE_BLOCK_ROWS
+            self._hashes = self._hashes[:start_block]
+            self.values.extend(rows)
+            self._hashes += block_hashes(self.values, start_block=start_block)
+        else:
+            self.values.extend(rows)
+
+    def apply_snapshot(self, values, hashes, version):
+        """
+        새 데이터와 블록 해시를 비교해 바뀐 블록의 이전 행은 빼고 새 행은 더합니다.
+        반환값: 바뀐 블록 수
+        """
+        blocks = changed_blocks(self.block_hashes, hashes)
+        for row in block_data_rows(self.values, blocks):
+            self.remove_row(row)
+        self.add_rows(block_data_rows(values, blocks))
+        self.values = list(values)
+        self._hashes = hashes
+        self.version = version
+        return len(blocks)
+
+    def _cell(self, row, idx):
+        return row[idx] if idx < len(row) else ""
+
+    def _observe(self, row, sign):
+        """행 하나를 집계에 더하거나 (sign=1) 뺍니다. (sign=-1)"""
+        self.row_count += sign
+        response_date = self._cell(row, self._response_idx)
+        days = response_days(self._cell(row, self._request_idx), response_date)
+        if days is None:
+            if str(response_date).strip():
+                self.invalid += sign
+            else:
+                self.unanswered += sign
+            return
+        if sign > 0:
+            self.overall.add(days)
+        else:
+            self.overall.remove(days)
+        for dimension, idx in self._dimension_idx.items():
+            value = str(self._cell(row, idx)).strip() or "(없음)"
+            groups = self.groups[dimension]
+            if sign > 0:
+                groups.setdefault(value, ResponseTimeSketch()).add(days)
+            else:
+                groups[value].remove(days)
+                if not groups[value].count:
+                    del groups[value]
+
+    def add_row(self, row):
+        self._observe(row, 1)
+
+    def remove_row(self, row):
+        self._observe(row, -1)
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.add_row(row)
+
+    def table(self, dimension):
+        """기준 열 값별 분포 목록 (건수가 많은 순)"""
+        sketches = self.groups.get(dimension, {})
+        if dimension == "월":
+            ordered = sorted(sketches.items(), reverse=True)  # 최근 월부터
+        else:
+            ordered = sorted(sketches.items(), key=lambda item: (-item[1].count, item[0]))
+        return [{dimension: value, **sketch.to_dict()} for value, sketch in ordered]
+
+
+class SlaTracker:
+    """프로세스 단위 워크시트별 응답 시간 집계 (모든 세션이 공유)"""
+
+    def __init__(self, rebuild_interval=SLA_REBUILD_INTERVAL):
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self.rebuild_count = 0  # 전체를 다시 집계한 횟수
+        self.delta_count = 0  # 바뀐 블록만 반영한 횟수
+
+    def _sync(self, key, snapshot):
+        """
+        스냅샷 기준 집계 (잠금을 잡은 상태에서 호출)
+        집계한 데이터와 스냅샷의 블록 해시를 비교해 바뀐 블록만 반영합니다. (이 프로세스에서 추가한 행은
+        이미 반영되어 있으므로 정렬로 위치가 바뀐 블록만 다시 계산) 헤더가 바뀌었으면 전체를 다시 집계합니다.
+        """
+        metrics = self._metrics.get(key)
+        if metrics is not None and metrics.version == snapshot.version:
+            return metrics
+        if (metrics is None or not snapshot.values or list(snapshot.values[0]) != metrics.headers
+                or time.time() - metrics.built_at > self.rebuild_interval):
+            metrics = SlaMetrics.from_values(snapshot.values, snapshot.version, snapshot.block_hashes)
+            self._metrics[key] = metrics
+            self.rebuild_count += 1
+        else:
+            metrics.apply_snapshot(snapshot.values, snapshot.block_hashes, snapshot.version)
+            self.delta_count += 1
+        return metrics
+
+    def summary(self, key, snapshot):
+        """화면 표시용 집계 결과 (전체 분포, 답변 없음/오류 건수, 기준 열별 분포)"""
+        with self._lock:
+            metrics = self._sync(key, snapshot)
+            return {
+                "overall": metrics.overall.to_dict(),
+                "rows": metrics.row_count,
+                "unanswered": metrics.unanswered,
+                "invalid": metrics.invalid,
+                "tables": {dimension: metrics.table(dimension) for dimension in metrics.groups},
+            }
+
+    def observe_appended(self, key, rows):
+        """이 프로세스에서 추가한 행을 바로 반영합니다. (아직 집계가 없으면 다음 조회 때 전체 집계)"""
+        with self._lock:
+            metrics = self._metrics.get(key)
+            if metrics is not None:
+                metrics.append_rows(rows)
+
+    def invalidate(self, key):
+        """행을 수정/삭제해 다시 집계해야 할 때 호출합니다."""
+        with self._lock:
+            self._metrics.pop(key, None)
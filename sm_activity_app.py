@@ -1,14 +1,37 @@
 import streamlit as st  # Streamlit 라이브러리 불러오기 - 웹 인터페이스 구축
-from openpyxl import Workbook, load_workbook  # 엑셀 파일 처리를 위한 라이브러리
-from openpyxl.styles import Font, Alignment  # 엑셀 셀 서식 지정용 스타일 클래스
-from datetime import datetime  # 날짜 및 시간 처리를 위한 라이브러리
-import os  # 파일 및 디렉토리 조작을 위한 라이브러리
-import pandas as pd  # 데이터 처리를 위한 라이브러리
-import gspread  # Google Sheets API 연동
-from google.oauth2.service_account import Credentials  # Google API 인증
+from concurrent.futures import ThreadPoolExecutor, as_completed  # 여러 문서 동시 조회
+from datetime import datetime, timedelta  # 날짜 및 시간 처리를 위한 라이브러리
+import hashlib  # 업로드 파일 내용 해시
+import functools  # fragment 래퍼
 from io import BytesIO  # 메모리 내 파일 처리
 import logging  # 로깅을 위한 라이브러리
-import time  # 시간 처리를 위한 라이브러리
+from streamlit.runtime.scriptrunner import get_script_run_ctx  # 스크립트 실행 중인지 확인
+# pandas, openpyxl, gspread, google-auth 는 시작 속도를 위해 실제로 필요한 함수 안에서 불러옴
+from sm_sheets import (  # 시트 데이터 처리 함수 (정렬, 업로드 행 변환, 엑셀 생성)
+    ACTIVITY_HEADERS, INQUIRY_HEADERS, ACTIVITY_DATE_COL_IDX, INQUIRY_DATE_COL_IDX,
+    ACTIVITY_REQUIRED_COLUMNS, INQUIRY_REQUIRED_COLUMNS,
+    ACTIVITY_COLUMN_WIDTHS, INQUIRY_COLUMN_WIDTHS,
+    ACTIVITY_DEDUP_KEY_COLUMNS, INQUIRY_DEDUP_KEY_COLUMNS,
+    ACTIVITY_RESULT_OPTIONS, ACTIVITY_RESULT_COLUMN, READONLY_EDIT_COLUMNS, UPLOAD_BATCH_SIZE,
+    dedup_key_indices, build_dedup_index, split_duplicate_rows, sort_worksheet_by_date,
+    build_activity_rows, build_inquiry_rows, values_to_dataframe, build_excel_file, build_consolidated_sheets,
+    diff_edited_cells, select_rows, write_cell_changes,
+    build_date_index, date_row_bounds, read_date_column, read_row_range, count_data_rows, read_drifted_values,
+    upload_file_types, expand_upload_files, parse_upload_files, merge_upload_frames
+)
+from sheets_circuit import CircuitBreaker, CircuitOpenError, is_dependency_failure, set_client_timeout  # Google Sheets 장애 대응
+from sheet_cache import SnapshotStore, SnapshotWarmer, derived_key, worksheet_key  # 워크시트 스냅샷 캐시
+from upload_journal import UploadJournal, list_unfinished  # 업로드 체크포인트 기록
+from upload_jobs import UploadJobRunner, JOB_COMPLETED, JOB_ROLLED_BACK, JOB_STATUS_LABELS  # 업로드 백그라운드 작업
+from sheets_metrics import begin_rerun, instrument_client, render_metrics_sidebar  # API 호출 계측
+from sla_metrics import SLA_DIMENSIONS, SlaTracker  # 현업문의 응답 시간 집계
+from recurring_tasks import (  # 정기 작업 템플릿
+    SCHEDULES, TEMPLATE_COLUMNS, build_recurring_rows, load_recurring_tasks, normalize_recurring_task,
+    save_recurring_tasks,
+)
+from rerun_profiler import (  # 화면 실행 구간별 시간 측정
+    begin_profiled_rerun, end_profiled_rerun, profile_section, render_profiler_sidebar
+)
 
 # 페이지 기본 설정
 st.set_page_config(
@@ -17,42 +40,96 @@ st.set_page_config(
     layout="centered"  # wide 대신 centered로 변경
 )
 
+# 실행(rerun) 구분 번호 올리기 (한 번의 실행 안에서 같은 스냅샷을 사용하는 범위)
+def advance_rerun_token():
+    st.session_state['rerun_token'] = st.session_state.get('rerun_token', 0) + 1
+
+# st.fragment 대신 사용 - fragment 만 다시 실행될 때도 실행 구분 번호를 올림
+def rerun_fragment(func=None, **kwargs):
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **func_kwargs):
+            # 마지막 전체 실행이 시작된 뒤 이미 실행된 fragment 가 다시 실행되면 fragment 만 다시 실행된 것
+            # (다른 fragment 가 먼저 다시 실행되어 실행 번호가 바뀌었어도 구분되도록 전체 실행 시작 번호와 비교)
+            ran = st.session_state.setdefault('fragment_rerun_tokens', {})
+            fragment_rerun = ran.get(func.__qualname__, -1) >= st.session_state['full_run_token']
+            if fragment_rerun:
+                advance_rerun_token()
+                # API 호출 통계와 구간별 시간도 이 fragment 실행 단위로 새로 시작 (직전 전체 실행에 더하지 않음)
+                begin_rerun(fragment=func.__qualname__)
+                begin_profiled_rerun(fragment=func.__qualname__)
+            ran[func.__qualname__] = st.session_state.get('rerun_token')
+            if not fragment_rerun:
+                return func(*args, **func_kwargs)
+            # fragment 전체를 한 구간으로 측정하고 (cProfile 수집 중이면 이 구간에서 켜고 끔) 실행 단위를 마침
+            try:
+                with profile_section(f"fragment ({func.__name__})"):
+                    return func(*args, **func_kwargs)
+            finally:
+                end_profiled_rerun()
+        return st.fragment(wrapper, **kwargs)
+    return decorate if func is None else decorate(func)
+
+# 이번 실행(rerun)의 API 호출 통계와 구간별 시간 측정 시작 (fragment 만 다시 실행될 때는 rerun_fragment 에서 시작)
+advance_rerun_token()
+st.session_state['full_run_token'] = st.session_state['rerun_token']
+begin_rerun()
+begin_profiled_rerun()
+
+# Google Sheets 회로 차단기 (프로세스 단위, 연속 장애 시 API 호출을 막고 캐시된 데이터로 화면 표시)
+@st.cache_resource
+def get_circuit_breaker():
+    return CircuitBreaker()
+
+def sheets_unavailable():
+    """Google Sheets 연결이 차단되어 캐시된 데이터로 동작하는 중인지"""
+    return get_circuit_breaker().is_open()
+
+# Google Sheets API 인증 (프로세스당 한 번, 처음 필요할 때 수행)
+@st.cache_resource(show_spinner="Google Sheets API 연결 중...")
+def _authorize_google_sheets():
+    import gspread  # Google Sheets API 연동
+    from google.oauth2.service_account import Credentials  # Google API 인증
+    
+    scope = [
+        'https://spreadsheets.google.com/feeds',
+        'https://www.googleapis.com/auth/spreadsheets',
+        'https://www.googleapis.com/auth/drive'
+    ]
+    credentials = Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"],
+        scopes=scope
+    )
+    
+    client = gspread.authorize(credentials)
+    # 응답이 없는 호출이 화면 실행을 붙잡지 않도록 제한 시간 설정
+    set_client_timeout(client)
+    
+    # 모든 API 호출 수와 지연 시간을 기록하고 결과를 회로 차단기에 반영하도록 계측 프록시로 감싸기
+    return instrument_client(client, get_circuit_breaker())
+
 # Google Sheets API 설정
 def setup_google_sheets():
+    # 로컬 개발 환경(.streamlit/secrets.toml)과 Streamlit Cloud 환경 모두 st.secrets 사용
     try:
-        scope = [
-            'https://spreadsheets.google.com/feeds',
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        ]
-        
-        # Streamlit 로컬 개발 환경인지 클라우드 환경인지 확인
-        if os.path.exists('.streamlit/secrets.toml'):
-            # 로컬 개발 환경일 경우
-            credentials = Credentials.from_service_account_info(
-                st.secrets["gcp_service_account"],
-                scopes=scope
-            )
-        else:
-            try:
-                # Streamlit Cloud 환경일 경우
-                credentials = Credentials.from_service_account_info(
-                    st.secrets["gcp_service_account"],
-                    scopes=scope
-                )
-            except Exception as e:
-                st.error(f"Google API 인증 정보를 찾을 수 없습니다: {e}")
-                st.info("관리자에게 문의하세요. Streamlit Secrets에 서비스 계정 정보가 필요합니다.")
-                return None
-        
-        client = gspread.authorize(credentials)
-        return client
+        # 식 문장으로 두면 Streamlit magic 이 값을 화면에 출력하므로 변수에 대입
+        _ = st.secrets["gcp_service_account"]
+    except Exception as e:
+        st.error(f"Google API 인증 정보를 찾을 수 없습니다: {e}")
+        st.info("관리자에게 문의하세요. Streamlit Secrets에 서비스 계정 정보가 필요합니다.")
+        return None
+    
+    try:
+        # 실패한 경우는 캐싱되지 않으므로 다음 실행에서 다시 시도함
+        return _authorize_google_sheets()
     except Exception as e:
         st.error(f"Google Sheets API 설정 중 오류가 발생했습니다: {e}")
         return None
 
 # 스프레드시트 열기 또는 생성
 def get_or_create_spreadsheet(client, sheet_name):
+    import gspread  # Google Sheets API 연동
+    
     try:
         # 스프레드시트 열기 시도
         spreadsheet = client.open(sheet_name)
@@ -103,6 +180,8 @@ def get_or_create_spreadsheet(client, sheet_name):
 
 # 워크시트 가져오기 또는 생성
 def get_or_create_worksheet(spreadsheet, worksheet_name):
+    import gspread  # Google Sheets API 연동
+    
     try:
         # 워크시트 열기 시도
         worksheet = spreadsheet.worksheet(worksheet_name)
@@ -111,11 +190,7 @@ def get_or_create_worksheet(spreadsheet, worksheet_name):
         worksheet = spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=20)
         
         # 헤더 추가
-        headers = [
-            "NO", "월", "구분", "작업유형", "TASK", "요청일", "작업일",
-            "요청자", "IT", "CNS", "개발자", "내용", "결과"
-        ]
-        worksheet.append_row(headers)
+        worksheet.append_row(ACTIVITY_HEADERS)
         
         # 열 너비 설정 (Google Sheets API에서는 직접 지원하지 않음)
     
@@ -123,6 +198,8 @@ def get_or_create_worksheet(spreadsheet, worksheet_name):
 
 # 현업문의 워크시트 가져오기 또는 생성
 def get_or_create_inquiry_worksheet(spreadsheet, worksheet_name):
+    import gspread  # Google Sheets API 연동
+    
     try:
         # 워크시트 열기 시도
         worksheet = spreadsheet.worksheet(worksheet_name)
@@ -131,108 +208,76 @@ def get_or_create_inquiry_worksheet(spreadsheet, worksheet_name):
         worksheet = spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=20)
         
         # 헤더 추가
-        headers = [
-            "NO", "월", "문의방법", "문의유형", "요청부서", "문의사항", "요청일", "답변일",
-            "요청자", "IT", "CNS", "개발자"
-        ]
-        worksheet.append_row(headers)
+        worksheet.append_row(INQUIRY_HEADERS)
         
         # 열 너비 설정 (Google Sheets API에서는 직접 지원하지 않음)
     
     return worksheet
 
-# 데이터 정렬 함수 (요청일 기준)
-def sort_worksheet_by_date(worksheet, date_col_idx=5):
+# 워크시트 스냅샷 저장소 (프로세스 단위, 유효 시간이 지나면 이전 데이터를 보여주면서 백그라운드에서 갱신)
+@st.cache_resource
+def get_snapshot_store():
+    return SnapshotStore()
+
+# 모든 문서의 워크시트를 미리 읽어 두는 백그라운드 워머 (프로세스당 하나)
+@st.cache_resource
+def start_snapshot_warmer(_client, targets):
+    return SnapshotWarmer(get_snapshot_store(), _client, targets).start()
+
+def get_worksheet_key(worksheet):
+    """캐시에서 워크시트를 구분하는 키"""
+    return worksheet_key(worksheet)
+
+# 이번 실행(전체 또는 fragment 실행)에서 읽은 스냅샷 {워크시트 키: 스냅샷}
+def _rerun_snapshots():
+    # 스크립트 실행 밖(백그라운드 스레드 등)에서는 보관하지 않음 (매번 저장소에서 가져옴)
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return {}
+    token = st.session_state.get('rerun_token')
+    memo = st.session_state.get('rerun_snapshots')
+    if memo is None or memo[0] != token:
+        memo = (token, {})
+        st.session_state['rerun_snapshots'] = memo
+    return memo[1]
+
+def get_worksheet_snapshot(worksheet):
     """
-    날짜 기준으로 워크시트 데이터를 정렬합니다.
-    date_col_idx: 정렬 기준이 될 날짜 열의 인덱스 (기본값: 5, 요청일 열)
+    캐시된 워크시트 데이터와 스냅샷 버전을 함께 반환합니다.
+    한 번의 실행 안에서는 같은 스냅샷을 반환합니다. (탭 조회, 입력, 다운로드가 모두 같은 버전의 데이터를 사용)
     """
-    try:
-        # 모든 데이터 가져오기
-        data = worksheet.get_all_values()
-        
-        # 헤더 제외하고 데이터만 가져오기
-        headers = data[0]
-        data_rows = data[1:]
-        
-        # 데이터 없으면 바로 반환
-        if not data_rows:
-            return
-            
-        # 이미 정렬되어 있는지 확인
-        # date_col_idx = 5  # 요청일 열 인덱스 (6번째 열, 0부터 시작)
-        
-        # 날짜 형식 변환 함수
-        def parse_date(date_str):
-            try:
-                # '2023-12-31' 형식의 날짜 처리
-                return datetime.strptime(date_str, '%Y-%m-%d')
-            except ValueError:
-                try:
-                    # '23-12-31' 등의 2자리 연도 형식 처리
-                    parsed_date = datetime.strptime(date_str, '%y-%m-%d')
-                    # 2000년 이전인지 확인 및 조정
-                    current_year = datetime.now().year
-                    century = (current_year // 100) * 100
-                    if parsed_date.year > (current_year % 100):
-                        # 과거 날짜로 가정
-                        parsed_date = parsed_date.replace(year=parsed_date.year + century - 100)
-                    else:
-                        # 현재 세기로 가정
-                        parsed_date = parsed_date.replace(year=parsed_date.year + century)
-                    return parsed_date
-                except ValueError:
-                    # 다른 형식이거나 유효하지 않은 날짜는 매우 오래된 날짜로 처리
-                    return datetime(1900, 1, 1)
-        
-        # 정렬 필요 여부 확인
-        is_sorted = True
-        for i in range(1, len(data_rows)):
-            prev_date = parse_date(data_rows[i-1][date_col_idx])
-            curr_date = parse_date(data_rows[i][date_col_idx])
-            if prev_date > curr_date:
-                is_sorted = False
-                break
-                
-        if is_sorted:
-            return  # 이미 정렬되어 있음
-        
-        # 날짜 기준으로 정렬 (오래된 날짜가 위로)
-        sorted_data = sorted(data_rows, key=lambda x: parse_date(x[date_col_idx]))
-        
-        # 배치 업데이트를 위한 준비
-        batch_size = 100  # 한 번에 업데이트할 최대 행 수
-        total_batches = (len(sorted_data) + batch_size - 1) // batch_size
-        
-        # 헤더는 그대로 두고 정렬된 데이터만 업데이트
-        for i in range(0, len(sorted_data), batch_size):
-            batch = sorted_data[i:i+batch_size]
-            start_row = i + 2  # 헤더(1) + 데이터 시작 인덱스(i+1)
-            
-            # 배치 단위로 업데이트 - 인자 순서 수정
-            worksheet.update(values=batch, range_name=f'A{start_row}')
-            
-            # API 할당량 제한을 고려한 딜레이
-            if i + batch_size < len(sorted_data):
-                time.sleep(2)  # 2초 대기
-                
-        return True
-        
-    except Exception as e:
-        logging.error(f"워크시트 정렬 중 오류: {str(e)}")
-        raise Exception(f"데이터 정렬 중 오류가 발생했습니다: {str(e)}")
+    store = get_snapshot_store()
+    key = get_worksheet_key(worksheet)
+    snapshots = _rerun_snapshots()
+    snapshot = snapshots.get(key)
+    # 이번 실행 중에 데이터를 변경해 캐시를 비웠으면 새로 가져옴
+    if snapshot is None or store.peek(key) is None:
+        snapshot = store.get(key, worksheet.get_all_values)
+        snapshots[key] = snapshot
+        # 디버깅을 위한 로그 추가 (화면에 표시한 데이터를 가져온 시각)
+        if get_script_run_ctx(suppress_warning=True) is not None:
+            st.session_state['last_data_fetch'] = snapshot.fetched_at_text
+    return snapshot
 
-# 캐싱을 위한 데코레이터 추가
-@st.cache_data(ttl=300)  # 5분 동안 결과 캐싱
-def get_worksheet_data(_worksheet):
+def get_worksheet_data(worksheet):
     """
     워크시트의 데이터를 가져와 캐싱합니다.
     이 함수는 동일한 워크시트에 대해 짧은 시간 내에 반복 호출될 경우 
     API 호출 없이 캐시된 데이터를 반환합니다.
     """
-    # 디버깅을 위한 로그 추가
-    st.session_state['last_data_fetch'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    return _worksheet.get_all_values()
+    return get_worksheet_snapshot(worksheet).values
+
+# 스냅샷 버전별 읽기 전용 데이터프레임 (버전마다 한 번만 만들고 모든 세션이 복사 없이 공유)
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _get_snapshot_frame(worksheet_key, snapshot_version, _values):
+    return values_to_dataframe(_values, read_only=True)
+
+def get_worksheet_frame(worksheet):
+    """워크시트 데이터를 읽기 전용 데이터프레임으로 반환합니다. (수정이 필요하면 copy() 사용)"""
+    snapshot = get_worksheet_snapshot(worksheet)
+    return _get_snapshot_frame(get_worksheet_key(worksheet), snapshot.version, snapshot.values)
+
+# 캐시 무효화는 스냅샷 저장소에 위임
+get_worksheet_data.clear = lambda: get_snapshot_store().invalidate()
 
 # 업로드 후 캐시를 명시적으로 갱신하는 함수
 def refresh_worksheet_data():
@@ -245,12 +290,106 @@ def refresh_worksheet_data():
     # 페이지 자동 새로고침을 위한 플래그
     st.session_state['data_updated'] = True
     
+# Google Sheets 에서 직접 수정한 내용 확인 (전체 캐시를 비우지 않고 바뀐 블록만 반영)
+def check_sheet_drift(target_spreadsheet, targets):
+    """
+    문서 수정 시각을 먼저 확인하고, 바뀌었으면 워크시트마다 NO·요청일 열만 읽어 다른 블록의 행만 다시 읽습니다.
+    (두 열이 모두 같으면 다른 열이 수정된 것이므로 전체를 다시 읽음)
+    targets: [(워크시트, 요청일 열 인덱스), ...]
+    결과 메시지 목록을 반환합니다.
+    """
+    store = get_snapshot_store()
+    report = []
+    try:
+        modified = target_spreadsheet.get_lastUpdateTime()
+    except Exception as e:
+        logging.warning(f"문서 수정 시각 조회 실패: {str(e)[:200]}")
+        modified = None
+    for target_worksheet, date_col_idx in targets:
+        try:
+            snapshot, mode = store.check_drift(
+                get_worksheet_key(target_worksheet), modified, target_worksheet.get_all_values,
+                lambda cached: read_drifted_values(target_worksheet, cached, date_col_idx),
+            )
+        except Exception as e:
+            report.append(f"{target_worksheet.title}: 확인 중 오류 ({str(e)[:100]})")
+            continue
+        if mode == "skipped":
+            report.append(f"{target_worksheet.title}: 변경 없음 (문서 수정 시각이 같아 읽지 않음)")
+        elif snapshot.changed_rows is None:
+            report.append(f"{target_worksheet.title}: 캐시된 데이터가 없어 새로 읽었습니다.")
+        elif not snapshot.changed_rows:
+            report.append(f"{target_worksheet.title}: 변경 없음")
+        else:
+            ranges = ", ".join(f"{first}~{last}행" for first, last in snapshot.changed_rows)
+            how = "NO·요청일 열로 찾은 블록만 읽음" if mode == "partial" else "다른 열 수정으로 전체를 다시 읽음"
+            report.append(f"{target_worksheet.title}: 바뀐 구간 {ranges} ({how})")
+    st.session_state.cache_refreshed = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return report
+
+# 현업문의 응답 시간 집계 (프로세스당 하나, 이 프로세스에서 추가한 문의는 바로 반영)
+@st.cache_resource
+def get_sla_tracker():
+    return SlaTracker()
+
+# 새 행 번호(NO) 계산용 데이터 행 수
+def current_data_row_count(kind, worksheet):
+    """
+    NO 열과 요청일 열만 새로 읽어 헤더를 제외한 데이터 행 수를 반환합니다. (다른 세션이 방금 추가한 행까지 반영)
+    Google Sheets 장애 중이면 캐시된 데이터로 계산합니다.
+    """
+    if not sheets_unavailable():
+        try:
+            return count_data_rows(worksheet, SHEET_SECTIONS[kind]["date_col_idx"])
+        except Exception as e:
+            if not is_dependency_failure(e):
+                raise
+    sheet_data = get_worksheet_data(worksheet)
+    return len(sheet_data) - 1 if len(sheet_data) > 0 else 0
+
+# 중복 확인 인덱스 (스냅샷 버전마다 한 번만 생성하고 읽기 전용으로 공유)
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _get_dedup_index(worksheet_key, snapshot_version, kind, _values):
+    section = SHEET_SECTIONS[kind]
+    key_indices = dedup_key_indices(section["headers"], section["dedup_key_columns"])
+    return build_dedup_index(_values, key_indices, section["date_col_idx"])
+
+# 업로드 데이터를 워크시트 행으로 변환하고 중복 행 분리
+def prepare_upload_rows(kind, target_worksheet, df, content_key):
+    """
+    반환값: (추가할 행 목록, [(오류 행 인덱스, 오류 메시지), ...], [(중복 행, 사유), ...])
+    같은 파일(content_key)과 같은 시트 스냅샷 버전이면 세션에 보관한 결과를 그대로 반환합니다.
+    """
+    section = SHEET_SECTIONS[kind]
+    snapshot = get_worksheet_snapshot(target_worksheet)
+    memo_key = (content_key, get_worksheet_key(target_worksheet), snapshot.version)
+    memo = st.session_state.get(f"{kind}_upload_prepared")
+    if memo is not None and memo[0] == memo_key:
+        return memo[1]
+    
+    sheet_data = snapshot.values
+    # 헤더 행을 제외한 데이터 행 수 계산
+    current_row_count = len(sheet_data) - 1 if len(sheet_data) > 0 else 0
+    
+    rows, row_errors = section["build_rows"](df, current_row_count)
+    # 여러 파일을 합친 경우에도 요청일 순서로 추가되도록 정렬 (요청일은 YYYY-MM-DD 형식이므로 문자열 정렬)
+    rows.sort(key=lambda row: row[section["date_col_idx"]])
+    existing_keys = _get_dedup_index(get_worksheet_key(target_worksheet), snapshot.version, kind, sheet_data)
+    key_indices = dedup_key_indices(section["headers"], section["dedup_key_columns"])
+    new_rows, duplicates = split_duplicate_rows(
+        rows, existing_keys, key_indices, section["date_col_idx"], current_row_count
+    )
+    st.session_state[f"{kind}_upload_prepared"] = (memo_key, (new_rows, row_errors, duplicates))
+    return new_rows, row_errors, duplicates
+
 # 성능 최적화를 위한 함수 추가
 @st.cache_data(ttl=600)  # 10분 동안 캐싱
-def get_spreadsheet_info(gs_client, sheet_name):
-    """스프레드시트 정보를 가져오고 캐싱합니다."""
+def get_spreadsheet_info(_gs_client, sheet_name):
+    """스프레드시트 정보를 가져오고 캐싱합니다. (클라이언트는 캐시 키에서 제외)"""
+    import gspread  # Google Sheets API 연동
+    
     try:
-        sheet = gs_client.open(sheet_name)
+        sheet = _gs_client.open(sheet_name)
         return {
             "url": sheet.url,
             "exists": True
@@ -334,21 +473,10 @@ st.markdown("""
         color: #424242;
         margin-bottom: 2rem;
     }
-    .stTabs [data-baseweb="tab-list"] {
+    /* 탭 선택 라디오 버튼 */
+    div[role="radiogroup"] {
         gap: 10px;
     }
-    .stTabs [data-baseweb="tab"] {
-        height: 50px;
-        white-space: pre-wrap;
-        border-radius: 4px 4px 0 0;
-        gap: 1px;
-        padding-top: 10px;
-        padding-bottom: 10px;
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #1E88E5;
-        color: white;
-    }
     .block-container {
         max-width: 1000px;  /* 콘텐츠 최대 너비 제한 */
         padding-top: 2rem;
@@ -360,46 +488,82 @@ st.markdown("""
 st.markdown('<p class="main-header">🛠 SM Activity 기록 프로그램</p>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Google Sheets API를 활용한 SM Activity 및 현업문의 관리 시스템</p>', unsafe_allow_html=True)
 
-# Google Sheets API 클라이언트 초기화
-gs_client = setup_google_sheets()
-if not gs_client:
-    st.error("Google Sheets API에 연결할 수 없습니다.")
-    st.stop()
+# 마지막으로 연 문서/워크시트 (프로세스 단위, Google Sheets 장애 중에 캐시된 데이터로 화면을 그릴 때 사용)
+@st.cache_resource
+def get_document_handles():
+    return {}
 
-# 파일 선택 옵션 - 사용자가 선택할 수 있는 스프레드시트 옵션 정의
-sheet_options = {
-    "SM Activity - 대시보드": "SM Activity Dashboard",
-    "SM Activity - Plan": "SM Activity Plan"
-}
+# 시작 구간 (인증, 문서/워크시트 열기) - st.stop 으로 중단되어도 시간 기록과 cProfile 정리
+with profile_section("시작 (인증·문서 열기)"):
+    # Google Sheets API 클라이언트 초기화
+    gs_client = setup_google_sheets()
+    if not gs_client:
+        st.error("Google Sheets API에 연결할 수 없습니다.")
+        st.stop()
 
-# 사용자가 작업할 스프레드시트 선택을 위한 드롭다운 생성
-selected_sheet_name = st.selectbox(
-    "작성할 문서 선택", 
-    options=list(sheet_options.keys())
-)
+    # 파일 선택 옵션 - 사용자가 선택할 수 있는 스프레드시트 옵션 정의
+    sheet_options = {
+        "SM Activity - 대시보드": "SM Activity Dashboard",
+        "SM Activity - Plan": "SM Activity Plan"
+    }
+
+    # 사용자가 작업할 스프레드시트 선택을 위한 드롭다운 생성
+    selected_sheet_name = st.selectbox(
+        "작성할 문서 선택", 
+        options=list(sheet_options.keys())
+    )
 
-# 선택된 스프레드시트 이름 설정
-google_sheet_name = sheet_options[selected_sheet_name]
-worksheet_name = "SM Activity"  # 모든 시트에 동일한 워크시트 이름 사용
-inquiry_worksheet_name = "현업문의"  # 현업문의 워크시트 이름
-
-# 선택한 스프레드시트 열기 또는 생성
-spreadsheet = get_or_create_spreadsheet(gs_client, google_sheet_name)
-if not spreadsheet:
-    st.error("스프레드시트에 접근할 수 없습니다.")
-    st.stop()
-
-# 워크시트 열기 또는 생성
-worksheet = get_or_create_worksheet(spreadsheet, worksheet_name)
-if not worksheet:
-    st.error("워크시트에 접근할 수 없습니다.")
-    st.stop()
-
-# 현업문의 워크시트 열기 또는 생성
-inquiry_worksheet = get_or_create_inquiry_worksheet(spreadsheet, inquiry_worksheet_name)
-if not inquiry_worksheet:
-    st.error("현업문의 워크시트에 접근할 수 없습니다.")
-    st.stop()
+    # 선택된 스프레드시트 이름 설정
+    google_sheet_name = sheet_options[selected_sheet_name]
+    worksheet_name = "SM Activity"  # 모든 시트에 동일한 워크시트 이름 사용
+    inquiry_worksheet_name = "현업문의"  # 현업문의 워크시트 이름
+
+    # 모든 문서의 두 워크시트를 백그라운드에서 미리 읽고 주기적으로 갱신 (secrets 의 snapshot_warmer = false 로 끌 수 있음)
+    if st.secrets.get("snapshot_warmer", True):
+        start_snapshot_warmer(gs_client, tuple(
+            (sheet_name, name) for sheet_name in sheet_options.values() for name in (worksheet_name, inquiry_worksheet_name)
+        ))
+
+    document_handles = get_document_handles()
+    try:
+        # 회로가 열려 있으면 문서를 다시 열지 않고 마지막으로 연 문서 사용
+        if sheets_unavailable() and google_sheet_name in document_handles:
+            raise CircuitOpenError("Google Sheets 연결이 차단되어 있습니다.")
+    
+        # 선택한 스프레드시트 열기 또는 생성
+        spreadsheet = get_or_create_spreadsheet(gs_client, google_sheet_name)
+        if not spreadsheet:
+            st.error("스프레드시트에 접근할 수 없습니다.")
+            st.stop()
+    
+        # 워크시트 열기 또는 생성
+        worksheet = get_or_create_worksheet(spreadsheet, worksheet_name)
+        if not worksheet:
+            st.error("워크시트에 접근할 수 없습니다.")
+            st.stop()
+    
+        # 현업문의 워크시트 열기 또는 생성
+        inquiry_worksheet = get_or_create_inquiry_worksheet(spreadsheet, inquiry_worksheet_name)
+        if not inquiry_worksheet:
+            st.error("현업문의 워크시트에 접근할 수 없습니다.")
+            st.stop()
+    
+        document_handles[google_sheet_name] = (spreadsheet, worksheet, inquiry_worksheet)
+    except Exception as e:
+        # 장애가 아니거나 한 번도 열어 본 적 없는 문서면 계속 진행할 수 없음
+        if not is_dependency_failure(e) or google_sheet_name not in document_handles:
+            st.error(f"Google Sheets에 연결할 수 없습니다: {str(e)[:200]}")
+            st.stop()
+        spreadsheet, worksheet, inquiry_worksheet = document_handles[google_sheet_name]
+
+    # Google Sheets 장애 중에는 마지막으로 가져온 데이터로 화면 표시 (입력한 데이터는 대기열에 저장)
+    if sheets_unavailable():
+        circuit_status = get_circuit_breaker().status()
+        st.warning(
+            "⚠️ Google Sheets 응답이 없어 마지막으로 불러온 데이터를 표시합니다. "
+            "지금 입력한 데이터는 대기열에 저장되었다가 연결이 복구되면 자동으로 추가됩니다. "
+            f"(다시 연결 시도까지 {int(circuit_status['retry_in'] or 0)}초, 마지막 오류: {circuit_status['last_error']})"
+        )
 
 # 스프레드시트 링크 항상 표시
 st.markdown("### 📊 Google 스프레드시트")
@@ -412,7 +576,7 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # 사용 가능한 스프레드시트 목록을 더 깔끔하게 표시
-with st.expander("모든 스프레드시트 목록"):
+with st.expander("모든 스프레드시트 목록"), profile_section("스프레드시트 목록"):
     for sheet_label, sheet_name in sheet_options.items():
         # 현재 선택된 시트인지 확인
         is_current = sheet_name == google_sheet_name
@@ -433,318 +597,639 @@ with st.expander("모든 스프레드시트 목록"):
     st.info("접근 권한이 없다면 다시 앱을 로드하거나, 스프레드시트 소유자에게 권한을 요청하세요.")
 
 # 디버깅 정보를 사이드바에 추가
-with st.sidebar:
+with st.sidebar, profile_section("사이드바"):
     st.subheader("🧩 시스템 정보")
     with st.expander("캐시 및 데이터 상태"):
         st.write(f"마지막 데이터 조회: {st.session_state.get('last_data_fetch', '없음')}")
         st.write(f"마지막 캐시 갱신: {st.session_state.get('cache_refreshed', '없음')}")
+        # 프로세스에 저장된 워크시트 스냅샷과 경과 시간 (유효 시간이 지나면 백그라운드에서 갱신)
+        snapshot_store = get_snapshot_store()
+        for key, snapshot in snapshot_store.snapshots().items():
+            st.caption(f"스냅샷 {key}: {snapshot.fetched_at_text} ({int(snapshot.age())}초 전)")
+        # 동시에 같은 워크시트를 읽으려던 요청을 하나로 합친 횟수
+        st.caption(f"시트 조회 {snapshot_store.fetch_count}회 · 동시 요청 합침 {snapshot_store.coalesced_count}회")
+        # 새로 읽은 데이터를 블록 해시로 비교한 결과 (변경 없으면 스냅샷 버전 유지)
+        st.caption(
+            f"변경 없음 {snapshot_store.unchanged_count}회 · 변경 감지 {snapshot_store.drift_count}회 · "
+            f"수정 시각이 같아 읽지 않음 {snapshot_store.skipped_count}회 · 바뀐 블록만 읽음 {snapshot_store.partial_count}회"
+        )
+        if st.button("🔍 시트 직접 수정 확인", disabled=sheets_unavailable(),
+                     help="문서 수정 시각을 확인하고, 바뀌었으면 NO·요청일 열로 캐시와 다른 행 블록을 찾아 그 블록만 다시 읽습니다. (다른 문서의 캐시는 유지)"):
+            st.session_state.drift_report = check_sheet_drift(
+                spreadsheet, [(worksheet, ACTIVITY_DATE_COL_IDX), (inquiry_worksheet, INQUIRY_DATE_COL_IDX)]
+            )
+            # 이번 실행에서 이미 읽은 스냅샷 대신 확인한 데이터로 다시 표시
+            st.rerun()
+        if st.session_state.get("drift_report"):
+            for line in st.session_state.drift_report:
+                st.caption(line)
         if st.button("캐시 수동 갱신"):
             get_worksheet_data.clear()
             st.session_state.cache_refreshed = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             st.success("✅ 캐시가 갱신되었습니다.")
             st.rerun()
+    # Sheets API 호출 수, 지연 시간, 할당량 사용량
+    render_metrics_sidebar()
+    # 화면 실행 구간별 p50/p95 (secrets 의 profiler_admin = true 면 cProfile 수집 기능 표시)
+    render_profiler_sidebar(admin=st.secrets.get("profiler_admin", False))
 
-# 통합 다운로드 버튼 섹션 추가
-st.subheader("📥 데이터 다운로드")
-with st.expander("모든 데이터 다운로드"):
-    # 모든 시트의 데이터를 하나의 엑셀 파일로 다운로드
-    st.markdown("현재 선택된 스프레드시트의 모든 데이터를 하나의 엑셀 파일로 다운로드할 수 있습니다.")
-    
-    # 통합 다운로드 버튼
-    if st.button("전체 데이터 엑셀 파일 다운로드"):
-        try:
-            with st.spinner("엑셀 파일 생성 중..."):
-                # 엑셀 파일 생성
-                excel_buffer = BytesIO()
-                with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                    # SM Activity 데이터 가져오기
-                    activity_data = get_worksheet_data(worksheet)
-                    if len(activity_data) > 0:
-                        activity_df = pd.DataFrame(activity_data[1:], columns=activity_data[0])
-                        activity_df.to_excel(writer, index=False, sheet_name=worksheet_name)
-                        
-                        # 엑셀 서식 설정 - SM Activity 시트
-                        workbook = writer.book
-                        worksheet_excel = writer.sheets[worksheet_name]
-                        
-                        # 헤더 스타일 설정
-                        for col_num, value in enumerate(activity_df.columns.values, 1):
-                            cell = worksheet_excel.cell(row=1, column=col_num)
-                            cell.font = Font(bold=True)
-                            cell.alignment = Alignment(horizontal="center", vertical="center")
-                        
-                        # 열 너비 설정
-                        worksheet_excel.column_dimensions['E'].width = 30  # TASK 컬럼
-                        worksheet_excel.column_dimensions['F'].width = 15  # 요청일 컬럼
-                        worksheet_excel.column_dimensions['G'].width = 15  # 작업일 컬럼
-                        worksheet_excel.column_dimensions['L'].width = 40  # 내용 컬럼
-                    
-                    # 현업문의 데이터 가져오기
-                    inquiry_data = get_worksheet_data(inquiry_worksheet)
-                    if len(inquiry_data) > 0:
-                        inquiry_df = pd.DataFrame(inquiry_data[1:], columns=inquiry_data[0])
-                        inquiry_df.to_excel(writer, index=False, sheet_name=inquiry_worksheet_name)
-                        
-                        # 엑셀 서식 설정 - 현업문의 시트
-                        workbook = writer.book
-                        inquiry_worksheet_excel = writer.sheets[inquiry_worksheet_name]
-                        
-                        # 헤더 스타일 설정
-                        for col_num, value in enumerate(inquiry_df.columns.values, 1):
-                            cell = inquiry_worksheet_excel.cell(row=1, column=col_num)
-                            cell.font = Font(bold=True)
-                            cell.alignment = Alignment(horizontal="center", vertical="center")
-                        
-                        # 열 너비 설정
-                        inquiry_worksheet_excel.column_dimensions['E'].width = 20  # 요청부서 컬럼
-                        inquiry_worksheet_excel.column_dimensions['F'].width = 40  # 문의사항 컬럼
-                        inquiry_worksheet_excel.column_dimensions['G'].width = 15  # 요청일 컬럼
-                        inquiry_worksheet_excel.column_dimensions['H'].width = 15  # 답변일 컬럼
-                
-                excel_buffer.seek(0)
-                
-                # 다운로드 버튼 생성
-                download_filename = f"{google_sheet_name}_통합데이터.xlsx"
-                st.download_button(
-                    label="📥 통합 엑셀 파일 다운로드",
-                    data=excel_buffer,
-                    file_name=download_filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-                
-                st.success(f"✅ 통합 엑셀 파일이 생성되었습니다. 위 버튼을 클릭하여 다운로드하세요.")
-                st.info(f"📊 파일 정보: SM Activity 및 현업문의 데이터가 각각 별도의 시트에 포함되어 있습니다.")
-        except Exception as e:
-            st.error(f"엑셀 파일 생성 중 오류가 발생했습니다: {str(e)[:200]}...")
+# 도움말 내용
+HELP_MARKDOWN = """
+### 사용 방법
 
-# 탭 인터페이스 생성
-tab1, tab2 = st.tabs(["SM Activity", "현업문의"])
+#### SM Activity 탭
+1. 작성할 문서 유형을 선택합니다.
+2. 요청일을 선택하면 작업일이 자동으로 설정됩니다.
+3. 작업 정보를 입력하고 '추가하기' 버튼을 클릭합니다.
+4. 입력된 데이터는 자동으로 날짜순 정렬됩니다.
+5. **일괄 업로드**: '엑셀 파일 업로드' 섹션을 통해 여러 SM 활동을 한 번에 추가할 수 있습니다. 필요한 열 형식은 샘플 템플릿을 참고하세요. 여러 파일이나 zip 파일도 한 번에 올릴 수 있습니다.
 
-# 세션 상태를 사용하여 현재 선택된 탭 추적
-if 'current_tab' not in st.session_state:
-    st.session_state.current_tab = "SM Activity"
+#### 현업문의 탭
+1. 요청일을 선택하면 답변일이 자동으로 설정됩니다.
+2. 문의 정보를 입력하고 '추가하기' 버튼을 클릭합니다.
+3. 입력된 데이터는 자동으로 요청일 기준으로 정렬됩니다.
+4. **일괄 업로드**: '엑셀 파일 업로드' 섹션을 통해 여러 현업문의를 한 번에 추가할 수 있습니다. 필요한 열 형식은 샘플 템플릿을 참고하세요.
+
+#### 데이터 다운로드
+1. 각 탭에서 해당 데이터만 다운로드:
+   - SM Activity 탭에서는 "SM Activity 엑셀 파일 생성" 버튼을 클릭한 뒤 "SM Activity 엑셀 다운로드" 버튼으로 SM Activity 데이터만 다운로드할 수 있습니다.
+   - 현업문의 탭에서는 "현업문의 엑셀 파일 생성" 버튼을 클릭한 뒤 "현업문의 엑셀 다운로드" 버튼으로 현업문의 데이터만 다운로드할 수 있습니다.
 
-# 탭이 변경되면 호출되는 콜백 함수
-def update_current_tab(tab_name):
-    st.session_state.current_tab = tab_name
+2. 모든 데이터 통합 다운로드:
+   - 상단의 '데이터 다운로드' 섹션을 클릭합니다.
+   - '전체 데이터 엑셀 파일 다운로드' 버튼을 클릭하면 SM Activity와 현업문의 데이터가 하나의 엑셀 파일(여러 시트)로 다운로드됩니다.
 
-with tab1:
-    # SM Activity 탭을 선택했음을 세션 상태에 저장
-    update_current_tab("SM Activity")
+### 엑셀 파일 업로드
+엑셀 파일을 통해 여러 데이터를 한 번에 추가할 수 있습니다 (CSV, Parquet 파일도 같은 열 구성이면 업로드 가능):
+
+#### SM Activity 데이터
+1. SM Activity 탭에서 샘플 템플릿을 다운로드하여 형식을 확인합니다.
+2. 업로드할 엑셀 파일은 다음 열들을 포함해야 합니다:
+   - **구분**: 정기/비정기
+   - **작업유형**: 조간점검, 재적재 등
+   - **TASK**: 작업 제목
+   - **요청일**: 날짜 형식 (YYYY-MM-DD)
+   - **요청자**: 요청자 이름
+   - **결과**: 진행 중, 완료, 보류, 기타
+
+#### 현업문의 데이터
+1. 현업문의 탭에서 샘플 템플릿을 다운로드하여 형식을 확인합니다.
+2. 업로드할 엑셀 파일은 다음 열들을 포함해야 합니다:
+   - **문의방법**: Social Desk, MAIL, 메신저, 전화
+   - **문의유형**: 개발사전검토, 데이터확인 등
+   - **요청부서**: 부서명
+   - **문의사항**: 문의 내용
+   - **요청일**: 날짜 형식 (YYYY-MM-DD)
+   - **요청자**: 요청자 이름
+
+### 주의사항
+- 데이터는 Google 스프레드시트에 저장되며, 권한이 있는 사용자만 접근할 수 있습니다.
+- 대량의 데이터를 업로드할 경우 시간이 다소 소요될 수 있습니다. 업로드는 백그라운드에서 진행되므로 다른 화면으로 이동해도 됩니다.
+- 각 탭에서는 해당 탭에 맞는 데이터만 업로드해야 합니다. (SM Activity 탭에서는 SM Activity 데이터, 현업문의 탭에서는 현업문의 데이터)
+- 문제가 발생하면 관리자에게 문의하세요.
+"""
+
+# 샘플 템플릿 엑셀 파일 생성 (날짜가 바뀔 때만 다시 생성)
+@st.cache_data
+def build_sample_template(kind, today_str):
+    """업로드 양식에 맞는 샘플 템플릿 엑셀 파일(bytes)을 생성합니다."""
+    import pandas as pd  # 데이터 처리를 위한 라이브러리
     
-    # SM Activity 탭 내용
-    # 엑셀 파일 업로드 섹션 추가
-    st.subheader("📤 엑셀 파일 업로드")
-    with st.expander("엑셀 파일을 업로드하여 데이터 일괄 추가"):
-        # 샘플 템플릿 다운로드 기능 추가
-        st.markdown("#### 샘플 템플릿 다운로드")
+    today = datetime.strptime(today_str, "%Y-%m-%d")
+    if kind == "activity":
         sample_df = pd.DataFrame({
             '구분': ['정기', '비정기'],
             '작업유형': ['조간점검', '인프라 작업'],
             'TASK': ['데일리 점검', '서버 업그레이드'],
-            '요청일': [datetime.today().strftime("%Y-%m-%d"), (datetime.today() - pd.Timedelta(days=1)).strftime("%Y-%m-%d")],
+            '요청일': [today.strftime("%Y-%m-%d"), (today - pd.Timedelta(days=1)).strftime("%Y-%m-%d")],
             '요청자': ['홍길동', '김철수'],
             'IT': ['한상욱', '한상욱'],
             'CNS': ['이정인', '이정인'],
             '개발자': ['위승빈', '위승빈'],
             '결과': ['완료', '진행 중']
         })
+        sheet_name = 'SM Activity'
+    else:
+        sample_df = pd.DataFrame({
+            '문의방법': ['Social Desk', 'MAIL', '메신저', '전화'],
+            '문의유형': ['개발사전검토', '데이터확인', '접속/권한문의', '공통'],
+            '요청부서': ['인사팀', '마케팅팀', '영업팀', 'IT팀'],
+            '문의사항': ['시스템 접근 권한 요청', '데이터 오류 확인', '기능 사용법 문의', '시스템 오류 보고'],
+            '요청일': [today.strftime("%Y-%m-%d"), (today - pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+                     (today - pd.Timedelta(days=2)).strftime("%Y-%m-%d"), (today - pd.Timedelta(days=3)).strftime("%Y-%m-%d")],
+            '요청자': ['홍길동', '김철수', '이영희', '박민수'],
+            'IT': ['한상욱', '한상욱', '한상욱', '한상욱'],
+            'CNS': ['이정인', '이정인', '이정인', '이정인'],
+            '개발자': ['위승빈', '위승빈', '위승빈', '위승빈']
+        })
+        sheet_name = '현업문의'
+
+    # 샘플 템플릿을 엑셀로 변환
+    sample_buffer = BytesIO()
+    with pd.ExcelWriter(sample_buffer, engine='openpyxl') as writer:
+        sample_df.to_excel(writer, index=False, sheet_name=sheet_name)
+    return sample_buffer.getvalue()
+
+# 탭별 업로드/조회 섹션 설정
+SHEET_SECTIONS = {
+    "activity": {
+        "sheet_name": worksheet_name,
+        "headers": ACTIVITY_HEADERS,
+        "column_widths": ACTIVITY_COLUMN_WIDTHS,
+        "date_col_idx": ACTIVITY_DATE_COL_IDX,
+        "required_columns": ACTIVITY_REQUIRED_COLUMNS,
+        "dedup_key_columns": ACTIVITY_DEDUP_KEY_COLUMNS,
+        "build_rows": build_activity_rows,
+        "upload_expander": "엑셀 파일을 업로드하여 데이터 일괄 추가",
+        "uploader_label": "SM Activity 양식의 엑셀/CSV/Parquet 파일을 업로드하세요",
+        "uploader_key": "sm_activity_uploader",
+        "upload_button_key": "sm_activity_upload_btn",
+        "template_file": "SM_Activity_Template.xlsx",
+        "data_subheader": "📊 현재 기록된 데이터",
+        "empty_message": "아직 기록된 데이터가 없습니다. 위 양식을 통해 새 활동을 추가해주세요.",
+        "error_message": "데이터 조회 중 오류가 발생했습니다",
+        "download_label": "SM Activity",
+        "download_suffix": "SM_Activity",
+        "export_button_key": "sm_activity_export_btn",
+        "editor_key": "sm_activity_editor",
+        "status_column": ACTIVITY_RESULT_COLUMN,
+        "status_options": ACTIVITY_RESULT_OPTIONS,
+        "requester_column": "요청자",
+    },
+    "inquiry": {
+        "sheet_name": inquiry_worksheet_name,
+        "headers": INQUIRY_HEADERS,
+        "column_widths": INQUIRY_COLUMN_WIDTHS,
+        "date_col_idx": INQUIRY_DATE_COL_IDX,
+        "required_columns": INQUIRY_REQUIRED_COLUMNS,
+        "dedup_key_columns": INQUIRY_DEDUP_KEY_COLUMNS,
+        "build_rows": build_inquiry_rows,
+        "upload_expander": "엑셀 파일을 업로드하여 문의 데이터 일괄 추가",
+        "uploader_label": "현업문의 양식의 엑셀/CSV/Parquet 파일을 업로드하세요",
+        "uploader_key": "inquiry_uploader",
+        "upload_button_key": "inquiry_upload_btn",
+        "template_file": "현업문의_Template.xlsx",
+        "data_subheader": "📊 현재 기록된 문의 데이터",
+        "empty_message": "아직 기록된 문의 데이터가 없습니다. 위 양식을 통해 새 문의를 추가해주세요.",
+        "error_message": "문의 데이터 조회 중 오류가 발생했습니다",
+        "download_label": "현업문의",
+        "download_suffix": "현업문의",
+        "export_button_key": "inquiry_export_btn",
+        "editor_key": "inquiry_editor",
+        "status_column": None,
+        "status_options": None,
+        "requester_column": "요청자",
+    },
+}
+
+# 모든 문서 통합 다운로드의 동시 조회 작업 수
+EXPORT_WORKERS = 4
+
+# 모든 문서의 두 워크시트 데이터를 동시에 가져오기
+def fetch_all_document_values():
+    """
+    sheet_options 의 모든 문서에서 두 워크시트의 데이터를 동시에 가져옵니다.
+    스냅샷 저장소를 거치므로 이미 읽어 둔 워크시트는 API를 호출하지 않고, 처음 연 문서는 핸들을 저장해 둡니다.
+    (다운로드에서는 문서를 새로 만들지 않음)
+    반환값: ([(문서 이름, 워크시트 이름, 데이터), ...] sheet_options 순서, [(대상, 오류 메시지), ...])
+    """
+    import gspread  # Google Sheets API 연동
+    
+    store = get_snapshot_store()
+    handles = get_document_handles()
+    
+    def open_document(sheet_name):
+        if sheet_name in handles:
+            return handles[sheet_name]
+        spreadsheet = gs_client.open(sheet_name)
+        opened = (spreadsheet, spreadsheet.worksheet(worksheet_name), spreadsheet.worksheet(inquiry_worksheet_name))
+        handles[sheet_name] = opened
+        return opened
+    
+    def fetch(target_worksheet):
+        return store.get(get_worksheet_key(target_worksheet), target_worksheet.get_all_values).values
+    
+    values = {}
+    errors = []
+    with ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export") as pool:
+        # 문서를 모두 동시에 열고, 열리는 대로 두 워크시트 조회를 시작
+        opening = {pool.submit(open_document, sheet_name): label for label, sheet_name in sheet_options.items()}
+        fetching = {}
+        for future in as_completed(opening):
+            label = opening[future]
+            try:
+                _, activity_ws, inquiry_ws = future.result()
+            except gspread.exceptions.SpreadsheetNotFound:
+                errors.append((label, "아직 생성되지 않은 문서입니다."))
+                continue
+            except Exception as e:
+                errors.append((label, str(e)[:200]))
+                continue
+            for name, target_worksheet in ((worksheet_name, activity_ws), (inquiry_worksheet_name, inquiry_ws)):
+                fetching[pool.submit(fetch, target_worksheet)] = (label, name)
+        for future, (label, name) in fetching.items():
+            try:
+                values[(label, name)] = future.result()
+            except Exception as e:
+                errors.append((f"{label} / {name}", str(e)[:200]))
+    
+    ordered = [
+        (label, name, values[(label, name)])
+        for label in sheet_options for name in (worksheet_name, inquiry_worksheet_name)
+        if (label, name) in values
+    ]
+    return ordered, errors
+
+# 통합 다운로드 섹션 (버튼 클릭 시 이 섹션만 다시 실행)
+@rerun_fragment
+def render_download_section(worksheet, inquiry_worksheet):
+    st.subheader("📥 데이터 다운로드")
+    with st.expander("모든 데이터 다운로드"):
+        # 모든 시트의 데이터를 하나의 엑셀 파일로 다운로드
+        st.markdown("현재 선택된 스프레드시트 또는 모든 스프레드시트의 데이터를 하나의 엑셀 파일로 다운로드할 수 있습니다.")
         
-        # 샘플 템플릿을 엑셀로 변환
-        sample_buffer = BytesIO()
-        with pd.ExcelWriter(sample_buffer, engine='openpyxl') as writer:
-            sample_df.to_excel(writer, index=False, sheet_name='SM Activity')
-        sample_buffer.seek(0)
+        # 다운로드 범위와 시트 구성 선택
+        export_scope = st.radio("다운로드 범위", ["현재 문서", "모든 문서"], horizontal=True, key="export_scope")
+        merge_sheets = False
+        if export_scope == "모든 문서":
+            export_layout = st.radio(
+                "시트 구성", ["문서별 시트", "워크시트별로 합치기"], horizontal=True, key="export_layout",
+                help="워크시트별로 합치면 모든 문서의 SM Activity/현업문의 데이터를 각각 한 시트에 모으고, 첫 열에 출처 문서를 표시합니다."
+            )
+            merge_sheets = export_layout == "워크시트별로 합치기"
         
-        # 샘플 템플릿 다운로드 버튼
-        st.download_button(
-            label="📝 샘플 템플릿 다운로드",
-            data=sample_buffer,
-            file_name="SM_Activity_Template.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            help="업로드 양식에 맞는 샘플 엑셀 템플릿을 다운로드합니다."
-        )
+        # 통합 다운로드 버튼
+        export_clicked = st.button("전체 데이터 엑셀 파일 다운로드")
+        
+        # 모든 문서 통합 다운로드 (문서를 바꿔 가며 따로 받을 필요 없음)
+        if export_clicked and export_scope == "모든 문서":
+            try:
+                with st.spinner("모든 문서의 데이터를 가져오는 중..."), profile_section("모든 문서 조회"):
+                    document_values, fetch_errors = fetch_all_document_values()
+                
+                for target, message in fetch_errors:
+                    st.warning(f"{target}: 데이터를 가져오지 못해 제외합니다. ({message})")
+                
+                column_widths = {worksheet_name: ACTIVITY_COLUMN_WIDTHS, inquiry_worksheet_name: INQUIRY_COLUMN_WIDTHS}
+                with st.spinner("엑셀 파일 생성 중..."), profile_section("엑셀 생성"):
+                    export_sheets = build_consolidated_sheets(
+                        [(label, name, values, column_widths[name]) for label, name, values in document_values],
+                        merge=merge_sheets,
+                    )
+                    excel_buffer = build_excel_file(export_sheets) if export_sheets else None
+                
+                if excel_buffer is None:
+                    st.info("다운로드할 데이터가 없습니다.")
+                else:
+                    st.download_button(
+                        label="📥 통합 엑셀 파일 다운로드",
+                        data=excel_buffer,
+                        file_name="모든문서_통합데이터.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
+                    st.success(f"✅ {len({label for label, _, _ in document_values})}개 문서의 통합 엑셀 파일이 생성되었습니다. 위 버튼을 클릭하여 다운로드하세요.")
+                    st.info(f"📊 파일 정보: {', '.join(name for name, _, _ in export_sheets)} 시트가 포함되어 있습니다.")
+            except Exception as e:
+                st.error(f"엑셀 파일 생성 중 오류가 발생했습니다: {str(e)[:200]}...")
+        
+        # 현재 문서 통합 다운로드
+        if export_clicked and export_scope == "현재 문서":
+            try:
+                with st.spinner("엑셀 파일 생성 중..."):
+                    # 엑셀 파일에 포함할 시트 목록
+                    export_sheets = []
+                    
+                    # SM Activity 데이터 가져오기
+                    if len(get_worksheet_data(worksheet)) > 0:
+                        export_sheets.append((worksheet_name, get_worksheet_frame(worksheet), ACTIVITY_COLUMN_WIDTHS))
+                    
+                    # 현업문의 데이터 가져오기
+                    if len(get_worksheet_data(inquiry_worksheet)) > 0:
+                        export_sheets.append((inquiry_worksheet_name, get_worksheet_frame(inquiry_worksheet), INQUIRY_COLUMN_WIDTHS))
+                    
+                    # 엑셀 파일 생성
+                    with profile_section("엑셀 생성"):
+                        excel_buffer = build_excel_file(export_sheets)
+                    
+                    # 다운로드 버튼 생성
+                    download_filename = f"{google_sheet_name}_통합데이터.xlsx"
+                    st.download_button(
+                        label="📥 통합 엑셀 파일 다운로드",
+                        data=excel_buffer,
+                        file_name=download_filename,
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
+                    
+                    st.success(f"✅ 통합 엑셀 파일이 생성되었습니다. 위 버튼을 클릭하여 다운로드하세요.")
+                    st.info(f"📊 파일 정보: SM Activity 및 현업문의 데이터가 각각 별도의 시트에 포함되어 있습니다.")
+            except Exception as e:
+                st.error(f"엑셀 파일 생성 중 오류가 발생했습니다: {str(e)[:200]}...")
+
+# 엑셀 파일 업로드 섹션 (파일 선택/추가 버튼은 이 섹션만 다시 실행)
+@rerun_fragment
+def render_upload_section(kind, target_worksheet):
+    section = SHEET_SECTIONS[kind]
+    st.subheader("📤 엑셀 파일 업로드")
+    # 진행 중인 업로드 작업과 할당량 오류 등으로 중단된 업로드를 먼저 표시
+    render_upload_jobs(kind, target_worksheet)
+    with st.expander(section["upload_expander"]):
+        # 샘플 템플릿 다운로드 기능 추가 (접힌 상태에서도 실행되므로 요청할 때만 생성)
+        st.markdown("#### 샘플 템플릿 다운로드")
+        if st.button("📝 샘플 템플릿 준비", key=f"{kind}_template_btn",
+                     help="업로드 양식에 맞는 샘플 엑셀 템플릿을 생성합니다."):
+            st.download_button(
+                label="📝 샘플 템플릿 다운로드",
+                data=build_sample_template(kind, datetime.today().strftime("%Y-%m-%d")),
+                file_name=section["template_file"],
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                help="업로드 양식에 맞는 샘플 엑셀 템플릿을 다운로드합니다.",
+                key=f"{kind}_template_download"
+            )
         
         st.markdown("---")
         st.markdown("#### 데이터 업로드")
-        uploaded_file = st.file_uploader("SM Activity 양식의 엑셀 파일을 업로드하세요", type=["xlsx", "xls"], key="sm_activity_uploader")
+        uploaded_files = st.file_uploader(
+            section["uploader_label"], type=upload_file_types(), key=section["uploader_key"],
+            accept_multiple_files=True,
+            help="엑셀, CSV, Parquet 파일을 여러 개 또는 zip 으로 묶어 한 번에 올리면 요청일 순서로 합쳐서 한 번에 추가합니다."
+        )
         
-        if uploaded_file is not None:
+        if uploaded_files:
+            import pandas as pd  # 데이터 처리를 위한 라이브러리
+            
             try:
-                # 엑셀 파일 읽기
-                df = pd.read_excel(uploaded_file, sheet_name=0)
+                # 엑셀 파일 읽기 (zip 파일은 풀어서 처리, 같은 파일은 세션에서 한 번만 읽음)
+                with st.spinner("파일 읽는 중..."):
+                    content_key, results, df = parse_uploaded_files(kind, uploaded_files, section["required_columns"])
                 
-                # 데이터프레임 미리보기 
-                st.write("업로드한 데이터 미리보기:")
-                st.dataframe(df.head(5))
+                # 파일별 결과 (여러 파일이거나 읽지 못한 파일이 있을 때)
+                if len(results) > 1 or df is None:
+                    st.dataframe(pd.DataFrame({
+                        "파일": [name for name, _, _ in results],
+                        "행 수": [len(frame) if frame is not None else 0 for _, frame, _ in results],
+                        "상태": [error or "정상" for _, _, error in results],
+                    }), hide_index=True)
                 
-                # 필요한 열이 있는지 확인
-                required_columns = ["구분", "작업유형", "TASK", "요청일", "요청자", "결과"]
-                missing_columns = [col for col in required_columns if col not in df.columns]
-                
-                if missing_columns:
-                    st.error(f"업로드한 엑셀 파일에 다음 필수 열이 없습니다: {', '.join(missing_columns)}")
+                if df is None:
+                    st.error("업로드한 파일 중 추가할 수 있는 파일이 없습니다. 필수 열: " + ", ".join(section["required_columns"]))
                 else:
-                    # 업로드 버튼
-                    if st.button("데이터 추가하기", key="sm_activity_upload_btn"):
-                        # 현재 워크시트의 모든 데이터 가져오기
-                        sheet_data = get_worksheet_data(worksheet)
-                        # 헤더 행을 제외한 데이터 행 수 계산
-                        current_row_count = len(sheet_data) - 1 if len(sheet_data) > 0 else 0
-                        
-                        # 진행 상황 표시
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        status_text.text("데이터 처리 중...")
-                        
-                        # 배치로 추가할 모든 행 준비
-                        all_rows_to_add = []
-                        error_rows = []
-                        
-                        # 각 행을 순회하면서 데이터 준비
-                        for index, row in df.iterrows():
-                            try:
-                                # 진행 상황 업데이트 (10개 단위로 표시 업데이트)
-                                if index % 10 == 0 or index == len(df) - 1:
-                                    progress = (index + 1) / len(df)
-                                    progress_bar.progress(progress)
-                                    status_text.text(f"처리 중... {index + 1}/{len(df)}")
-                                
-                                # 요청일 처리 (날짜 형식 확인)
-                                try:
-                                    if pd.isna(row.get('요청일')):
-                                        req_date = datetime.today()
-                                    elif isinstance(row['요청일'], datetime):
-                                        req_date = row['요청일']
-                                    else:
-                                        # 문자열인 경우 파싱 시도
-                                        req_date = datetime.strptime(str(row['요청일']), "%Y-%m-%d")
-                                except:
-                                    req_date = datetime.today()
-                                
-                                # 작업일은 요청일과 동일하게 설정
-                                work_date = req_date
-                                
-                                # 새 행 번호 계산
-                                new_row_num = current_row_count + len(all_rows_to_add) + 1
-                                
-                                # 데이터 준비
-                                new_row_data = [
-                                    str(new_row_num),  # NO
-                                    req_date.strftime("%Y%m"),  # 월 정보
-                                    str(row.get('구분', '')),  # 구분
-                                    str(row.get('작업유형', '')),  # 작업유형
-                                    str(row.get('TASK', '')),  # TASK
-                                    req_date.strftime("%Y-%m-%d"),  # 요청일
-                                    work_date.strftime("%Y-%m-%d"),  # 작업일
-                                    str(row.get('요청자', '')),  # 요청자
-                                    str(row.get('IT', 'IT 담당자')),  # IT 담당자
-                                    str(row.get('CNS', 'CNS 담당자')),  # CNS 담당자
-                                    str(row.get('개발자', '개발자')),  # 개발자
-                                    str(row.get('내용', row.get('TASK', ''))),  # 내용
-                                    str(row.get('결과', '완료'))  # 결과
-                                ]
-                                
-                                # 배열에 추가
-                                all_rows_to_add.append(new_row_data)
-                                
-                            except Exception as e:
-                                error_rows.append(index)
-                                st.error(f"행 {index+1} 처리 중 오류 발생: {str(e)[:100]}...")
-                        
-                        # 배치 처리를 위한 상태 업데이트
-                        status_text.text("Google 스프레드시트에 데이터 추가 중...")
-                        
-                        try:
-                            # 배치 단위로 나누어 추가 (API 할당량 고려)
-                            batch_size = 25  # 한 번에 추가할 최대 행 수 감소
-                            success_count = 0
-                            
-                            for i in range(0, len(all_rows_to_add), batch_size):
-                                batch = all_rows_to_add[i:i+batch_size]
-                                if batch:
-                                    # 배치 단위로 데이터 추가
-                                    worksheet.append_rows(batch)
-                                    success_count += len(batch)
-                                    
-                                    # 배치 추가 후 진행 상황 업데이트
-                                    batch_progress = min(1.0, (i + len(batch)) / len(all_rows_to_add))
-                                    progress_bar.progress(batch_progress)
-                                    status_text.text(f"추가 중... {i + len(batch)}/{len(all_rows_to_add)} 행")
-                                    
-                                    # API 할당량 제한을 고려한 딜레이 (필요시)
-                                    if i + batch_size < len(all_rows_to_add):
-                                        status_text.text(f"API 할당량 제한 방지를 위해 잠시 대기 중... ({(i + len(batch))}/{len(all_rows_to_add)} 완료)")
-                                        time.sleep(3)  # 3초로 대기 시간 증가
-                            
-                            # 진행 상황 완료
-                            progress_bar.progress(1.0)
-                            status_text.text("처리 완료! 데이터 정렬 중...")
-                            
-                            # 요청일 기준으로 데이터 정렬
-                            try:
-                                sort_worksheet_by_date(worksheet)
-                                # 캐시 갱신 함수 호출
-                                refresh_worksheet_data()
-                                st.success(f"✅ 업로드 완료! 총 {success_count}개 행이 성공적으로 추가되었습니다. (오류: {len(error_rows)}개)")
-                                if error_rows:
-                                    st.warning(f"일부 행({len(error_rows)}개)에서 오류가 발생했습니다. 해당 행: {', '.join(map(str, [r+1 for r in error_rows]))}")
-                                # 데이터 업데이트 후 자동 새로고침
-                                st.rerun()
-                            except Exception as e:
-                                st.warning(f"데이터는 추가되었으나 정렬 중 오류가 발생했습니다: {str(e)[:150]}...")
-                                st.info("API 할당량 제한으로 인한 오류일 수 있습니다. 1-2시간 후에 다시 시도하거나, 단일 항목을 추가하여 자동 정렬을 트리거할 수 있습니다.")
-                            
-                        except Exception as e:
-                            st.error(f"데이터 배치 추가 중 오류가 발생했습니다: {str(e)[:200]}...")
-                            st.info("Google Sheets API 할당량 제한으로 인한 오류일 수 있습니다. 다음 조치를 취하세요:")
-                            st.markdown("""
-                            1. 1-2시간 기다린 후 다시 시도하세요 (API 할당량이 재설정됨).
-                            2. 더 작은 파일로 나누어 업로드하세요 (행 수를 줄임).
-                            3. 단일 항목을 한 번에 하나씩 추가하세요.
-                            """)
-                            # 성공한 행 수가 있다면 표시
-                            if success_count > 0:
-                                st.info(f"{success_count}개 행은 성공적으로 추가되었습니다.")
+                    skipped_files = [name for name, _, error in results if error]
+                    if skipped_files:
+                        st.warning(f"{len(skipped_files)}개 파일은 읽을 수 없거나 필수 열이 없어 제외합니다.")
+                    
+                    # 데이터프레임 미리보기 
+                    st.write(f"업로드한 데이터 미리보기: ({len(results) - len(skipped_files)}개 파일, {len(df)}행)")
+                    st.dataframe(df.head(5))
+                    
+                    # 기존 데이터와 중복되는 행은 미리 걸러서 보여줌 (API로 보내지 않음)
+                    with st.spinner("중복 데이터 확인 중..."):
+                        rows_to_add, row_errors, duplicates = prepare_upload_rows(kind, target_worksheet, df, content_key)
+                    
+                    # 변환 중 오류가 난 행 표시
+                    for index, message in row_errors:
+                        st.error(f"행 {index+1} 처리 중 오류 발생: {message[:100]}...")
+                    
+                    if duplicates:
+                        st.warning(f"중복된 {len(duplicates)}개 행은 추가하지 않습니다. (기준: {', '.join(section['dedup_key_columns'])})")
+                        duplicate_df = pd.DataFrame([row for row, _ in duplicates], columns=section["headers"])
+                        duplicate_df.insert(0, "중복 사유", [reason for _, reason in duplicates])
+                        st.dataframe(duplicate_df.drop(columns=["NO"]), hide_index=True)
+                    
+                    if not rows_to_add:
+                        st.info("추가할 새 데이터가 없습니다. 모든 행이 이미 기록되어 있습니다.")
+                    else:
+                        st.write(f"새로 추가할 행: {len(rows_to_add)}개 (오류: {len(row_errors)}개, 중복 제외: {len(duplicates)}개)")
+                        # 업로드 버튼
+                        if st.button("데이터 추가하기", key=section["upload_button_key"]):
+                            upload_rows(kind, target_worksheet, rows_to_add, source_key="\n".join(content_key))
             
             except Exception as e:
                 st.error(f"파일 처리 중 오류가 발생했습니다: {str(e)}")
 
+# 업로드 파일 읽기 (세션 단위로 파일 내용의 SHA-256 기준 결과 보관)
+def parse_uploaded_files(kind, uploaded_files, required_columns):
+    """
+    업로드한 파일을 읽고 합칩니다. 파일이 올라와 있는 동안 화면이 다시 실행되어도
+    같은 내용의 파일은 세션에서 한 번만 읽습니다.
+    반환값: (파일 내용 해시 튜플, [(파일 이름, 데이터프레임 또는 None, 오류 메시지 또는 None), ...], 합친 데이터프레임)
+    """
+    cache_key = f"{kind}_upload_parse_cache"
+    cache = st.session_state.get(cache_key, {})
+    uploads = [(f.name, f.getvalue()) for f in uploaded_files]
+    digests = tuple(hashlib.sha256(data).hexdigest() for _, data in uploads)
+    
+    # 처음 보는 파일만 읽기
+    missing = [(digest, *expand_upload_files([upload])) for digest, upload in zip(digests, uploads) if digest not in cache]
+    if missing:
+        parsed = iter(parse_upload_files([file for _, files, _ in missing for file in files], required_columns))
+        for digest, files, skipped in missing:
+            # zip 에서 제외한 파일도 사유와 함께 파일 목록에 표시
+            cache[digest] = [next(parsed) for _ in files] + [(name, None, reason) for name, reason in skipped]
+    
+    # 지금 올라와 있는 파일의 결과만 보관 (내려간 파일은 메모리에서 제거)
+    st.session_state[cache_key] = {digest: cache[digest] for digest in digests}
+    results = [result for digest in digests for result in cache[digest]]
+    
+    # 합친 데이터프레임도 같은 파일 구성이면 다시 만들지 않음
+    merged = st.session_state.get(f"{kind}_upload_merged")
+    if merged is None or merged[0] != digests:
+        merged = (digests, merge_upload_frames(results))
+        st.session_state[f"{kind}_upload_merged"] = merged
+    return digests, results, merged[1]
+
+# 끝난 업로드 작업 결과를 화면에 표시하는 기간
+RECENT_JOB_DISPLAY = timedelta(minutes=30)
+
+# 업로드 작업 실행기 (프로세스당 하나, 모든 세션이 같은 대기열을 사용)
+@st.cache_resource
+def get_upload_runner():
+    return UploadJobRunner()
+
+# 체크포인트 기록의 남은 행을 추가하는 백그라운드 작업 등록
+def submit_upload_job(kind, target_worksheet, journal, batch_size=UPLOAD_BATCH_SIZE):
+    section = SHEET_SECTIONS[kind]
+    key_indices = dedup_key_indices(section["headers"], section["dedup_key_columns"])
+    store = get_snapshot_store()
+    key = get_worksheet_key(target_worksheet)
+    
+    # 작업이 끝나면 이전 스냅샷을 버리고 백그라운드에서 새 데이터를 미리 읽어 둠 (작업자 스레드에서 호출됨)
+    def on_complete(job):
+        store.invalidate(key)
+        store.refresh_async(key, target_worksheet.get_all_values)
+    
+    return get_upload_runner().submit(
+        journal, target_worksheet, key_indices, section["date_col_idx"], on_complete=on_complete,
+        batch_size=batch_size,
+    )
+
+# 업로드한 데이터를 백그라운드 작업으로 추가
+def upload_rows(kind, target_worksheet, all_rows_to_add, batch_size=UPLOAD_BATCH_SIZE, source_key=None):
+    section = SHEET_SECTIONS[kind]
+    
+    # Google Sheets 장애 중에는 대기열에만 저장 (연결이 복구되면 자동으로 추가)
+    if sheets_unavailable():
+        queue_rows(kind, target_worksheet, all_rows_to_add, source_key=source_key)
+        st.rerun()
+    
+    # 업로드 ID와 체크포인트 기록 생성 (같은 파일/내용을 다시 올리면 이전 기록에서 이어서 진행)
+    journal = UploadJournal.start(
+        get_worksheet_key(target_worksheet), kind, section["sheet_name"], all_rows_to_add, source_key=source_key
+    )
+    job = submit_upload_job(kind, target_worksheet, journal, batch_size=batch_size)
+    st.toast(f"업로드 작업이 등록되었습니다. (작업 ID: {job.job_id}) 다른 화면으로 이동해도 계속 진행됩니다.")
+    # 진행 상황 표시를 위해 다시 실행
+    st.rerun()
+
+# 업로드 되돌리기 (작업 ID로 추가한 행을 한 번의 요청으로 삭제)
+def rollback_upload(kind, target_worksheet, job_id):
+    key = get_worksheet_key(target_worksheet)
+    with st.spinner("업로드 되돌리는 중..."):
+        remaining, deleted = get_upload_runner().rollback(job_id, target_worksheet)
+    # 삭제 후 데이터를 이미 알고 있으므로 다시 읽지 않고 스냅샷만 교체
+    get_snapshot_store().replace(key, remaining)
+    get_sla_tracker().invalidate(key)
+    reset_data_editor(kind)
+    st.toast(f"↩ 업로드를 되돌렸습니다. {deleted}개 행을 삭제했습니다. (작업 ID: {job_id})")
+
+# Google Sheets 장애로 바로 추가하지 못한 행을 대기열(업로드 체크포인트 기록)에 저장
+def queue_rows(kind, target_worksheet, rows, source_key=None):
+    section = SHEET_SECTIONS[kind]
+    # 연결 복구 후 같은 파일을 다시 올려도 같은 업로드 ID가 되도록 파일 해시(source_key)를 함께 사용
+    journal = UploadJournal.start(
+        get_worksheet_key(target_worksheet), kind, section["sheet_name"], rows, queued=True, source_key=source_key
+    )
+    st.toast(f"📮 Google Sheets 연결이 복구되면 추가되도록 {len(rows)}개 행을 대기열에 저장했습니다. (업로드 ID: {journal.upload_id})")
+    return journal
+
+# 진행 중인 업로드 작업 상태 (작업이 있는 동안 2초마다 이 섹션만 다시 실행)
+@rerun_fragment(run_every=2)
+def render_active_upload_jobs(worksheet_key):
+    active_jobs = [job for job in get_upload_runner().list_jobs(worksheet_key) if job.is_active]
+    if not active_jobs:
+        # 모든 작업이 끝나면 새 데이터를 표시하도록 전체 화면 새로고침
+        st.rerun()
+    for job in active_jobs:
+        st.progress(
+            job.progress,
+            text=f"⏳ [{JOB_STATUS_LABELS[job.status]}] {job.sheet_title} 업로드 {job.committed}/{job.total}행 (작업 ID: {job.job_id})"
+        )
+
+# 업로드 작업 상태와 중단된 업로드 목록 (이어서 하기 / 기록 삭제)
+def render_upload_jobs(kind, target_worksheet):
+    worksheet_key = get_worksheet_key(target_worksheet)
+    jobs = get_upload_runner().list_jobs(worksheet_key)
+    
+    if any(job.is_active for job in jobs):
+        render_active_upload_jobs(worksheet_key)
+    
+    # 최근에 끝난 작업 결과
+    recent_since = (datetime.now() - RECENT_JOB_DISPLAY).isoformat(timespec="seconds")
+    for job in jobs:
+        if job.is_active or job.updated_at < recent_since:
+            continue
+        if job.status == JOB_COMPLETED:
+            st.success(f"✅ 업로드 완료 ({job.updated_at[11:]}, 작업 ID: {job.job_id}) {job.message}")
+        elif job.status == JOB_ROLLED_BACK:
+            st.info(f"↩ 업로드 되돌림 ({job.updated_at[11:]}, 작업 ID: {job.job_id}) {job.message}")
+        else:
+            st.error(f"업로드 {JOB_STATUS_LABELS[job.status]} ({job.committed}/{job.total}행 반영, 작업 ID: {job.job_id}): {job.message[:200]}")
+    
+    # 진행 중인 작업이 없는 미완료 업로드 기록
+    active_ids = {job.job_id for job in jobs if job.is_active}
+    unavailable = sheets_unavailable()
+    render_upload_rollback(kind, target_worksheet, jobs, unavailable or bool(active_ids))
+    for journal in list_unfinished(worksheet_key):
+        if journal.upload_id in active_ids:
+            continue
+        # 대기열에 저장된 입력은 연결이 복구되면 한 번 자동으로 추가 (실패하면 아래 버튼으로 다시 시도)
+        if journal.queued and not unavailable and get_upload_runner().get(journal.upload_id) is None:
+            submit_upload_job(kind, target_worksheet, journal)
+            st.rerun()
+        if journal.queued:
+            st.info(
+                f"📮 Google Sheets 장애로 대기 중인 입력이 있습니다: {journal.info['created_at']} 저장, "
+                f"{journal.total}개 행 (업로드 ID: {journal.upload_id})"
+            )
+        else:
+            st.warning(
+                f"⏸ 중단된 업로드가 있습니다: {journal.info['created_at']} 시작, "
+                f"{journal.committed}/{journal.total}개 행 반영됨 (업로드 ID: {journal.upload_id})"
+            )
+        resume_col, discard_col = st.columns(2)
+        with resume_col:
+            if st.button("▶ 이어서 업로드", key=f"{kind}_resume_{journal.upload_id}", disabled=unavailable,
+                         help="반영되지 않은 행만 백그라운드 작업으로 추가합니다."):
+                submit_upload_job(kind, target_worksheet, journal)
+                st.rerun()
+        with discard_col:
+            if st.button("🗑 기록 삭제", key=f"{kind}_discard_{journal.upload_id}",
+                         help="남은 행을 추가하지 않고 중단된 업로드 기록을 삭제합니다."):
+                journal.finish()
+                st.rerun()
+
+# 완료된 업로드 되돌리기 (잘못 올린 파일의 행을 작업 ID로 한 번에 삭제)
+def render_upload_rollback(kind, target_worksheet, jobs, disabled):
+    rollback_jobs = [job for job in jobs if job.can_rollback]
+    if not rollback_jobs:
+        return
+    with st.expander("↩ 업로드 되돌리기"):
+        job_id = st.selectbox(
+            "되돌릴 업로드", [job.job_id for job in rollback_jobs], key=f"{kind}_rollback_job",
+            format_func=lambda job_id: next(
+                f"{job.updated_at.replace('T', ' ')} · {job.committed}개 행 (작업 ID: {job.job_id})"
+                for job in rollback_jobs if job.job_id == job_id
+            ),
+        )
+        st.caption("선택한 업로드로 추가한 행을 모두 삭제합니다. 정렬로 흩어진 행도 한 번의 요청으로 삭제하며, 업로드 후 수정한 행이 있으면 삭제하지 않습니다.")
+        if st.button("↩ 선택한 업로드 되돌리기", key=f"{kind}_rollback_btn", disabled=disabled,
+                     help="진행 중인 업로드가 있거나 Google Sheets 장애 중에는 되돌릴 수 없습니다."):
+            try:
+                rollback_upload(kind, target_worksheet, job_id)
+            except Exception as e:
+                st.error(f"업로드를 되돌리는 중 오류가 발생했습니다: {str(e)[:200]}")
+                return
+            st.rerun()
+
+# 날짜 설정 섹션 (날짜 변경 시 이 섹션만 다시 실행)
+@rerun_fragment
+def render_date_pickers(req_key, linked_key, on_change, linked_label, req_help):
     # 폼 외부에 날짜 선택 UI 배치 (콜백 함수 사용 가능)
     st.subheader("📅 날짜 설정")
 
     date_col1, date_col2 = st.columns(2)
     with date_col1:
-        # 요청일 선택 도움말 추가
-        today = datetime.today()
         st.date_input(
             "요청일 선택", 
-            key="req_date", 
-            on_change=update_work_date,
-            help="요청일을 선택하면 작업일이 자동으로 같은 날짜로 설정됩니다.",
+            key=req_key, 
+            on_change=on_change,
+            help=req_help,
             label_visibility="visible"
         )
     with date_col2:
-        # 작업일 확인 도움말 추가
         st.date_input(
-            "작업일 확인", 
-            key="work_date", 
+            linked_label, 
+            key=linked_key, 
             disabled=True,
             help="요청일과 자동으로 동기화됩니다. 별도 변경은 불가능합니다.",
             label_visibility="visible"
         )
 
-    # SM Activity 입력 양식 생성
+# SM Activity 작업유형 목록
+ACTIVITY_TASK_TYPES = [
+    "조간점검", "재적재", "인프라 작업", "SI 지원", "ERRC",
+    "CCB", "적재", "시스템 운영", "월정기작업", "인수인계"
+]
+
+# SM Activity 입력 양식 (입력/제출은 이 섹션만 다시 실행)
+@rerun_fragment
+def render_activity_form(worksheet):
     with st.form("activity_form"):
         # 각 필드 입력 UI 요소 생성
         st.subheader("📝 작업 정보 입력")
         
         구분 = st.selectbox("구분", ["정기", "비정기"])  # 작업 구분 선택
         # 작업 유형 선택 드롭다운
-        작업유형 = st.selectbox("작업유형", [
-            "조간점검", "재적재", "인프라 작업", "SI 지원", "ERRC",
-            "CCB", "적재", "시스템 운영", "월정기작업", "인수인계"
-        ])
+        작업유형 = st.selectbox("작업유형", ACTIVITY_TASK_TYPES)
         task = st.text_input("TASK 제목")  # 작업 제목 입력
         
         # 담당자 정보를 한 줄에 4개 컬럼으로 배치
@@ -758,7 +1243,7 @@ with tab1:
         with col4:
             개발자 = st.text_input("개발자", value="위승빈")  # 개발자 입력(기본값 설정)
         
-        결과 = st.selectbox("결과", ["진행 중", "완료", "보류", "기타"])  # 작업 결과 상태 선택
+        결과 = st.selectbox("결과", ACTIVITY_RESULT_OPTIONS)  # 작업 결과 상태 선택
 
         # 양식 제출 버튼 생성
         submitted = st.form_submit_button("추가하기")
@@ -774,10 +1259,8 @@ with tab1:
                 요청일 = st.session_state.req_date  # 폼 외부에서 설정한 요청일 사용
                 작업일 = st.session_state.work_date  # 폼 외부에서 설정한 작업일 사용
                 
-                # 캐싱된 함수를 사용하여 데이터 가져오기
-                sheet_data = get_worksheet_data(worksheet)
-                # 헤더 행을 제외한 데이터 행 수 계산
-                current_row_count = len(sheet_data) - 1 if len(sheet_data) > 0 else 0
+                # 헤더 행을 제외한 데이터 행 수 계산 (NO 열만 읽음)
+                current_row_count = current_data_row_count("activity", worksheet)
                 
                 # 새 행 번호 계산
                 new_row_num = current_row_count + 1
@@ -799,15 +1282,27 @@ with tab1:
                     결과  # 결과
                 ]
                 
+                # Google Sheets 장애 중이면 대기열에 저장하고 끝냄
+                if sheets_unavailable():
+                    queue_rows("activity", worksheet, [new_row_data])
+                    st.rerun()
+                
                 # Google 스프레드시트에 데이터 추가
                 with st.spinner("데이터 추가 중..."):
-                    worksheet.append_row(new_row_data)
+                    try:
+                        worksheet.append_row(new_row_data)
+                    except Exception as e:
+                        # 응답이 없거나 서버 오류면 대기열에 저장 (반영 여부는 추가할 때 중복 확인으로 처리)
+                        if not is_dependency_failure(e):
+                            raise
+                        queue_rows("activity", worksheet, [new_row_data])
+                        st.rerun()
                     # 캐시 무효화 (데이터가 변경되었으므로)
                     get_worksheet_data.clear()
                     
                     # 요청일 기준으로 데이터 정렬
                     try:
-                        sort_worksheet_by_date(worksheet)
+                        sort_worksheet_by_date(worksheet, date_col_idx=ACTIVITY_DATE_COL_IDX)
                         # 캐시 갱신 함수 호출
                         refresh_worksheet_data()
                     except Exception as e:
@@ -816,322 +1311,14 @@ with tab1:
                 # 성공 메시지 표시
                 st.success(f"✅ {selected_sheet_name} 문서에 성공적으로 추가되었습니다.\n\n**추가된 작업:** {task}")
                 
-                # 데이터 업데이트 후 자동 새로고침
+                # 데이터 업데이트 후 전체 화면 새로고침
                 st.rerun()
             except Exception as e:
                 st.error(f"데이터 추가 중 오류가 발생했습니다: {e}")
 
-    # 현재 워크시트의 모든 데이터 가져와서 표시
-    try:
-        # 캐싱된 함수를 사용하여 데이터 가져오기
-        sheet_data = get_worksheet_data(worksheet)
-        if len(sheet_data) > 1:  # 헤더 행을 제외하고 데이터가 있는 경우
-            st.subheader("📊 현재 기록된 데이터")
-            df = pd.DataFrame(sheet_data[1:], columns=sheet_data[0])
-            st.dataframe(df)
-            
-            # 엑셀 파일로 변환하여 다운로드 버튼 제공
-            excel_buffer = BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name=worksheet_name)
-                
-                # 엑셀 서식 설정
-                workbook = writer.book
-                worksheet_excel = writer.sheets[worksheet_name]
-                
-                # 헤더 스타일 설정
-                for col_num, value in enumerate(df.columns.values, 1):
-                    cell = worksheet_excel.cell(row=1, column=col_num)
-                    cell.font = Font(bold=True)
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                
-                # 열 너비 설정
-                worksheet_excel.column_dimensions['E'].width = 30  # TASK 컬럼
-                worksheet_excel.column_dimensions['F'].width = 15  # 요청일 컬럼
-                worksheet_excel.column_dimensions['G'].width = 15  # 작업일 컬럼
-                worksheet_excel.column_dimensions['L'].width = 40  # 내용 컬럼
-            
-            excel_buffer.seek(0)
-            
-            st.download_button(
-                label=f"📥 {selected_sheet_name} SM Activity 엑셀 다운로드",
-                data=excel_buffer,
-                file_name=f"{google_sheet_name}_SM_Activity.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        else:
-            st.info("아직 기록된 데이터가 없습니다. 위 양식을 통해 새 활동을 추가해주세요.")
-    except Exception as e:
-        st.error(f"데이터 조회 중 오류가 발생했습니다: {e}")
-
-    # 도움말 섹션 추가
-    with st.expander("ℹ️ 도움말 및 사용 방법"):
-        st.markdown("""
-        ### 사용 방법
-        
-        #### SM Activity 탭
-        1. 작성할 문서 유형을 선택합니다.
-        2. 요청일을 선택하면 작업일이 자동으로 설정됩니다.
-        3. 작업 정보를 입력하고 '추가하기' 버튼을 클릭합니다.
-        4. 입력된 데이터는 자동으로 날짜순 정렬됩니다.
-        5. **일괄 업로드**: '엑셀 파일 업로드' 섹션을 통해 여러 SM 활동을 한 번에 추가할 수 있습니다. 필요한 열 형식은 샘플 템플릿을 참고하세요.
-        
-        #### 현업문의 탭
-        1. 요청일을 선택하면 답변일이 자동으로 설정됩니다.
-        2. 문의 정보를 입력하고 '추가하기' 버튼을 클릭합니다.
-        3. 입력된 데이터는 자동으로 요청일 기준으로 정렬됩니다.
-        4. **일괄 업로드**: '엑셀 파일 업로드' 섹션을 통해 여러 현업문의를 한 번에 추가할 수 있습니다. 필요한 열 형식은 샘플 템플릿을 참고하세요.
-        
-        #### 데이터 다운로드
-        1. 각 탭에서 해당 데이터만 다운로드:
-           - SM Activity 탭에서는 "SM Activity 엑셀 다운로드" 버튼을 클릭하여 SM Activity 데이터만 다운로드할 수 있습니다.
-           - 현업문의 탭에서는 "현업문의 엑셀 다운로드" 버튼을 클릭하여 현업문의 데이터만 다운로드할 수 있습니다.
-        
-        2. 모든 데이터 통합 다운로드:
-           - 상단의 '데이터 다운로드' 섹션을 클릭합니다.
-           - '전체 데이터 엑셀 파일 다운로드' 버튼을 클릭하면 SM Activity와 현업문의 데이터가 하나의 엑셀 파일(여러 시트)로 다운로드됩니다.
-        
-        ### 엑셀 파일 업로드
-        엑셀 파일을 통해 여러 데이터를 한 번에 추가할 수 있습니다:
-        
-        #### SM Activity 데이터
-        1. SM Activity 탭에서 샘플 템플릿을 다운로드하여 형식을 확인합니다.
-        2. 업로드할 엑셀 파일은 다음 열들을 포함해야 합니다:
-           - **구분**: 정기/비정기
-           - **작업유형**: 조간점검, 재적재 등
-           - **TASK**: 작업 제목
-           - **요청일**: 날짜 형식 (YYYY-MM-DD)
-           - **요청자**: 요청자 이름
-           - **결과**: 진행 중, 완료, 보류, 기타
-        
-        #### 현업문의 데이터
-        1. 현업문의 탭에서 샘플 템플릿을 다운로드하여 형식을 확인합니다.
-        2. 업로드할 엑셀 파일은 다음 열들을 포함해야 합니다:
-           - **문의방법**: Social Desk, MAIL, 메신저, 전화
-           - **문의유형**: 개발사전검토, 데이터확인 등
-           - **요청부서**: 부서명
-           - **문의사항**: 문의 내용
-           - **요청일**: 날짜 형식 (YYYY-MM-DD)
-           - **요청자**: 요청자 이름
-        
-        ### 주의사항
-        - 데이터는 Google 스프레드시트에 저장되며, 권한이 있는 사용자만 접근할 수 있습니다.
-        - 대량의 데이터를 업로드할 경우 시간이 다소 소요될 수 있습니다.
-        - 각 탭에서는 해당 탭에 맞는 데이터만 업로드해야 합니다. (SM Activity 탭에서는 SM Activity 데이터, 현업문의 탭에서는 현업문의 데이터)
-        - 문제가 발생하면 관리자에게 문의하세요.
-        """)
-
-with tab2:
-    # 현업문의 탭을 선택했음을 세션 상태에 저장
-    update_current_tab("현업문의")
-    
-    # 현업문의 탭 내용
-    st.subheader("📞 현업문의 기록")
-    
-    # 엑셀 파일 업로드 섹션 추가
-    st.subheader("📤 엑셀 파일 업로드")
-    with st.expander("엑셀 파일을 업로드하여 문의 데이터 일괄 추가"):
-        # 샘플 템플릿 다운로드 기능 추가
-        st.markdown("#### 샘플 템플릿 다운로드")
-        inquiry_sample_df = pd.DataFrame({
-            '문의방법': ['Social Desk', 'MAIL', '메신저', '전화'],
-            '문의유형': ['개발사전검토', '데이터확인', '접속/권한문의', '공통'],
-            '요청부서': ['인사팀', '마케팅팀', '영업팀', 'IT팀'],
-            '문의사항': ['시스템 접근 권한 요청', '데이터 오류 확인', '기능 사용법 문의', '시스템 오류 보고'],
-            '요청일': [datetime.today().strftime("%Y-%m-%d"), (datetime.today() - pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
-                     (datetime.today() - pd.Timedelta(days=2)).strftime("%Y-%m-%d"), (datetime.today() - pd.Timedelta(days=3)).strftime("%Y-%m-%d")],
-            '요청자': ['홍길동', '김철수', '이영희', '박민수'],
-            'IT': ['한상욱', '한상욱', '한상욱', '한상욱'],
-            'CNS': ['이정인', '이정인', '이정인', '이정인'],
-            '개발자': ['위승빈', '위승빈', '위승빈', '위승빈']
-        })
-        
-        # 샘플 템플릿을 엑셀로 변환
-        inquiry_sample_buffer = BytesIO()
-        with pd.ExcelWriter(inquiry_sample_buffer, engine='openpyxl') as writer:
-            inquiry_sample_df.to_excel(writer, index=False, sheet_name='현업문의')
-        inquiry_sample_buffer.seek(0)
-        
-        # 샘플 템플릿 다운로드 버튼
-        st.download_button(
-            label="📝 샘플 템플릿 다운로드",
-            data=inquiry_sample_buffer,
-            file_name="현업문의_Template.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            help="업로드 양식에 맞는 샘플 엑셀 템플릿을 다운로드합니다."
-        )
-        
-        st.markdown("---")
-        st.markdown("#### 데이터 업로드")
-        inquiry_uploaded_file = st.file_uploader("현업문의 양식의 엑셀 파일을 업로드하세요", type=["xlsx", "xls"], key="inquiry_uploader")
-        
-        if inquiry_uploaded_file is not None:
-            try:
-                # 엑셀 파일 읽기
-                inquiry_df = pd.read_excel(inquiry_uploaded_file, sheet_name=0)
-                
-                # 데이터프레임 미리보기 
-                st.write("업로드한 데이터 미리보기:")
-                st.dataframe(inquiry_df.head(5))
-                
-                # 필요한 열이 있는지 확인
-                required_columns = ["문의방법", "문의유형", "요청부서", "문의사항", "요청일", "요청자"]
-                missing_columns = [col for col in required_columns if col not in inquiry_df.columns]
-                
-                if missing_columns:
-                    st.error(f"업로드한 엑셀 파일에 다음 필수 열이 없습니다: {', '.join(missing_columns)}")
-                else:
-                    # 업로드 버튼
-                    if st.button("데이터 추가하기", key="inquiry_upload_btn"):
-                        # 현재 워크시트의 모든 데이터 가져오기
-                        inquiry_sheet_data = get_worksheet_data(inquiry_worksheet)
-                        # 헤더 행을 제외한 데이터 행 수 계산
-                        current_row_count = len(inquiry_sheet_data) - 1 if len(inquiry_sheet_data) > 0 else 0
-                        
-                        # 진행 상황 표시
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        status_text.text("데이터 처리 중...")
-                        
-                        # 배치로 추가할 모든 행 준비
-                        all_rows_to_add = []
-                        error_rows = []
-                        
-                        # 각 행을 순회하면서 데이터 준비
-                        for index, row in inquiry_df.iterrows():
-                            try:
-                                # 진행 상황 업데이트 (10개 단위로 표시 업데이트)
-                                if index % 10 == 0 or index == len(inquiry_df) - 1:
-                                    progress = (index + 1) / len(inquiry_df)
-                                    progress_bar.progress(progress)
-                                    status_text.text(f"처리 중... {index + 1}/{len(inquiry_df)}")
-                                
-                                # 요청일 처리 (날짜 형식 확인)
-                                try:
-                                    if pd.isna(row.get('요청일')):
-                                        req_date = datetime.today()
-                                    elif isinstance(row['요청일'], datetime):
-                                        req_date = row['요청일']
-                                    else:
-                                        # 문자열인 경우 파싱 시도
-                                        req_date = datetime.strptime(str(row['요청일']), "%Y-%m-%d")
-                                except:
-                                    req_date = datetime.today()
-                                
-                                # 답변일은 요청일과 동일하게 설정
-                                resp_date = req_date
-                                
-                                # 새 행 번호 계산
-                                new_row_num = current_row_count + len(all_rows_to_add) + 1
-                                
-                                # 데이터 준비
-                                new_row_data = [
-                                    str(new_row_num),  # NO
-                                    req_date.strftime("%Y%m"),  # 월 정보
-                                    str(row.get('문의방법', 'Social Desk')),  # 문의방법
-                                    str(row.get('문의유형', '데이터확인')),  # 문의유형
-                                    str(row.get('요청부서', '')),  # 요청부서
-                                    str(row.get('문의사항', '')),  # 문의사항
-                                    req_date.strftime("%Y-%m-%d"),  # 요청일
-                                    resp_date.strftime("%Y-%m-%d"),  # 답변일
-                                    str(row.get('요청자', '')),  # 요청자
-                                    str(row.get('IT', '한상욱')),  # IT 담당자
-                                    str(row.get('CNS', '이정인')),  # CNS 담당자
-                                    str(row.get('개발자', '위승빈'))  # 개발자
-                                ]
-                                
-                                # 배열에 추가
-                                all_rows_to_add.append(new_row_data)
-                                
-                            except Exception as e:
-                                error_rows.append(index)
-                                st.error(f"행 {index+1} 처리 중 오류 발생: {str(e)[:100]}...")
-                        
-                        # 배치 처리를 위한 상태 업데이트
-                        status_text.text("Google 스프레드시트에 데이터 추가 중...")
-                        
-                        try:
-                            # 배치 단위로 나누어 추가 (API 할당량 고려)
-                            batch_size = 25  # 한 번에 추가할 최대 행 수 감소
-                            success_count = 0
-                            
-                            for i in range(0, len(all_rows_to_add), batch_size):
-                                batch = all_rows_to_add[i:i+batch_size]
-                                if batch:
-                                    # 배치 단위로 데이터 추가
-                                    inquiry_worksheet.append_rows(batch)
-                                    success_count += len(batch)
-                                    
-                                    # 배치 추가 후 진행 상황 업데이트
-                                    batch_progress = min(1.0, (i + len(batch)) / len(all_rows_to_add))
-                                    progress_bar.progress(batch_progress)
-                                    status_text.text(f"추가 중... {i + len(batch)}/{len(all_rows_to_add)} 행")
-                                    
-                                    # API 할당량 제한을 고려한 딜레이 (필요시)
-                                    if i + batch_size < len(all_rows_to_add):
-                                        status_text.text(f"API 할당량 제한 방지를 위해 잠시 대기 중... ({(i + len(batch))}/{len(all_rows_to_add)} 완료)")
-                                        time.sleep(3)  # 3초로 대기 시간 증가
-                            
-                            # 진행 상황 완료
-                            progress_bar.progress(1.0)
-                            status_text.text("처리 완료! 데이터 정렬 중...")
-                            
-                            # 요청일 기준으로 데이터 정렬
-                            try:
-                                sort_worksheet_by_date(inquiry_worksheet, date_col_idx=6)  # 요청일 열 인덱스가 6번째
-                                # 캐시 갱신 함수 호출
-                                refresh_worksheet_data()
-                                st.success(f"✅ 업로드 완료! 총 {success_count}개 행이 성공적으로 추가되었습니다. (오류: {len(error_rows)}개)")
-                                if error_rows:
-                                    st.warning(f"일부 행({len(error_rows)}개)에서 오류가 발생했습니다. 해당 행: {', '.join(map(str, [r+1 for r in error_rows]))}")
-                                # 데이터 업데이트 후 자동 새로고침
-                                st.rerun()
-                            except Exception as e:
-                                st.warning(f"데이터는 추가되었으나 정렬 중 오류가 발생했습니다: {str(e)[:150]}...")
-                                st.info("API 할당량 제한으로 인한 오류일 수 있습니다. 1-2시간 후에 다시 시도하거나, 단일 항목을 추가하여 자동 정렬을 트리거할 수 있습니다.")
-                            
-                        except Exception as e:
-                            st.error(f"데이터 배치 추가 중 오류가 발생했습니다: {str(e)[:200]}...")
-                            st.info("Google Sheets API 할당량 제한으로 인한 오류일 수 있습니다. 다음 조치를 취하세요:")
-                            st.markdown("""
-                            1. 1-2시간 기다린 후 다시 시도하세요 (API 할당량이 재설정됨).
-                            2. 더 작은 파일로 나누어 업로드하세요 (행 수를 줄임).
-                            3. 단일 항목을 한 번에 하나씩 추가하세요.
-                            """)
-                            # 성공한 행 수가 있다면 표시
-                            if success_count > 0:
-                                st.info(f"{success_count}개 행은 성공적으로 추가되었습니다.")
-            
-            except Exception as e:
-                st.error(f"파일 처리 중 오류가 발생했습니다: {str(e)}")
-                
-    # 폼 외부에 날짜 선택 UI 배치
-    st.subheader("📅 날짜 설정")
-
-    date_col1, date_col2 = st.columns(2)
-    # 세션 상태 초기화 - 요청일과 답변일을 위한 설정은 이미 위에서 수행했으므로 제거
-
-    # 요청일이 변경될 때 답변일을 업데이트하는 콜백 함수는 이미 위에서 정의했으므로 제거
-
-    date_col1, date_col2 = st.columns(2)
-    with date_col1:
-        st.date_input(
-            "요청일 선택", 
-            key="inquiry_req_date", 
-            on_change=update_inquiry_resp_date,
-            help="요청일을 선택하면 답변일이 자동으로 같은 날짜로 설정됩니다.",
-            label_visibility="visible"
-        )
-    with date_col2:
-        st.date_input(
-            "답변일 확인", 
-            key="inquiry_resp_date", 
-            disabled=True,
-            help="요청일과 자동으로 동기화됩니다. 별도 변경은 불가능합니다.",
-            label_visibility="visible"
-        )
-
-    # 현업문의 입력 양식 생성
+# 현업문의 입력 양식 (입력/제출은 이 섹션만 다시 실행)
+@rerun_fragment
+def render_inquiry_form(inquiry_worksheet):
     with st.form("inquiry_form"):
         st.subheader("📝 문의 정보 입력")
         
@@ -1168,10 +1355,8 @@ with tab2:
                 요청일 = st.session_state.inquiry_req_date
                 답변일 = st.session_state.inquiry_resp_date
                 
-                # 캐싱된 함수를 사용하여 데이터 가져오기
-                inquiry_sheet_data = get_worksheet_data(inquiry_worksheet)
-                # 헤더 행을 제외한 데이터 행 수 계산
-                current_row_count = len(inquiry_sheet_data) - 1 if len(inquiry_sheet_data) > 0 else 0
+                # 헤더 행을 제외한 데이터 행 수 계산 (NO 열만 읽음)
+                current_row_count = current_data_row_count("inquiry", inquiry_worksheet)
                 
                 # 새 행 번호 계산
                 new_row_num = current_row_count + 1
@@ -1192,15 +1377,29 @@ with tab2:
                     개발자  # 개발자
                 ]
                 
+                # Google Sheets 장애 중이면 대기열에 저장하고 끝냄
+                if sheets_unavailable():
+                    queue_rows("inquiry", inquiry_worksheet, [new_row_data])
+                    st.rerun()
+                
                 # Google 스프레드시트에 데이터 추가
                 with st.spinner("데이터 추가 중..."):
-                    inquiry_worksheet.append_row(new_row_data)
+                    try:
+                        inquiry_worksheet.append_row(new_row_data)
+                    except Exception as e:
+                        # 응답이 없거나 서버 오류면 대기열에 저장 (반영 여부는 추가할 때 중복 확인으로 처리)
+                        if not is_dependency_failure(e):
+                            raise
+                        queue_rows("inquiry", inquiry_worksheet, [new_row_data])
+                        st.rerun()
+                    # 응답 시간 집계에 바로 반영 (전체를 다시 집계하지 않음)
+                    get_sla_tracker().observe_appended(get_worksheet_key(inquiry_worksheet), [new_row_data])
                     # 캐시 무효화 (데이터가 변경되었으므로)
                     get_worksheet_data.clear()
                     
                     # 요청일 기준으로 데이터 정렬
                     try:
-                        sort_worksheet_by_date(inquiry_worksheet, date_col_idx=6)  # 요청일 열 인덱스가 6번째
+                        sort_worksheet_by_date(inquiry_worksheet, date_col_idx=INQUIRY_DATE_COL_IDX)
                         # 캐시 갱신 함수 호출
                         refresh_worksheet_data()
                     except Exception as e:
@@ -1209,107 +1408,392 @@ with tab2:
                 # 성공 메시지 표시
                 st.success(f"✅ {selected_sheet_name} 문서의 현업문의 시트에 성공적으로 추가되었습니다.\n\n**추가된 문의:** {문의사항[:30]}...")
                 
-                # 데이터 업데이트 후 자동 새로고침
+                # 데이터 업데이트 후 전체 화면 새로고침
                 st.rerun()
             except Exception as e:
                 st.error(f"데이터 추가 중 오류가 발생했습니다: {e}")
 
-    # 현재 워크시트의 모든 데이터 가져와서 표시
+# 결과 일괄 변경 조건 입력 (조건에 맞는 행의 결과 셀 변경 목록 반환)
+def render_bulk_status(kind, sheet_data):
+    section = SHEET_SECTIONS[kind]
+    editor_key = section["editor_key"]
+    headers = sheet_data[0]
+    status_idx = headers.index(section["status_column"])
+    with st.expander(f"🔁 {section['status_column']} 일괄 변경"):
+        col1, col2 = st.columns(2)
+        with col1:
+            current_statuses = st.multiselect(f"현재 {section['status_column']}", section["status_options"],
+                                              key=f"{editor_key}_bulk_current")
+            requester = st.text_input("요청자 (포함 검색)", key=f"{editor_key}_bulk_requester")
+        with col2:
+            date_range = st.date_input("요청일 범위", value=(), key=f"{editor_key}_bulk_dates")
+            new_status = st.selectbox(f"변경할 {section['status_column']}", section["status_options"], index=None,
+                                      placeholder="선택하세요", key=f"{editor_key}_bulk_new")
+        
+        # 조건 없이 모든 행을 바꾸는 실수를 막기 위해 조건을 하나 이상 요구
+        date_range = tuple(date_range) if len(date_range) == 2 else None
+        has_requester = section["requester_column"] in headers and requester.strip()
+        if not (current_statuses or has_requester or date_range):
+            st.caption("조건을 하나 이상 입력하면 맞는 행의 결과를 한 번에 바꿀 수 있습니다.")
+            return []
+        rows = select_rows(
+            sheet_data,
+            column_values={status_idx: current_statuses} if current_statuses else None,
+            contains={headers.index(section["requester_column"]): requester} if has_requester else None,
+            date_col_idx=section["date_col_idx"],
+            date_range=date_range,
+        )
+        if new_status is None:
+            st.caption(f"조건에 맞는 행: {len(rows)}개")
+            return []
+        changes = [
+            (row, status_idx, sheet_data[row - 1][status_idx], new_status)
+            for row in rows if sheet_data[row - 1][status_idx] != new_status
+        ]
+        st.caption(
+            f"조건에 맞는 행 {len(rows)}개 중 {len(changes)}개 행이 '{new_status}'(으)로 바뀝니다. "
+            "아래 저장 버튼을 누르면 표에서 수정한 내용과 함께 한 번에 저장됩니다."
+        )
+        return changes
+
+# 편집 상태 초기화 (편집 기준 스냅샷과 편집 내용 삭제)
+def reset_data_editor(kind):
+    editor_key = SHEET_SECTIONS[kind]["editor_key"]
+    for key in [k for k in st.session_state if str(k).startswith(editor_key)]:
+        del st.session_state[key]
+
+# 표에서 직접 수정 (바뀐 셀만 한 번의 batch_update 로 저장)
+def render_data_editor(kind, target_worksheet):
+    section = SHEET_SECTIONS[kind]
+    editor_key = section["editor_key"]
+    # 편집을 시작한 시점의 스냅샷을 고정 (편집 중에 캐시가 갱신되어도 편집 내용이 다른 행으로 옮겨가지 않음)
+    base = st.session_state.get(f"{editor_key}_base")
+    if base is None:
+        base = get_worksheet_snapshot(target_worksheet)
+        st.session_state[f"{editor_key}_base"] = base
+    sheet_data = base.values
+    headers = sheet_data[0]
+    
+    message = st.session_state.pop(f"{editor_key}_message", None)
+    if message:
+        st.error(message)
+    
+    # 자동 계산 열과 정렬 기준인 날짜 열은 수정하지 않음
+    disabled = READONLY_EDIT_COLUMNS + [section["headers"][section["date_col_idx"]]]
+    column_config = {}
+    if section["status_column"] in headers:
+        column_config[section["status_column"]] = st.column_config.SelectboxColumn(options=section["status_options"])
+    edited_df = st.data_editor(
+        _get_snapshot_frame(get_worksheet_key(target_worksheet), base.version, sheet_data), key=f"{editor_key}_{base.version}", disabled=disabled,
+        num_rows="fixed", hide_index=True, column_config=column_config
+    )
+    changes = {(row, col): (row, col, old, new) for row, col, old, new in diff_edited_cells(sheet_data, edited_df.values.tolist())}
+    if section["status_column"] in headers:
+        # 같은 셀을 표와 일괄 변경에서 모두 바꾸면 일괄 변경 값을 사용
+        changes.update({(row, col): (row, col, old, new) for row, col, old, new in render_bulk_status(kind, sheet_data)})
+    changes = [changes[cell] for cell in sorted(changes)]
+    
+    st.caption(f"편집 기준 데이터: {base.fetched_at_text}")
+    unavailable = sheets_unavailable()
+    if unavailable:
+        st.caption("⚠️ Google Sheets 연결이 복구되면 저장할 수 있습니다.")
+    col1, col2 = st.columns(2)
+    with col1:
+        save_clicked = st.button(f"💾 변경 사항 저장 ({len(changes)}개 셀)", key=f"{editor_key}_save",
+                                 disabled=not changes or unavailable)
+    with col2:
+        if st.button("🔄 최신 데이터로 다시 시작", key=f"{editor_key}_restart"):
+            reset_data_editor(kind)
+            st.rerun()
+    if not save_clicked:
+        return
+    
     try:
-        # 캐싱된 함수를 사용하여 데이터 가져오기
-        inquiry_sheet_data = get_worksheet_data(inquiry_worksheet)
-        if len(inquiry_sheet_data) > 1:  # 헤더 행을 제외하고 데이터가 있는 경우
-            st.subheader("📊 현재 기록된 문의 데이터")
-            inquiry_df = pd.DataFrame(inquiry_sheet_data[1:], columns=inquiry_sheet_data[0])
-            st.dataframe(inquiry_df)
-            
-            # 엑셀 파일로 변환하여 다운로드 버튼 제공
-            excel_buffer = BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                inquiry_df.to_excel(writer, index=False, sheet_name=inquiry_worksheet_name)
-                
-                # 엑셀 서식 설정
-                workbook = writer.book
-                worksheet_excel = writer.sheets[inquiry_worksheet_name]
-                
-                # 헤더 스타일 설정
-                for col_num, value in enumerate(inquiry_df.columns.values, 1):
-                    cell = worksheet_excel.cell(row=1, column=col_num)
-                    cell.font = Font(bold=True)
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                
-                # 열 너비 설정
-                worksheet_excel.column_dimensions['E'].width = 20  # 요청부서 컬럼
-                worksheet_excel.column_dimensions['F'].width = 40  # 문의사항 컬럼
-                worksheet_excel.column_dimensions['G'].width = 15  # 요청일 컬럼
-                worksheet_excel.column_dimensions['H'].width = 15  # 답변일 컬럼
-            
-            excel_buffer.seek(0)
+        with st.spinner("변경 사항 저장 중..."), profile_section("편집 저장"):
+            conflicts = write_cell_changes(target_worksheet, sheet_data, changes)
+    except Exception as e:
+        st.error(f"변경 사항 저장 중 오류가 발생했습니다: {str(e)[:200]}")
+        return
+    
+    # 저장했거나 충돌이 있으면 최신 데이터로 편집을 다시 시작 (날짜를 고쳤을 수 있으므로 응답 시간도 다시 집계)
+    get_snapshot_store().invalidate(get_worksheet_key(target_worksheet))
+    get_sla_tracker().invalidate(get_worksheet_key(target_worksheet))
+    reset_data_editor(kind)
+    if conflicts:
+        st.session_state[f"{editor_key}_message"] = (
+            f"편집을 시작한 뒤 다른 곳에서 바뀐 행이 있어 저장하지 않았습니다. (시트 행 번호: "
+            f"{', '.join(map(str, conflicts[:20]))}{' 외' if len(conflicts) > 20 else ''}) 최신 데이터에서 다시 수정해주세요."
+        )
+    else:
+        st.toast(f"✅ {len(changes)}개 셀을 저장했습니다.")
+    st.rerun()
+
+# 데이터 조회 기간 (전체 외에는 요청일 범위의 행만 읽음)
+DATA_VIEW_PERIODS = ["전체", "이번 주", "이번 달", "직접 선택"]
+
+# 요청일 인덱스 (스냅샷 버전마다 한 번만 생성하고 읽기 전용으로 공유)
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _get_date_index(snapshot_key, snapshot_version, date_col_idx, start, _values):
+    return build_date_index(_values, date_col_idx, start)
+
+# 요청일 범위의 행만 조회
+def get_date_range_values(kind, worksheet, date_from, date_to):
+    """
+    요청일이 date_from ~ date_to 인 행을 헤더와 함께 반환합니다.
+    시트는 요청일 순서로 정렬되어 있으므로 요청일 인덱스에서 이진 탐색으로 행 범위를 찾습니다.
+    전체 데이터가 캐시에 있으면 그 범위를 잘라서 반환하고 (API 호출 없음), 없으면 요청일 열만 읽어
+    범위를 찾은 뒤 그 범위(A{첫 행}:M{마지막 행})만 읽으므로 전체 기록 양과 관계없이 비용이 같습니다.
+    반환값: (헤더 포함 2차원 데이터, (첫 행 번호, 마지막 행 번호) 또는 None)
+    """
+    section = SHEET_SECTIONS[kind]
+    headers = section["headers"]
+    date_col_idx = section["date_col_idx"]
+    store = get_snapshot_store()
+    key = get_worksheet_key(worksheet)
+    
+    # 전체 데이터가 캐시에 없으면 요청일 열만 읽어서 캐시 (워크시트를 무효화하면 함께 무효화됨)
+    if store.peek(key) is None:
+        column_key = derived_key(key, headers[date_col_idx])
+        column = store.get(column_key, lambda: read_date_column(worksheet, date_col_idx))
+        dates = _get_date_index(column_key, column.version, 0, 0, column.values)
+        if dates is not None:
+            bounds = date_row_bounds(dates, date_from, date_to)
+            if bounds is None:
+                return [headers], None
+            # 같은 요청일 열 버전과 범위면 세션에 보관한 행을 그대로 사용
+            memo_key = (column_key, column.version, bounds)
+            memo = st.session_state.get(f"{kind}_date_range_rows")
+            if memo is None or memo[0] != memo_key:
+                memo = (memo_key, read_row_range(worksheet, *bounds, len(headers)))
+                st.session_state[f"{kind}_date_range_rows"] = memo
+            return [headers, *memo[1]], bounds
+    
+    snapshot = get_worksheet_snapshot(worksheet)
+    values = snapshot.values
+    dates = _get_date_index(key, snapshot.version, date_col_idx, 1, values)
+    if dates is None:
+        # 정렬되지 않은 시트는 모든 행의 요청일을 확인
+        rows = select_rows(values, date_col_idx=date_col_idx, date_range=(date_from, date_to))
+        return [values[0], *(values[row - 1] for row in rows)], None
+    bounds = date_row_bounds(dates, date_from, date_to)
+    if bounds is None:
+        return [values[0]], None
+    return [values[0], *values[bounds[0] - 1:bounds[1]]], bounds
+
+# 조회 기간의 시작일과 종료일 (직접 선택은 날짜 입력 표시, 종료일을 아직 고르지 않았으면 None)
+def resolve_view_period(kind, period):
+    today = datetime.today().date()
+    if period == "이번 주":
+        monday = today - timedelta(days=today.weekday())
+        return monday, monday + timedelta(days=6)
+    if period == "이번 달":
+        first_day = today.replace(day=1)
+        next_month = (first_day + timedelta(days=32)).replace(day=1)
+        return first_day, next_month - timedelta(days=1)
+    date_range = st.date_input("요청일 범위", value=(today - timedelta(days=30), today), key=f"{kind}_view_range")
+    if len(date_range) != 2:
+        st.caption("종료일을 선택하세요.")
+        return None
+    return tuple(date_range)
+
+# 현재 워크시트의 데이터 조회 섹션 (엑셀 생성 버튼은 이 섹션만 다시 실행)
+@rerun_fragment
+def render_data_view(kind, target_worksheet):
+    section = SHEET_SECTIONS[kind]
+    try:
+        # 전체를 조회하거나 수정할 때만 전체 데이터를 읽음
+        period = st.session_state.get(f"{kind}_view_period", DATA_VIEW_PERIODS[0])
+        if period == DATA_VIEW_PERIODS[0] or st.session_state.get(f"{kind}_edit_mode"):
+            # 캐싱된 함수를 사용하여 데이터 가져오기
+            if len(get_worksheet_data(target_worksheet)) <= 1:  # 헤더 행 외에 데이터가 없는 경우
+                st.info(section["empty_message"])
+                return
+        
+        st.subheader(section["data_subheader"])
+        # 수정할 때만 편집 그리드 표시 (조회만 할 때는 가벼운 표)
+        if st.toggle("✏️ 표에서 직접 수정", key=f"{kind}_edit_mode"):
+            render_data_editor(kind, target_worksheet)
+            df = get_worksheet_frame(target_worksheet)
+        else:
+            reset_data_editor(kind)
+            period = st.radio("조회 기간", DATA_VIEW_PERIODS, horizontal=True, key=f"{kind}_view_period")
+            if period == DATA_VIEW_PERIODS[0]:
+                df = get_worksheet_frame(target_worksheet)
+            else:
+                date_range = resolve_view_period(kind, period)
+                if date_range is None:
+                    return
+                with profile_section("기간 조회"):
+                    values, bounds = get_date_range_values(kind, target_worksheet, *date_range)
+                df = values_to_dataframe(values)
+                st.caption(
+                    f"요청일 {date_range[0]} ~ {date_range[1]}: {len(df)}개 행"
+                    + (f" (시트 {bounds[0]}~{bounds[1]}행)" if bounds else "")
+                )
+            st.dataframe(df)
+        
+        # 엑셀 파일은 요청할 때만 생성 (매 실행마다 만들지 않음)
+        if st.button(f"📄 {section['download_label']} 엑셀 파일 생성", key=section["export_button_key"]):
+            with st.spinner("엑셀 파일 생성 중..."), profile_section("엑셀 생성"):
+                excel_buffer = build_excel_file([(section["sheet_name"], df, section["column_widths"])])
             
             st.download_button(
-                label=f"📥 {selected_sheet_name} 현업문의 엑셀 다운로드",
+                label=f"📥 {selected_sheet_name} {section['download_label']} 엑셀 다운로드",
                 data=excel_buffer,
-                file_name=f"{google_sheet_name}_현업문의.xlsx",
+                file_name=f"{google_sheet_name}_{section['download_suffix']}.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
-        else:
-            st.info("아직 기록된 문의 데이터가 없습니다. 위 양식을 통해 새 문의를 추가해주세요.")
     except Exception as e:
-        st.error(f"문의 데이터 조회 중 오류가 발생했습니다: {e}")
+        st.error(f"{section['error_message']}: {e}")
 
-    # 도움말 섹션 추가
-    with st.expander("ℹ️ 도움말 및 사용 방법"):
-        st.markdown("""
-        ### 사용 방법
-        
-        #### SM Activity 탭
-        1. 작성할 문서 유형을 선택합니다.
-        2. 요청일을 선택하면 작업일이 자동으로 설정됩니다.
-        3. 작업 정보를 입력하고 '추가하기' 버튼을 클릭합니다.
-        4. 입력된 데이터는 자동으로 날짜순 정렬됩니다.
-        5. **일괄 업로드**: '엑셀 파일 업로드' 섹션을 통해 여러 SM 활동을 한 번에 추가할 수 있습니다. 필요한 열 형식은 샘플 템플릿을 참고하세요.
-        
-        #### 현업문의 탭
-        1. 요청일을 선택하면 답변일이 자동으로 설정됩니다.
-        2. 문의 정보를 입력하고 '추가하기' 버튼을 클릭합니다.
-        3. 입력된 데이터는 자동으로 요청일 기준으로 정렬됩니다.
-        4. **일괄 업로드**: '엑셀 파일 업로드' 섹션을 통해 여러 현업문의를 한 번에 추가할 수 있습니다. 필요한 열 형식은 샘플 템플릿을 참고하세요.
-        
-        #### 데이터 다운로드
-        1. 각 탭에서 해당 데이터만 다운로드:
-           - SM Activity 탭에서는 "SM Activity 엑셀 다운로드" 버튼을 클릭하여 SM Activity 데이터만 다운로드할 수 있습니다.
-           - 현업문의 탭에서는 "현업문의 엑셀 다운로드" 버튼을 클릭하여 현업문의 데이터만 다운로드할 수 있습니다.
-        
-        2. 모든 데이터 통합 다운로드:
-           - 상단의 '데이터 다운로드' 섹션을 클릭합니다.
-           - '전체 데이터 엑셀 파일 다운로드' 버튼을 클릭하면 SM Activity와 현업문의 데이터가 하나의 엑셀 파일(여러 시트)로 다운로드됩니다.
-        
-        ### 엑셀 파일 업로드
-        엑셀 파일을 통해 여러 데이터를 한 번에 추가할 수 있습니다:
-        
-        #### SM Activity 데이터
-        1. SM Activity 탭에서 샘플 템플릿을 다운로드하여 형식을 확인합니다.
-        2. 업로드할 엑셀 파일은 다음 열들을 포함해야 합니다:
-           - **구분**: 정기/비정기
-           - **작업유형**: 조간점검, 재적재 등
-           - **TASK**: 작업 제목
-           - **요청일**: 날짜 형식 (YYYY-MM-DD)
-           - **요청자**: 요청자 이름
-           - **결과**: 진행 중, 완료, 보류, 기타
+# 정기 작업 일괄 생성 섹션 (템플릿 편집/미리보기는 이 섹션만 다시 실행)
+@rerun_fragment
+def render_recurring_section(worksheet):
+    # 켰을 때만 시트 데이터를 읽어 생성 대상을 계산 (꺼져 있으면 탭을 다시 실행해도 읽지 않고, 기간 조회는 범위 읽기 사용)
+    if not st.toggle("🔁 정기 작업 일괄 생성", key="recurring_open"):
+        return
+    st.caption("매일/평일/매월 반복되는 정기 작업을 템플릿으로 저장해 두고 한 달 치 행을 한 번에 추가합니다.")
+    tasks = load_recurring_tasks()
+    edited = st.data_editor(
+        [{column: task.get(column) for column in TEMPLATE_COLUMNS} for task in tasks],
+        key="recurring_tasks_editor", num_rows="dynamic", hide_index=True,
+        column_config={
+            "작업유형": st.column_config.SelectboxColumn(options=ACTIVITY_TASK_TYPES),
+            "주기": st.column_config.SelectboxColumn(options=SCHEDULES, required=True),
+            "일": st.column_config.NumberColumn(min_value=1, max_value=31, step=1, help="매월 주기의 작업일"),
+            "결과": st.column_config.SelectboxColumn(options=ACTIVITY_RESULT_OPTIONS),
+        },
+    )
+    if st.button("💾 템플릿 저장", key="recurring_tasks_save"):
+        tasks = save_recurring_tasks(edited)
+        st.toast(f"✅ 정기 작업 템플릿 {len(tasks)}개를 저장했습니다.")
+    
+    # 지난 6개월 ~ 다음 6개월 중 선택 (기본: 이번 달)
+    today = datetime.today()
+    months = [
+        (today.year + (today.month - 1 + offset) // 12, (today.month - 1 + offset) % 12 + 1)
+        for offset in range(-6, 7)
+    ]
+    year, month = st.selectbox("생성할 월", months, index=6, key="recurring_month",
+                               format_func=lambda ym: f"{ym[0]}년 {ym[1]}월")
+    
+    # 시트에 이미 있는 행(요청일·TASK·요청자 기준)은 제외하므로 같은 월을 다시 생성해도 중복되지 않음
+    snapshot = get_worksheet_snapshot(worksheet)
+    current_row_count = max(len(snapshot.values) - 1, 0)
+    rows = build_recurring_rows(
+        [task for task in map(normalize_recurring_task, edited) if task is not None],
+        year, month, current_row_count
+    )
+    section = SHEET_SECTIONS["activity"]
+    existing_keys = _get_dedup_index(get_worksheet_key(worksheet), snapshot.version, "activity", snapshot.values)
+    new_rows, duplicates = split_duplicate_rows(
+        rows, existing_keys, dedup_key_indices(section["headers"], section["dedup_key_columns"]),
+        section["date_col_idx"], current_row_count
+    )
+    st.caption(f"생성 대상 {len(rows)}개 행 중 새로 추가할 행 {len(new_rows)}개, 이미 있는 행 {len(duplicates)}개")
+    if new_rows:
+        st.dataframe(values_to_dataframe([section["headers"]] + new_rows), hide_index=True)
+    # 한 번의 추가(append)와 한 번의 정렬로 반영
+    if st.button(f"➕ {year}년 {month}월 정기 작업 {len(new_rows)}개 추가", key="recurring_add",
+                 disabled=not new_rows):
+        upload_rows("activity", worksheet, new_rows, batch_size=len(new_rows))
+
+# 현업문의 응답 시간(SLA) 섹션
+@rerun_fragment
+def render_sla_section(inquiry_worksheet):
+    # 켰을 때만 시트 데이터를 읽고 집계를 맞춤 (꺼져 있으면 탭을 다시 실행해도 읽지 않음)
+    if not st.toggle("⏱️ 응답 시간 (SLA)", key="sla_open"):
+        return
+    with profile_section("응답 시간 집계"):
+        snapshot = get_worksheet_snapshot(inquiry_worksheet)
+        if len(snapshot.values) <= 1:
+            st.caption("아직 기록된 문의 데이터가 없습니다.")
+            return
+        try:
+            summary = get_sla_tracker().summary(get_worksheet_key(inquiry_worksheet), snapshot)
+        except ValueError:
+            st.caption("요청일/답변일 열이 없어 응답 시간을 계산할 수 없습니다.")
+            return
         
-        #### 현업문의 데이터
-        1. 현업문의 탭에서 샘플 템플릿을 다운로드하여 형식을 확인합니다.
-        2. 업로드할 엑셀 파일은 다음 열들을 포함해야 합니다:
-           - **문의방법**: Social Desk, MAIL, 메신저, 전화
-           - **문의유형**: 개발사전검토, 데이터확인 등
-           - **요청부서**: 부서명
-           - **문의사항**: 문의 내용
-           - **요청일**: 날짜 형식 (YYYY-MM-DD)
-           - **요청자**: 요청자 이름
+        overall = summary["overall"]
+        cols = st.columns(4)
+        cols[0].metric("답변 건수", overall["count"])
+        for col, quantile in zip(cols[1:], ("p50", "p90", "p99")):
+            value = overall[f"{quantile}_days"]
+            col.metric(quantile, "-" if value is None else f"{value}일")
+        st.caption(
+            f"응답 시간 = 답변일 - 요청일 (일) · 답변일 없음 {summary['unanswered']}건 · "
+            f"날짜 오류 {summary['invalid']}건"
+        )
         
-        ### 주의사항
-        - 데이터는 Google 스프레드시트에 저장되며, 권한이 있는 사용자만 접근할 수 있습니다.
-        - 대량의 데이터를 업로드할 경우 시간이 다소 소요될 수 있습니다.
-        - 각 탭에서는 해당 탭에 맞는 데이터만 업로드해야 합니다. (SM Activity 탭에서는 SM Activity 데이터, 현업문의 탭에서는 현업문의 데이터)
-        - 문제가 발생하면 관리자에게 문의하세요.
-        """)
+        dimension = st.radio("기준", SLA_DIMENSIONS, horizontal=True, key="sla_dimension")
+        table = summary["tables"].get(dimension, [])
+        if not table:
+            st.caption(f"시트에 '{dimension}' 열이 없습니다.")
+            return
+        st.dataframe(
+            [
+                {
+                    dimension: row[dimension], "건수": row["count"], "평균(일)": row["mean_days"],
+                    "p50(일)": row["p50_days"], "p90(일)": row["p90_days"], "p99(일)": row["p99_days"],
+                }
+                for row in table
+            ],
+            hide_index=True,
+        )
+
+# 도움말 섹션
+def render_help():
+    with st.expander("ℹ️ 도움말 및 사용 방법"):
+        st.markdown(HELP_MARKDOWN)
+
+# SM Activity 탭 내용
+def render_activity_tab(worksheet):
+    render_upload_section("activity", worksheet)
+    render_date_pickers(
+        "req_date", "work_date", update_work_date, "작업일 확인",
+        "요청일을 선택하면 작업일이 자동으로 같은 날짜로 설정됩니다."
+    )
+    render_activity_form(worksheet)
+    render_data_view("activity", worksheet)
+    render_recurring_section(worksheet)
+    render_help()
+
+# 현업문의 탭 내용
+def render_inquiry_tab(inquiry_worksheet):
+    st.subheader("📞 현업문의 기록")
+    render_upload_section("inquiry", inquiry_worksheet)
+    render_date_pickers(
+        "inquiry_req_date", "inquiry_resp_date", update_inquiry_resp_date, "답변일 확인",
+        "요청일을 선택하면 답변일이 자동으로 같은 날짜로 설정됩니다."
+    )
+    render_inquiry_form(inquiry_worksheet)
+    render_data_view("inquiry", inquiry_worksheet)
+    render_sla_section(inquiry_worksheet)
+    render_help()
+
+with profile_section("통합 다운로드"):
+    render_download_section(worksheet, inquiry_worksheet)
+
+# 탭 선택 - st.tabs는 보이지 않는 탭의 내용까지 모두 실행하므로
+# 선택된 탭의 내용만 실행되도록 라디오 버튼으로 전환
+if 'current_tab' not in st.session_state:
+    st.session_state.current_tab = "SM Activity"
+
+current_tab = st.radio(
+    "탭 선택",
+    ["SM Activity", "현업문의"],
+    key="current_tab",
+    horizontal=True,
+    label_visibility="collapsed"
+)
+
+if current_tab == "SM Activity":
+    with profile_section("SM Activity 탭"):
+        render_activity_tab(worksheet)
+else:
+    with profile_section("현업문의 탭"):
+        render_inquiry_tab(inquiry_worksheet)
+
+# 이번 실행의 전체 시간 기록
+end_profiled_rerun()
@@ -0,0 +1,910 @@
+# Google Sheets 데이터 처리 함수 모음
+# Streamlit 화면 코드(sm_activity_app.py)와 분리하여 벤치마크 등에서 직접 import 할 수 있도록 함
+from bisect import bisect_left, bisect_right  # 정렬된 요청일에서 날짜 범위 찾기
+from collections import Counter  # 행 내용별 개수 (업로드 되돌리기)
+from datetime import date, datetime  # 날짜 및 시간 처리를 위한 라이브러리
+from io import BytesIO  # 메모리 내 파일 처리
+import importlib.util  # 선택 라이브러리 설치 여부 확인
+import logging  # 로깅을 위한 라이브러리
+import os  # 파일 이름 처리
+import re  # 업로드 파일의 날짜 문자열 해석
+import time  # 시간 처리를 위한 라이브러리
+import zipfile  # 압축 파일(.zip) 업로드 처리
+
+from sheet_reconcile import RECONCILE_BLOCK_ROWS, block_hashes, changed_blocks, changed_row_ranges  # 바뀐 행 블록 찾기
+# pandas, openpyxl 은 불러오는 데 시간이 걸리므로 실제로 필요한 함수 안에서 불러옴
+
+# 워크시트 헤더 정의
+ACTIVITY_HEADERS = [
+    "NO", "월", "구분", "작업유형", "TASK", "요청일", "작업일",
+    "요청자", "IT", "CNS", "개발자", "내용", "결과"
+]
+INQUIRY_HEADERS = [
+    "NO", "월", "문의방법", "문의유형", "요청부서", "문의사항", "요청일", "답변일",
+    "요청자", "IT", "CNS", "개발자"
+]
+
+# 요청일 열 인덱스 (0부터 시작)
+ACTIVITY_DATE_COL_IDX = 5
+INQUIRY_DATE_COL_IDX = 6
+
+# 업로드 파일의 필수 열
+ACTIVITY_REQUIRED_COLUMNS = ["구분", "작업유형", "TASK", "요청일", "요청자", "결과"]
+INQUIRY_REQUIRED_COLUMNS = ["문의방법", "문의유형", "요청부서", "문의사항", "요청일", "요청자"]
+
+# 엑셀 다운로드 시 열 너비 설정
+ACTIVITY_COLUMN_WIDTHS = {
+    'E': 30,  # TASK 컬럼
+    'F': 15,  # 요청일 컬럼
+    'G': 15,  # 작업일 컬럼
+    'L': 40,  # 내용 컬럼
+}
+INQUIRY_COLUMN_WIDTHS = {
+    'E': 20,  # 요청부서 컬럼
+    'F': 40,  # 문의사항 컬럼
+    'G': 15,  # 요청일 컬럼
+    'H': 15,  # 답변일 컬럼
+}
+
+# 모든 문서 통합 다운로드에서 출처 문서를 기록하는 열 (워크시트별로 합칠 때 첫 번째 열로 추가)
+EXPORT_SOURCE_COLUMN = "문서"
+EXPORT_SOURCE_COLUMN_WIDTH = 22
+# 엑셀 시트 이름 최대 길이
+EXCEL_SHEET_NAME_MAX = 31
+
+# SM Activity 결과 값 (입력 양식, 편집 그리드, 상태 일괄 변경에서 사용)
+ACTIVITY_RESULT_OPTIONS = ["진행 중", "완료", "보류", "기타"]
+ACTIVITY_RESULT_COLUMN = "결과"
+# 편집 그리드에서 수정할 수 없는 열 (행 번호, 요청일에서 계산한 월)
+READONLY_EDIT_COLUMNS = ["NO", "월"]
+
+# 중복 확인에 사용할 자연 키 열 (같은 키의 행은 업로드 시 추가하지 않음)
+ACTIVITY_DEDUP_KEY_COLUMNS = ["요청일", "TASK", "요청자"]
+INQUIRY_DEDUP_KEY_COLUMNS = ["요청일", "요청자", "문의사항"]
+
+# 업로드 배치 설정 (API 할당량 고려)
+UPLOAD_BATCH_SIZE = 25  # 한 번에 추가할 최대 행 수
+UPLOAD_BATCH_DELAY = 3  # 배치 사이 대기 시간(초)
+
+# 정렬 결과 쓰기 배치 설정
+SORT_BATCH_SIZE = 100  # 한 번에 업데이트할 최대 행 수
+SORT_BATCH_DELAY = 2  # 배치 사이 대기 시간(초)
+
+
+class BatchAppendError(Exception):
+    """배치 추가 도중 실패했을 때 이미 추가된 행 수를 함께 전달하는 예외"""
+
+    def __init__(self, message, success_count):
+        super().__init__(message)
+        self.success_count = success_count
+
+
+# 날짜 형식 변환 함수
+def parse_sheet_date(date_str):
+    """시트에 기록된 날짜 문자열을 datetime으로 변환합니다."""
+    try:
+        # '2023-12-31' 형식의 날짜 처리
+        return datetime.strptime(date_str, '%Y-%m-%d')
+    except ValueError:
+        try:
+            # '23-12-31' 등의 2자리 연도 형식 처리
+            parsed_date = datetime.strptime(date_str, '%y-%m-%d')
+            # 2000년 이전인지 확인 및 조정
+            current_year = datetime.now().year
+            century = (current_year // 100) * 100
+            if parsed_date.year > (current_year % 100):
+                # 과거 날짜로 가정
+                parsed_date = parsed_date.replace(year=parsed_date.year + century - 100)
+            else:
+                # 현재 세기로 가정
+                parsed_date = parsed_date.replace(year=parsed_date.year + century)
+            return parsed_date
+        except ValueError:
+            # 다른 형식이거나 유효하지 않은 날짜는 매우 오래된 날짜로 처리
+            return datetime(1900, 1, 1)
+
+
+# 데이터 정렬 함수 (요청일 기준)
+def sort_worksheet_by_date(worksheet, date_col_idx=ACTIVITY_DATE_COL_IDX,
+                           batch_size=SORT_BATCH_SIZE, delay=SORT_BATCH_DELAY):
+    """
+    날짜 기준으로 워크시트 데이터를 정렬합니다.
+    date_col_idx: 정렬 기준이 될 날짜 열의 인덱스 (기본값: 5, 요청일 열)
+    batch_size, delay: 정렬 결과를 나누어 쓸 행 수와 배치 사이 대기 시간(초)
+    """
+    try:
+        # 정렬 필요 여부는 NO 열과 날짜 열만 읽어서 확인 (NO 열로 날짜가 빈 마지막 행까지 포함)
+        _, dates = read_columns(worksheet, [0, date_col_idx])
+
+        # 데이터 없으면 바로 반환
+        if not dates:
+            return
+
+        # 정렬 필요 여부 확인
+        is_sorted = True
+        for i in range(1, len(dates)):
+            prev_date = parse_sheet_date(dates[i-1])
+            curr_date = parse_sheet_date(dates[i])
+            if prev_date > curr_date:
+                is_sorted = False
+                break
+
+        if is_sorted:
+            return  # 이미 정렬되어 있음
+
+        # 정렬이 필요할 때만 모든 데이터 가져오기 (헤더 제외)
+        data_rows = worksheet.get_all_values()[1:]
+
+        # 날짜 기준으로 정렬 (오래된 날짜가 위로)
+        sorted_data = sorted(data_rows, key=lambda x: parse_sheet_date(x[date_col_idx]))
+
+        # 헤더는 그대로 두고 정렬된 데이터만 업데이트
+        for i in range(0, len(sorted_data), batch_size):
+            batch = sorted_data[i:i+batch_size]
+            start_row = i + 2  # 헤더(1) + 데이터 시작 인덱스(i+1)
+
+            # 배치 단위로 업데이트 - 인자 순서 수정
+            worksheet.update(values=batch, range_name=f'A{start_row}')
+
+            # API 할당량 제한을 고려한 딜레이
+            if i + batch_size < len(sorted_data):
+                time.sleep(delay)
+
+        return True
+
+    except Exception as e:
+        logging.error(f"워크시트 정렬 중 오류: {str(e)}")
+        raise Exception(f"데이터 정렬 중 오류가 발생했습니다: {str(e)}")
+
+
+# 업로드 파일의 요청일 값 처리
+# 연-월-일 순서의 날짜 문자열 (2024-01-05, 2024/1/5, 2024.01.05, 2024. 1. 5., 2024년 1월 5일 등, 뒤의 시간은 무시)
+UPLOAD_DATE_PATTERN = re.compile(r"(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})(?!\d)")
+# 구분자 없는 날짜 문자열 (20240105)
+UPLOAD_COMPACT_DATE_PATTERN = re.compile(r"(\d{4})(\d{2})(\d{2})(?!\d)")
+
+
+def parse_upload_date(value):
+    """
+    업로드한 파일의 요청일 값을 datetime으로 변환합니다. 빈 값이면 오늘 날짜를 사용합니다.
+    CSV/Parquet 처럼 날짜가 문자열로 들어오면 흔히 쓰는 연-월-일 형식을 해석하고 시간 부분은 무시합니다.
+    해석할 수 없으면 ValueError 를 발생시킵니다. (행 변환 시 오류 행으로 표시)
+    """
+    import pandas as pd  # 데이터 처리를 위한 라이브러리
+    
+    if value is None or value is pd.NaT or (isinstance(value, float) and pd.isna(value)):
+        return datetime.today()
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+
+    text = str(value).strip()
+    if not text:
+        return datetime.today()
+    match = UPLOAD_DATE_PATTERN.match(text) or UPLOAD_COMPACT_DATE_PATTERN.match(text)
+    if match:
+        try:
+            return datetime(*(int(part) for part in match.groups()))
+        except ValueError:
+            pass
+    raise ValueError(f"요청일을 날짜로 해석할 수 없습니다: {text[:50]}")
+
+
+# 업로드 파일 형식별 읽기 함수
+def excel_engine():
+    """엑셀 읽기 엔진. python-calamine 이 설치되어 있으면 openpyxl 보다 훨씬 빠른 calamine 을 사용합니다."""
+    return "calamine" if importlib.util.find_spec("python_calamine") is not None else "openpyxl"
+
+
+def read_excel_bytes(data):
+    import pandas as pd  # 데이터 처리를 위한 라이브러리
+    
+    return pd.read_excel(BytesIO(data), sheet_name=0, engine=excel_engine())
+
+
+def read_csv_bytes(data):
+    """CSV 파일 읽기 (UTF-8 로 읽을 수 없으면 한글 Windows 기본 인코딩인 CP949 로 다시 시도)"""
+    import pandas as pd  # 데이터 처리를 위한 라이브러리
+    
+    try:
+        return pd.read_csv(BytesIO(data), encoding="utf-8-sig")
+    except UnicodeDecodeError:
+        return pd.read_csv(BytesIO(data), encoding="cp949")
+
+
+def read_parquet_bytes(data):
+    import pandas as pd  # 데이터 처리를 위한 라이브러리
+    
+    # Streamlit 이 pyarrow 를 함께 설치하므로 별도 설치 없이 사용 가능
+    return pd.read_parquet(BytesIO(data))
+
+
+# 확장자별 읽기 함수 (register_upload_reader 로 새 형식 추가 가능)
+UPLOAD_READERS = {
+    ".xlsx": read_excel_bytes,
+    ".xls": read_excel_bytes,
+    ".csv": read_csv_bytes,
+    ".parquet": read_parquet_bytes,
+}
+
+
+def register_upload_reader(extension, reader):
+    """
+    업로드 파일 형식을 추가하거나 읽기 함수를 교체합니다.
+    reader(bytes) 는 데이터프레임을 반환해야 합니다.
+    """
+    UPLOAD_READERS[extension.lower()] = reader
+
+
+def upload_file_types():
+    """st.file_uploader 에 전달할 업로드 가능 확장자 목록 (zip 안의 파일도 같은 형식만 처리)"""
+    return [extension.lstrip(".") for extension in UPLOAD_READERS] + ["zip"]
+
+
+def find_upload_reader(name):
+    """파일 이름의 확장자에 맞는 읽기 함수 (지원하지 않는 형식이면 None)"""
+    return UPLOAD_READERS.get(os.path.splitext(name)[1].lower())
+
+
+# 업로드 zip 파일 제한 (서버 메모리 보호 - 압축을 풀기 전에 zip 목록의 파일 크기로 확인)
+ZIP_MAX_MEMBERS = 100  # 압축 파일 하나에서 읽을 최대 파일 수
+ZIP_MAX_MEMBER_SIZE = 50 * 1024 * 1024  # 파일 하나의 최대 크기 (압축 해제 후)
+ZIP_MAX_TOTAL_SIZE = 200 * 1024 * 1024  # 압축 파일 하나의 최대 전체 크기 (압축 해제 후)
+
+
+# 업로드 파일 목록에서 zip 파일 풀기
+def expand_upload_files(files):
+    """
+    [(파일 이름, bytes), ...] 에서 zip 파일을 풀어 업로드 가능한 파일 목록으로 만듭니다.
+    zip 안의 파일 이름은 '압축 파일 이름/내부 경로' 형식으로 표시합니다.
+    폴더와 지원하지 않는 형식은 건너뛰고, 압축 파일 안의 압축 파일과 크기·개수 제한을 넘는 파일은 읽지 않고 제외합니다.
+    반환값: ([(파일 이름, bytes), ...], [(제외한 파일 이름, 사유), ...])
+    """
+    expanded = []
+    skipped = []
+    for name, data in files:
+        if not name.lower().endswith(".zip"):
+            expanded.append((name, data))
+            continue
+        try:
+            archive = zipfile.ZipFile(BytesIO(data))
+        except zipfile.BadZipFile:
+            skipped.append((name, "압축 파일을 열 수 없습니다."))
+            continue
+        with archive:
+            members = 0
+            total_size = 0
+            for info in archive.infolist():
+                member_name = os.path.basename(info.filename)
+                member_label = f"{name}/{info.filename}"
+                # 폴더, macOS/엑셀 임시 파일은 제외
+                if info.is_dir() or info.filename.startswith("__MACOSX/") or member_name.startswith("~$"):
+                    continue
+                if member_name.lower().endswith(".zip"):
+                    skipped.append((member_label, "압축 파일 안의 압축 파일은 지원하지 않습니다."))
+                    continue
+                # 지원하지 않는 형식은 제외
+                if find_upload_reader(member_name) is None:
+                    continue
+                if members >= ZIP_MAX_MEMBERS:
+                    skipped.append((member_label, f"압축 파일 하나에서 최대 {ZIP_MAX_MEMBERS}개 파일만 읽습니다."))
+                    continue
+                if info.file_size > ZIP_MAX_MEMBER_SIZE:
+                    skipped.append((member_label, f"파일이 너무 큽니다. (최대 {ZIP_MAX_MEMBER_SIZE // (1024 * 1024)}MB)"))
+                    continue
+                if total_size + info.file_size > ZIP_MAX_TOTAL_SIZE:
+                    skipped.append((member_label, f"압축을 푼 전체 크기가 {ZIP_MAX_TOTAL_SIZE // (1024 * 1024)}MB 를 넘습니다."))
+                    continue
+                members += 1
+                total_size += info.file_size
+                # zipfile 은 목록의 file_size 보다 많이 풀지 않음 (크기가 다르면 오류)
+                try:
+                    expanded.append((member_label, archive.read(info)))
+                except (zipfile.BadZipFile, NotImplementedError, RuntimeError) as e:
+                    skipped.append((member_label, f"압축을 풀 수 없습니다: {str(e)[:100]}"))
+    return expanded, skipped
+
+
+# 업로드 파일 하나 읽기
+def parse_upload_file(name, data, required_columns):
+    """
+    확장자에 맞는 읽기 함수로 파일을 읽고 필수 열을 확인합니다.
+    반환값: (파일 이름, 데이터프레임 또는 None, 오류 메시지 또는 None)
+    """
+    reader = find_upload_reader(name)
+    if reader is None:
+        return name, None, "지원하지 않는 파일 형식입니다."
+    try:
+        df = reader(data)
+    except Exception as e:
+        return name, None, f"파일을 읽을 수 없습니다: {str(e)[:150]}"
+
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        return name, None, f"필수 열이 없습니다: {', '.join(missing_columns)}"
+    return name, df, None
+
+
+def parse_upload_files(files, required_columns, executor=None):
+    """
+    여러 업로드 파일을 읽습니다. executor 가 있고 파일이 2개 이상이면 병렬로 처리합니다. (벤치마크 비교용)
+    반환값: 입력 순서대로 [(파일 이름, 데이터프레임 또는 None, 오류 메시지 또는 None), ...]
+    """
+    if executor is None or len(files) < 2:
+        return [parse_upload_file(name, data, required_columns) for name, data in files]
+    futures = [executor.submit(parse_upload_file, name, data, required_columns) for name, data in files]
+    return [future.result() for future in futures]
+
+
+def merge_upload_frames(results):
+    """정상적으로 읽은 파일들의 데이터프레임을 하나로 합칩니다. (행 번호는 0부터 다시 매김)"""
+    import pandas as pd  # 데이터 처리를 위한 라이브러리
+    
+    frames = [df for _, df, error in results if df is not None]
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+
+# 업로드 데이터를 SM Activity 시트 행으로 변환
+def build_activity_rows(df, current_row_count, on_progress=None):
+    """
+    업로드한 데이터프레임을 SM Activity 워크시트 행 목록으로 변환합니다.
+    반환값: (추가할 행 목록, [(오류 행 인덱스, 오류 메시지), ...])
+    """
+    all_rows_to_add = []
+    error_rows = []
+    total = len(df)
+
+    # 각 행을 순회하면서 데이터 준비
+    for index, row in df.iterrows():
+        try:
+            # 진행 상황 업데이트 (10개 단위로 표시 업데이트)
+            if on_progress and (index % 10 == 0 or index == total - 1):
+                on_progress(index + 1, total)
+
+            # 요청일 처리 (날짜 형식 확인)
+            req_date = parse_upload_date(row.get('요청일'))
+
+            # 작업일은 요청일과 동일하게 설정
+            work_date = req_date
+
+            # 새 행 번호 계산
+            new_row_num = current_row_count + len(all_rows_to_add) + 1
+
+            # 데이터 준비
+            new_row_data = [
+                str(new_row_num),  # NO
+                req_date.strftime("%Y%m"),  # 월 정보
+                str(row.get('구분', '')),  # 구분
+                str(row.get('작업유형', '')),  # 작업유형
+                str(row.get('TASK', '')),  # TASK
+                req_date.strftime("%Y-%m-%d"),  # 요청일
+                work_date.strftime("%Y-%m-%d"),  # 작업일
+                str(row.get('요청자', '')),  # 요청자
+                str(row.get('IT', 'IT 담당자')),  # IT 담당자
+                str(row.get('CNS', 'CNS 담당자')),  # CNS 담당자
+                str(row.get('개발자', '개발자')),  # 개발자
+                str(row.get('내용', row.get('TASK', ''))),  # 내용
+                str(row.get('결과', '완료'))  # 결과
+            ]
+
+            # 배열에 추가
+            all_rows_to_add.append(new_row_data)
+
+        except Exception as e:
+            error_rows.append((index, str(e)))
+
+    return all_rows_to_add, error_rows
+
+
+# 업로드 데이터를 현업문의 시트 행으로 변환
+def build_inquiry_rows(df, current_row_count, on_progress=None):
+    """
+    업로드한 데이터프레임을 현업문의 워크시트 행 목록으로 변환합니다.
+    반환값: (추가할 행 목록, [(오류 행 인덱스, 오류 메시지), ...])
+    """
+    all_rows_to_add = []
+    error_rows = []
+    total = len(df)
+
+    # 각 행을 순회하면서 데이터 준비
+    for index, row in df.iterrows():
+        try:
+            # 진행 상황 업데이트 (10개 단위로 표시 업데이트)
+            if on_progress and (index % 10 == 0 or index == total - 1):
+                on_progress(index + 1, total)
+
+            # 요청일 처리 (날짜 형식 확인)
+            req_date = parse_upload_date(row.get('요청일'))
+
+            # 답변일은 요청일과 동일하게 설정
+            resp_date = req_date
+
+            # 새 행 번호 계산
+            new_row_num = current_row_count + len(all_rows_to_add) + 1
+
+            # 데이터 준비
+            new_row_data = [
+                str(new_row_num),  # NO
+                req_date.strftime("%Y%m"),  # 월 정보
+                str(row.get('문의방법', 'Social Desk')),  # 문의방법
+                str(row.get('문의유형', '데이터확인')),  # 문의유형
+                str(row.get('요청부서', '')),  # 요청부서
+                str(row.get('문의사항', '')),  # 문의사항
+                req_date.strftime("%Y-%m-%d"),  # 요청일
+                resp_date.strftime("%Y-%m-%d"),  # 답변일
+                str(row.get('요청자', '')),  # 요청자
+                str(row.get('IT', '한상욱')),  # IT 담당자
+                str(row.get('CNS', '이정인')),  # CNS 담당자
+                str(row.get('개발자', '위승빈'))  # 개발자
+            ]
+
+            # 배열에 추가
+            all_rows_to_add.append(new_row_data)
+
+        except Exception as e:
+            error_rows.append((index, str(e)))
+
+    return all_rows_to_add, error_rows
+
+
+# 배치 단위로 나누어 행 추가
+def append_rows_in_batches(worksheet, rows, batch_size=UPLOAD_BATCH_SIZE,
+                           delay=UPLOAD_BATCH_DELAY, on_progress=None, on_wait=None, on_commit=None):
+    """
+    행 목록을 batch_size 단위로 나누어 워크시트에 추가합니다. (API 할당량 고려)
+    on_commit(완료 행 수): 배치가 시트에 반영된 직후 호출 (체크포인트 기록용)
+    on_progress(완료 행 수, 전체 행 수): 배치 추가 후 호출
+    on_wait(완료 행 수, 전체 행 수): 다음 배치 전 대기 시작 시 호출
+    실패 시 이미 추가된 행 수를 담은 BatchAppendError를 발생시킵니다.
+    """
+    success_count = 0
+    total = len(rows)
+
+    try:
+        for i in range(0, total, batch_size):
+            batch = rows[i:i+batch_size]
+            if batch:
+                # 배치 단위로 데이터 추가
+                worksheet.append_rows(batch)
+                success_count += len(batch)
+                if on_commit:
+                    on_commit(success_count)
+
+                # 배치 추가 후 진행 상황 업데이트
+                if on_progress:
+                    on_progress(i + len(batch), total)
+
+                # API 할당량 제한을 고려한 딜레이 (필요시)
+                if i + batch_size < total:
+                    if on_wait:
+                        on_wait(i + len(batch), total)
+                    time.sleep(delay)
+    except Exception as e:
+        raise BatchAppendError(str(e), success_count) from e
+
+    return success_count
+
+
+# 중복 비교용 값 정규화
+def normalize_key_value(value):
+    """앞뒤 공백 제거, 연속 공백 통합, 대소문자 구분 없이 비교할 수 있도록 값을 정규화합니다."""
+    return " ".join(str(value).split()).casefold()
+
+
+def _normalize_key_date(value):
+    """'2024-1-5', '24-01-05' 처럼 형식이 달라도 같은 날짜는 같은 키가 되도록 정규화합니다."""
+    parsed = parse_sheet_date(str(value).strip())
+    if parsed.year == 1900:
+        # 날짜로 해석할 수 없는 값은 문자열 그대로 비교
+        return normalize_key_value(value)
+    return parsed.strftime('%Y-%m-%d')
+
+
+def dedup_key_indices(headers, key_columns):
+    """자연 키 열 이름을 행 안의 위치로 변환합니다."""
+    return [headers.index(column) for column in key_columns]
+
+
+def build_dedup_key(row, key_indices, date_col_idx):
+    """워크시트 행에서 정규화된 자연 키 튜플을 만듭니다."""
+    key = []
+    for i in key_indices:
+        value = row[i] if i < len(row) else ""
+        key.append(_normalize_key_date(value) if i == date_col_idx else normalize_key_value(value))
+    return tuple(key)
+
+
+# 기존 시트 데이터로 중복 확인 인덱스 생성
+def build_dedup_index(values, key_indices, date_col_idx):
+    """
+    get_all_values() 결과(헤더 포함)에서 자연 키 집합을 만듭니다.
+    한 번 만들어 두면 업로드 행마다 O(1)로 중복 여부를 확인할 수 있습니다.
+    """
+    return frozenset(build_dedup_key(row, key_indices, date_col_idx) for row in values[1:])
+
+
+# 업로드할 행에서 중복 행 분리
+def split_duplicate_rows(rows, existing_keys, key_indices, date_col_idx, current_row_count):
+    """
+    시트에 이미 있거나 파일 안에서 반복되는 행을 분리합니다.
+    남은 행의 NO는 current_row_count 다음 번호부터 다시 매깁니다.
+    반환값: (추가할 행 목록, [(중복 행, 사유), ...])
+    """
+    new_rows = []
+    duplicates = []
+    seen = set()
+
+    for row in rows:
+        key = build_dedup_key(row, key_indices, date_col_idx)
+        if key in existing_keys:
+            duplicates.append((row, "이미 기록된 데이터"))
+        elif key in seen:
+            duplicates.append((row, "파일 내 중복"))
+        else:
+            seen.add(key)
+            new_rows.append(row)
+
+    # 중복 행을 제외했으므로 NO 다시 매기기
+    for offset, row in enumerate(new_rows, 1):
+        row[0] = str(current_row_count + offset)
+
+    return new_rows, duplicates
+
+
+# 시트 데이터(헤더 포함 2차원 리스트)를 데이터프레임으로 변환
+def values_to_dataframe(values, read_only=False):
+    """
+    get_all_values() 결과를 헤더가 있는 데이터프레임으로 변환합니다.
+    read_only=True: 여러 세션이 공유할 수 있도록 값을 수정할 수 없는 데이터프레임으로 만듭니다.
+    (수정하려고 하면 ValueError, 수정이 필요하면 copy() 사용)
+    """
+    import numpy as np  # pandas 와 함께 설치됨
+    import pandas as pd  # 데이터 처리를 위한 라이브러리
+    
+    if not read_only or len(values) < 2 or len({len(row) for row in values}) != 1:
+        return pd.DataFrame(list(values[1:]), columns=list(values[0]))
+    # 하나의 읽기 전용 배열을 복사 없이 감싼 데이터프레임
+    data = np.array(values[1:], dtype=object)
+    data.flags.writeable = False
+    return pd.DataFrame(data, columns=list(values[0]), copy=False)
+
+
+# 열 인덱스(0부터)를 A1 표기의 열 문자로 변환
+def column_letter(col_idx):
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letters = ""
+    col_idx += 1
+    while col_idx:
+        col_idx, remainder = divmod(col_idx - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _pad_row(row, width):
+    """시트에서 읽은 행은 끝의 빈 셀이 생략되므로 열 수를 맞춰 비교합니다."""
+    return [str(value) for value in row[:width]] + [""] * (width - len(row))
+
+
+# 편집한 데이터와 원본 시트 데이터 비교
+def diff_edited_cells(values, edited_rows):
+    """
+    values: get_all_values() 결과 (헤더 포함), edited_rows: 편집 후 데이터 행 목록 (values[1:] 와 같은 순서)
+    반환값: 바뀐 셀 목록 [(시트 행 번호(헤더=1), 열 인덱스(0부터), 이전 값, 새 값), ...]
+    """
+    width = len(values[0])
+    changes = []
+    for offset, (original, edited) in enumerate(zip(values[1:], edited_rows)):
+        original = _pad_row(original, width)
+        edited = ["" if value is None else str(value) for value in edited]
+        for col_idx in range(width):
+            new_value = edited[col_idx] if col_idx < len(edited) else ""
+            if new_value != original[col_idx]:
+                changes.append((offset + 2, col_idx, original[col_idx], new_value))
+    return changes
+
+
+# 조건에 맞는 데이터 행 찾기 (상태 일괄 변경 대상)
+def select_rows(values, column_values=None, contains=None, date_col_idx=None, date_range=None):
+    """
+    column_values: {열 인덱스: 허용할 값 목록}, contains: {열 인덱스: 포함해야 할 문자열}
+    date_range: (시작일, 종료일) - date_col_idx 열의 날짜가 이 범위(양 끝 포함)인 행만 선택
+    반환값: 조건에 맞는 행의 시트 행 번호 목록 (헤더=1)
+    """
+    width = len(values[0])
+    column_values = {col: set(allowed) for col, allowed in (column_values or {}).items()}
+    contains = {col: text.strip().lower() for col, text in (contains or {}).items() if text.strip()}
+    if date_range is not None:
+        date_from, date_to = (datetime.combine(day, datetime.min.time()) for day in date_range)
+    selected = []
+    for offset, row in enumerate(values[1:]):
+        row = _pad_row(row, width)
+        if any(row[col] not in allowed for col, allowed in column_values.items()):
+            continue
+        if any(text not in row[col].lower() for col, text in contains.items()):
+            continue
+        if date_range is not None and not date_from <= parse_sheet_date(row[date_col_idx]) <= date_to:
+            continue
+        selected.append(offset + 2)
+    return selected
+
+
+# 요청일 인덱스 생성 (시트가 요청일 순서로 정렬되어 있으면 이진 탐색으로 날짜 범위의 행을 찾음)
+def build_date_index(values, date_col_idx, start=1):
+    """
+    values[start:] 행의 날짜 열을 날짜 목록으로 변환합니다. (start=1: 헤더 제외)
+    반환값: 오래된 날짜부터 정렬된 날짜 목록, 시트가 정렬되어 있지 않으면 None
+    """
+    dates = [parse_sheet_date(row[date_col_idx] if len(row) > date_col_idx else "")
+             for row in values[start:]]
+    if any(earlier > later for earlier, later in zip(dates, dates[1:])):
+        return None
+    return dates
+
+
+def date_row_bounds(dates, date_from, date_to):
+    """
+    정렬된 날짜 목록에서 date_from ~ date_to(양 끝 포함) 범위의 시트 행 번호를 찾습니다.
+    반환값: (첫 행 번호, 마지막 행 번호) - 헤더=1, 범위에 행이 없으면 None
+    """
+    first = bisect_left(dates, datetime.combine(date_from, datetime.min.time()))
+    last = bisect_right(dates, datetime.combine(date_to, datetime.min.time()))
+    if first >= last:
+        return None
+    return first + 2, last + 1
+
+
+# 필요한 열만 읽기 (행 수, 정렬 확인 등 일부 열만 필요한 작업용)
+def read_columns(worksheet, columns, start_row=2, unformatted=False, column_major=True):
+    """
+    columns 열(0부터)의 start_row 행부터 끝까지만 한 번의 batch_get 으로 읽습니다.
+    unformatted=True: 표시 형식을 적용하지 않은 값 (숫자는 숫자로 전달되어 전송량이 적음, 날짜 열에는 사용하지 않음)
+    column_major=True: 열별 값 목록 [[첫 번째 열 값, ...], ...], False: 행별 목록 [[행 값, ...], ...]
+    끝의 빈 셀은 시트가 생략하므로 가장 긴 열에 맞춰 빈 문자열로 채웁니다.
+    """
+    from gspread.utils import ValueRenderOption  # Google Sheets API 연동
+    
+    ranges = [f"{column_letter(col)}{start_row}:{column_letter(col)}" for col in columns]
+    blocks = worksheet.batch_get(
+        ranges, major_dimension="COLUMNS",
+        value_render_option=ValueRenderOption.unformatted if unformatted else ValueRenderOption.formatted
+    )
+    values = [list(block[0]) if block else [] for block in blocks]
+    length = max(map(len, values), default=0)
+    values = [column + [""] * (length - len(column)) for column in values]
+    return values if column_major else [list(row) for row in zip(*values)]
+
+
+# 데이터 행 수 (NO 열과 날짜 열만 읽음)
+def count_data_rows(worksheet, date_col_idx=ACTIVITY_DATE_COL_IDX):
+    """
+    헤더를 제외한 데이터 행 수를 NO 열과 날짜 열만 읽어서 계산합니다.
+    NO 가 빈 마지막 행도 세도록 항상 채워지는 날짜 열을 같이 읽고 긴 쪽에 맞춥니다. (정렬 확인과 같은 열)
+    """
+    return len(read_columns(worksheet, [0, date_col_idx])[0])
+
+
+# 날짜 열만 읽기 (전체 데이터가 캐시에 없을 때 날짜 범위를 찾는 데 사용)
+def read_date_column(worksheet, date_col_idx):
+    """날짜 열의 2행부터 끝까지를 [[값], ...] 형태로 읽습니다."""
+    return read_columns(worksheet, [date_col_idx], column_major=False)
+
+
+# 행 범위만 읽기
+def read_row_range(worksheet, first_row, last_row, width):
+    """first_row ~ last_row 행의 A열부터 width 개 열을 읽습니다. (끝의 빈 셀/행도 채워서 반환)"""
+    rows = worksheet.get(f"A{first_row}:{column_letter(width - 1)}{last_row}")
+    rows = [_pad_row(row, width) for row in rows]
+    return rows + [[""] * width for _ in range(last_row - first_row + 1 - len(rows))]
+
+
+def read_row_ranges(worksheet, row_ranges, width):
+    """[(첫 행, 마지막 행), ...] 구간들을 한 번의 batch_get 으로 읽습니다. (구간마다 read_row_range 와 같은 형태)"""
+    blocks = worksheet.batch_get([f"A{first}:{column_letter(width - 1)}{last}" for first, last in row_ranges])
+    result = []
+    for (first, last), rows in zip(row_ranges, blocks):
+        rows = [_pad_row(row, width) for row in rows]
+        result.append(rows + [[""] * width for _ in range(last - first + 1 - len(rows))])
+    return result
+
+
+# Google Sheets 에서 직접 수정한 행 블록만 다시 읽기
+def read_drifted_values(worksheet, cached_values, date_col_idx, block_rows=RECONCILE_BLOCK_ROWS):
+    """
+    NO 열과 날짜 열만 읽어 캐시된 데이터(헤더 포함)와 블록별로 비교하고, 두 열이 다른 블록의 행만 다시 읽어
+    캐시된 데이터와 합칩니다. (행 추가·삭제·정렬, NO·날짜 수정)
+    두 열이 모두 같으면 다른 열이 수정된 것이므로 어느 블록인지 알 수 없어 전체를 다시 읽습니다.
+    반환값: (새 데이터 (헤더 포함), 전체를 다시 읽었는지)
+    """
+    if not cached_values:
+        return worksheet.get_all_values(), True
+    numbers, dates = read_columns(worksheet, [0, date_col_idx])
+
+    def key_rows(rows):
+        return [(row[0] if row else "", row[date_col_idx] if date_col_idx < len(row) else "") for row in rows]
+
+    old_keys = key_rows(cached_values)
+    # 헤더는 캐시된 것을 그대로 사용
+    new_keys = old_keys[:1] + list(zip(numbers, dates))
+    blocks = changed_blocks(block_hashes(old_keys, block_rows), block_hashes(new_keys, block_rows))
+    if not blocks:
+        return worksheet.get_all_values(), True
+
+    row_count = len(new_keys)
+    width = max(map(len, cached_values))
+    values = [list(row) for row in cached_values[:row_count]]
+    values += [[""] * width for _ in range(row_count - len(values))]
+    # 삭제되어 없어진 블록은 읽지 않고, 헤더(1행)는 다시 읽지 않음
+    row_ranges = [
+        (max(first, 2), last)
+        for first, last in changed_row_ranges([b for b in blocks if b * block_rows < row_count], row_count, block_rows)
+        if max(first, 2) <= last
+    ]
+    if row_ranges:
+        for (first, last), rows in zip(row_ranges, read_row_ranges(worksheet, row_ranges, width)):
+            values[first - 1:last] = rows
+    return values, False
+
+
+# 바뀐 셀만 한 번의 요청으로 쓰기
+def write_cell_changes(worksheet, values, changes):
+    """
+    changes 의 셀만 한 번의 batch_update 로 씁니다. (전체 시트를 다시 쓰지 않음)
+    쓰기 전에 바뀐 셀이 있는 행을 한 번의 batch_get 으로 다시 읽어, 편집을 시작한 뒤 다른 사용자가
+    수정했거나 정렬·추가로 위치가 바뀐 행이 있으면 아무것도 쓰지 않고 그 행 번호 목록을 반환합니다.
+    반환값: 충돌한 시트 행 번호 목록 (비어 있으면 저장 완료)
+    """
+    width = len(values[0])
+    last_col = column_letter(width - 1)
+    row_numbers = sorted({row for row, _, _, _ in changes})
+    current = worksheet.batch_get([f"A{row}:{last_col}{row}" for row in row_numbers])
+    conflicts = []
+    for row, block in zip(row_numbers, current):
+        current_row = _pad_row(block[0] if block else [], width)
+        if current_row != _pad_row(values[row - 1], width):
+            conflicts.append(row)
+    if conflicts:
+        return conflicts
+
+    worksheet.batch_update([
+        {"range": f"{column_letter(col_idx)}{row}", "values": [[new_value]]}
+        for row, col_idx, _, new_value in changes
+    ])
+    return []
+
+
+# 행 내용 비교용 값
+def row_content(row):
+    """모든 셀을 문자열로 바꾼 튜플 (시트가 생략하는 끝의 빈 셀은 제외)"""
+    cells = [str(cell) for cell in row]
+    while cells and cells[-1] == "":
+        cells.pop()
+    return tuple(cells)
+
+
+# 기록한 행 내용으로 행 위치 찾기
+def find_rows_by_content(values, rows):
+    """
+    get_all_values() 결과(헤더 포함)에서 rows 와 모든 셀이 같은 행의 시트 행 번호를 찾습니다.
+    같은 내용의 행이 시트에 rows 보다 많으면 어느 행인지 알 수 없으므로 찾은 것으로 보지 않습니다.
+    반환값: (시트 행 번호 목록 (오름차순), 시트에 없는 행 목록, 어느 행인지 알 수 없는 행 목록)
+    """
+    expected = Counter(map(row_content, rows))
+    matches = {}
+    for row_number, row in enumerate(values[1:], 2):
+        content = row_content(row)
+        if content in expected:
+            matches.setdefault(content, []).append(row_number)
+
+    row_numbers, missing, ambiguous = [], [], []
+    for content, count in expected.items():
+        found = matches.get(content, [])
+        if len(found) < count:
+            missing.extend([list(content)] * (count - len(found)))
+        elif len(found) > count:
+            ambiguous.extend([list(content)] * count)
+        else:
+            row_numbers.extend(found)
+    return sorted(row_numbers), missing, ambiguous
+
+
+# 행 번호 목록을 연속 구간으로 묶기
+def contiguous_row_ranges(row_numbers):
+    """시트 행 번호 목록을 [(첫 행, 마지막 행), ...] 연속 구간 목록으로 묶습니다. (오름차순)"""
+    ranges = []
+    for row in sorted(set(row_numbers)):
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1] = (ranges[-1][0], row)
+        else:
+            ranges.append((row, row))
+    return ranges
+
+
+# 흩어진 행을 한 번의 요청으로 삭제
+def delete_sheet_rows(worksheet, row_numbers):
+    """
+    시트 행 번호(헤더가 1행)의 행을 한 번의 batch_update(deleteDimension 요청 목록)로 삭제합니다.
+    연속된 행은 요청 하나로 묶고, 앞의 삭제가 뒤 요청의 행 번호를 바꾸지 않도록 아래쪽 구간부터 지웁니다.
+    반환값: 삭제 요청(연속 구간) 수
+    """
+    ranges = contiguous_row_ranges(row_numbers)
+    if not ranges:
+        return 0
+    worksheet.spreadsheet.batch_update({"requests": [
+        {"deleteDimension": {"range": {
+            "sheetId": worksheet.id, "dimension": "ROWS", "startIndex": first - 1, "endIndex": last,
+        }}}
+        for first, last in reversed(ranges)
+    ]})
+    return len(ranges)
+
+
+def _shift_column_widths(column_widths, offset=1):
+    """열 너비 설정의 열 문자를 offset 칸 오른쪽으로 옮깁니다. (Z 열까지만 사용)"""
+    return {chr(ord(letter) + offset): width for letter, width in column_widths.items()}
+
+
+# 모든 문서 통합 다운로드용 시트 목록 생성
+def build_consolidated_sheets(sources, merge=False):
+    """
+    여러 문서의 워크시트 데이터를 build_excel_file() 에 넘길 시트 목록으로 만듭니다.
+    sources: [(문서 이름, 워크시트 이름, get_all_values() 결과, 열 너비 딕셔너리), ...]
+    merge=False: 문서/워크시트마다 별도 시트 ("문서 이름_워크시트 이름")
+    merge=True: 같은 워크시트끼리 하나의 시트로 합치고 첫 열에 출처 문서를 기록
+    """
+    import pandas as pd  # 데이터 처리를 위한 라이브러리
+    
+    if not merge:
+        return [
+            (f"{document}_{worksheet}"[:EXCEL_SHEET_NAME_MAX], values_to_dataframe(values), column_widths)
+            for document, worksheet, values, column_widths in sources
+            if len(values) > 0
+        ]
+    
+    merged = {}
+    for document, worksheet, values, column_widths in sources:
+        if len(values) == 0:
+            continue
+        df = values_to_dataframe(values)
+        df.insert(0, EXPORT_SOURCE_COLUMN, document)
+        frames, _ = merged.setdefault(worksheet, ([], column_widths))
+        frames.append(df)
+    return [
+        (worksheet[:EXCEL_SHEET_NAME_MAX], pd.concat(frames, ignore_index=True),
+         {"A": EXPORT_SOURCE_COLUMN_WIDTH, **_shift_column_widths(column_widths or {})})
+        for worksheet, (frames, column_widths) in merged.items()
+    ]
+
+
+# 엑셀 파일 생성
+def build_excel_file(sheets):
+    """
+    여러 데이터프레임을 서식이 적용된 하나의 엑셀 파일로 만듭니다.
+    sheets: [(시트 이름, 데이터프레임, 열 너비 딕셔너리), ...]
+    반환값: 처음 위치로 되돌린 BytesIO 버퍼
+    """
+    import pandas as pd  # 데이터 처리를 위한 라이브러리
+    from openpyxl.styles import Font, Alignment  # 엑셀 셀 서식 지정용 스타일 클래스
+    
+    excel_buffer = BytesIO()
+    with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
+        for sheet_name, df, column_widths in sheets:
+            df.to_excel(writer, index=False, sheet_name=sheet_name)
+
+            # 엑셀 서식 설정
+            worksheet_excel = writer.sheets[sheet_name]
+
+            # 헤더 스타일 설정
+            for col_num, value in enumerate(df.columns.values, 1):
+                cell = worksheet_excel.cell(row=1, column=col_num)
+                cell.font = Font(bold=True)
+                cell.alignment = Alignment(horizontal="center", vertical="center")
+
+            # 열 너비 설정
+            for column_letter, width in (column_widths or {}).items():
+                worksheet_excel.column_dimensions[column_letter].width = width
+
+    excel_buffer.seek(0)
+    return excel_buffer
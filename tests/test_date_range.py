@@ -0,0 +1,46 @@
+# 요청일 기간 조회(이진 탐색과 행 범위 읽기) 테스트
+from datetime import date
+
+from bench.fake_gspread import FakeClient
+from sm_sheets import build_date_index, date_row_bounds, read_date_column, read_row_range, select_rows
+
+HEADERS = ["NO", "TASK", "요청일"]
+DATES = ["2024-01-01", "2024-01-03", "2024-01-03", "2024-01-05", "2024-01-08"]
+VALUES = [HEADERS] + [[str(i), f"작업 {i}", day] for i, day in enumerate(DATES, 1)]
+
+
+def test_date_row_bounds_returns_sheet_rows_inclusive():
+    dates = build_date_index(VALUES, 2)
+    assert date_row_bounds(dates, date(2024, 1, 3), date(2024, 1, 5)) == (3, 5)
+    assert date_row_bounds(dates, date(2024, 1, 2), date(2024, 1, 3)) == (3, 4)
+    assert date_row_bounds(dates, date(2023, 12, 1), date(2024, 12, 31)) == (2, 6)
+    assert date_row_bounds(dates, date(2024, 1, 8), date(2024, 1, 8)) == (6, 6)
+
+
+def test_date_row_bounds_without_matching_rows():
+    dates = build_date_index(VALUES, 2)
+    assert date_row_bounds(dates, date(2024, 1, 6), date(2024, 1, 7)) is None
+    assert date_row_bounds(dates, date(2024, 2, 1), date(2024, 2, 28)) is None
+    assert date_row_bounds([], date(2024, 1, 1), date(2024, 1, 31)) is None
+
+
+def test_bounds_match_full_scan():
+    dates = build_date_index(VALUES, 2)
+    for date_from, date_to in [(date(2024, 1, 1), date(2024, 1, 4)), (date(2024, 1, 4), date(2024, 1, 9))]:
+        first, last = date_row_bounds(dates, date_from, date_to)
+        assert list(range(first, last + 1)) == select_rows(VALUES, date_col_idx=2, date_range=(date_from, date_to))
+
+
+def test_unsorted_sheet_has_no_index():
+    values = VALUES[:1] + VALUES[:0:-1]
+    assert build_date_index(values, 2) is None
+
+
+def test_ranged_read_with_date_column_only():
+    spreadsheet = FakeClient().seed_spreadsheet("문서", {"시트": VALUES})
+    worksheet = spreadsheet.worksheet("시트")
+    column = read_date_column(worksheet, 2)
+    # 날짜 열만 읽었을 때는 헤더가 없으므로 start=0
+    first, last = date_row_bounds(build_date_index(column, 0, start=0), date(2024, 1, 3), date(2024, 1, 5))
+    assert read_row_range(worksheet, first, last, len(HEADERS)) == [list(row) for row in VALUES[first - 1:last]]
+    assert spreadsheet.backend.calls["get_all_values"] == 0
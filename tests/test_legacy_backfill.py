@@ -0,0 +1,50 @@
+# 예전 엑셀 이관 도구 테스트 (메모리 기반 gspread 대체 구현 사용)
+from datetime import datetime
+
+import openpyxl
+
+from bench.fake_gspread import WRITE_METHODS, FakeClient
+from legacy_backfill import parse_args, run
+from sm_sheets import ACTIVITY_HEADERS
+
+SPREADSHEET = "SM Activity Dashboard"
+
+
+def write_legacy_workbook(path, dates):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(ACTIVITY_HEADERS)
+    for i, day in enumerate(dates, 1):
+        sheet.append([i, day.strftime("%Y%m"), "정기", "점검", f"작업 {i}", day, day,
+                      "홍길동", "IT 담당자", "CNS 담당자", "개발자", f"작업 {i}", "완료"])
+    workbook.save(path)
+    return str(path)
+
+
+def test_dry_run_does_not_create_missing_worksheet(tmp_path):
+    path = write_legacy_workbook(tmp_path / "legacy.xlsx", [datetime(2023, 1, 2), datetime(2023, 1, 3)])
+    client = FakeClient()
+    spreadsheet = client.seed_spreadsheet(SPREADSHEET)
+
+    report = run(parse_args([path, "--dry-run"]), client=client)
+
+    result = report["targets"]["SM Activity"]
+    assert (result["new"], result["duplicates"], result["added"]) == (2, 0, 0)
+    assert not any(method in WRITE_METHODS for method in client.backend.calls)
+    assert spreadsheet._worksheets == {}
+
+
+def test_backfill_skips_rows_already_in_sheet(tmp_path):
+    path = write_legacy_workbook(tmp_path / "legacy.xlsx", [datetime(2023, 1, 3), datetime(2023, 1, 2)])
+    client = FakeClient()
+    client.seed_spreadsheet(SPREADSHEET)
+
+    first = run(parse_args([path]), client=client)
+    second = run(parse_args([path]), client=client)
+
+    assert first["targets"]["SM Activity"]["added"] == 2
+    assert second["targets"]["SM Activity"]["new"] == 0
+    assert second["targets"]["SM Activity"]["duplicates"] == 2
+    values = client.backend.spreadsheets[SPREADSHEET].worksheet("SM Activity").get_all_values()
+    assert values[0] == ACTIVITY_HEADERS
+    assert [row[5] for row in values[1:]] == ["2023-01-02", "2023-01-03"]
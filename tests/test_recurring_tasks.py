@@ -0,0 +1,57 @@
+# 정기 작업 템플릿의 월별 작업 날짜와 행 생성 테스트
+from datetime import date
+
+from recurring_tasks import (
+    DEFAULT_RECURRING_TASKS, SCHEDULE_DAILY, SCHEDULE_MONTHLY, SCHEDULE_WEEKDAY, build_recurring_rows,
+    load_recurring_tasks, normalize_recurring_task, save_recurring_tasks, schedule_dates,
+)
+
+
+def task(schedule, day=None, name="점검"):
+    return normalize_recurring_task({"TASK": name, "작업유형": "점검", "주기": schedule, "일": day})
+
+
+def test_daily_covers_every_day_of_the_month():
+    days = schedule_dates(task(SCHEDULE_DAILY), 2024, 2)
+    assert len(days) == 29
+    assert days[0] == date(2024, 2, 1) and days[-1] == date(2024, 2, 29)
+
+
+def test_weekday_skips_weekends():
+    days = schedule_dates(task(SCHEDULE_WEEKDAY), 2024, 6)
+    # 2024년 6월: 1일 토요일, 30일 일요일
+    assert len(days) == 20
+    assert days[0] == date(2024, 6, 3)
+    assert all(day.weekday() < 5 for day in days)
+
+
+def test_monthly_uses_last_day_when_the_day_does_not_exist():
+    assert schedule_dates(task(SCHEDULE_MONTHLY, 31), 2023, 2) == [date(2023, 2, 28)]
+    assert schedule_dates(task(SCHEDULE_MONTHLY, 15), 2023, 4) == [date(2023, 4, 15)]
+    # 날짜를 알 수 없으면 1일
+    assert schedule_dates(task(SCHEDULE_MONTHLY, "말일"), 2023, 4) == [date(2023, 4, 1)]
+
+
+def test_normalize_drops_rows_without_task_or_schedule():
+    assert normalize_recurring_task({"TASK": " ", "주기": SCHEDULE_DAILY}) is None
+    assert normalize_recurring_task({"TASK": "점검", "주기": "격주"}) is None
+    assert task(SCHEDULE_MONTHLY, 40)["일"] == 31
+    assert task(SCHEDULE_DAILY, 5)["일"] is None
+
+
+def test_rows_are_sorted_by_date_and_numbered_after_existing_rows():
+    rows = build_recurring_rows([task(SCHEDULE_DAILY, name="조간"), task(SCHEDULE_MONTHLY, 1, name="월정기")],
+                                2024, 3, 10)
+    assert len(rows) == 32
+    assert [row[0] for row in rows[:3]] == ["11", "12", "13"]
+    assert [row[5] for row in rows[:2]] == ["2024-03-01", "2024-03-01"]
+    assert rows[-1][5] == "2024-03-31"
+    assert {row[12] for row in rows} == {"완료"}
+
+
+def test_templates_round_trip(tmp_path):
+    path = str(tmp_path / "recurring_tasks.json")
+    assert load_recurring_tasks(path) == DEFAULT_RECURRING_TASKS
+    saved = save_recurring_tasks([{"TASK": "백업", "주기": SCHEDULE_WEEKDAY}, {"TASK": ""}], path)
+    assert [t["TASK"] for t in saved] == ["백업"]
+    assert load_recurring_tasks(path) == saved
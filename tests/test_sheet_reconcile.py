@@ -0,0 +1,105 @@
+# 블록 해시 비교와 시트 직접 수정 확인 테스트 (메모리 기반 gspread 대체 구현 사용)
+import pytest
+
+from bench.fake_gspread import FakeClient
+from sheet_cache import SnapshotStore
+from sheet_reconcile import block_hashes, changed_blocks, changed_row_ranges, merge_blocks
+from sm_sheets import read_drifted_values
+
+HEADERS = ["NO", "TASK", "요청일", "결과"]
+DATE_COL_IDX = 2
+
+
+def sheet_values(count):
+    return [HEADERS] + [[str(i), f"작업 {i}", f"2024-01-{i % 28 + 1:02d}", "완료"] for i in range(1, count + 1)]
+
+
+def seed(values):
+    spreadsheet = FakeClient().seed_spreadsheet("문서", {"시트": values})
+    return spreadsheet, spreadsheet.worksheet("시트")
+
+
+def test_changed_blocks_and_row_ranges():
+    old = sheet_values(11)
+    new = [list(row) for row in old] + [["12", "작업 12", "2024-01-13", "완료"]]
+    new[2][3] = "보류"
+    blocks = changed_blocks(block_hashes(old, 4), block_hashes(new, 4))
+    # 3행이 있는 0번 블록과 새 행(13행)이 추가된 3번 블록
+    assert blocks == [0, 3]
+    assert changed_row_ranges(blocks, len(new), 4) == [(1, 4), (13, 13)]
+    assert changed_row_ranges([0, 1], len(new), 4) == [(1, 8)]
+
+
+def test_merge_blocks_reuses_unchanged_rows():
+    old = [tuple(row) for row in sheet_values(7)]
+    new = [list(row) for row in old]
+    new[6][3] = "보류"
+    merged = merge_blocks(old, new, changed_blocks(block_hashes(old, 4), block_hashes(new, 4)), 4)
+    assert [list(row) for row in merged] == new
+    assert merged[1] is old[1]
+    assert merged[6] is new[6]
+
+
+@pytest.mark.parametrize("change", ["append", "delete", "date"])
+def test_read_drifted_values_reads_only_changed_blocks(change):
+    cached = sheet_values(20)
+    values = [list(row) for row in cached]
+    if change == "append":
+        values.append(["21", "작업 21", "2024-02-01", "진행"])
+    elif change == "delete":
+        del values[16:]
+    else:
+        values[10][DATE_COL_IDX] = "2023-12-31"
+        values[10][3] = "보류"
+    spreadsheet, worksheet = seed(values)
+    spreadsheet.backend.reset_counters()
+
+    result, full = read_drifted_values(worksheet, cached, DATE_COL_IDX, block_rows=4)
+
+    assert not full
+    assert result == values
+    assert spreadsheet.backend.calls["get_all_values"] == 0
+    # 키 열 읽기와 (있으면) 바뀐 블록 읽기
+    assert spreadsheet.backend.calls["batch_get"] == (1 if change == "delete" else 2)
+
+
+def test_read_drifted_values_reads_everything_when_only_other_columns_changed():
+    cached = sheet_values(20)
+    values = [list(row) for row in cached]
+    values[7][3] = "보류"
+    spreadsheet, worksheet = seed(values)
+
+    result, full = read_drifted_values(worksheet, cached, DATE_COL_IDX, block_rows=4)
+
+    assert full
+    assert result == values
+    assert spreadsheet.backend.calls["get_all_values"] == 1
+
+
+def test_check_drift_skips_when_modified_time_is_unchanged():
+    spreadsheet, worksheet = seed(sheet_values(600))
+    store = SnapshotStore()
+
+    def check():
+        return store.check_drift(
+            "시트", spreadsheet.get_lastUpdateTime(), worksheet.get_all_values,
+            lambda cached: read_drifted_values(worksheet, cached, DATE_COL_IDX),
+        )
+
+    snapshot, mode = check()
+    assert mode == "full" and snapshot.changed_rows is None
+    spreadsheet.backend.reset_counters()
+    assert check()[1] == "skipped"
+    assert spreadsheet.backend.calls["get_all_values"] == spreadsheet.backend.calls["batch_get"] == 0
+
+    # 요청일 수정은 그 블록만 다시 읽고, 수정 시각을 기록하지 않아 다음 확인에서 전체를 읽음
+    values = sheet_values(600)
+    values[300][DATE_COL_IDX] = "2023-12-31"
+    spreadsheet.seed_worksheet("시트", values)
+    snapshot, mode = check()
+    assert mode == "partial"
+    assert snapshot.changed_rows == [(257, 512)]
+    assert [list(row) for row in snapshot.values] == values
+    assert store.partial_count == 1
+    assert check()[1] == "full"
+    assert check()[1] == "skipped"
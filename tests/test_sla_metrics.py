@@ -0,0 +1,72 @@
+# 현업문의 응답 시간 집계의 바뀐 블록 반영 테스트
+import pytest
+
+from bench.run_benchmarks import make_sheet_values
+from sheet_reconcile import block_hashes
+from sla_metrics import ResponseTimeSketch, SlaMetrics, response_days
+from sm_sheets import INQUIRY_HEADERS
+
+RESPONSE_IDX = INQUIRY_HEADERS.index("답변일")
+
+
+def summary(metrics):
+    return (metrics.overall.to_dict(), metrics.row_count, metrics.unanswered, metrics.invalid,
+            {dimension: metrics.table(dimension) for dimension in metrics.groups})
+
+
+def test_response_days():
+    assert response_days("2024-01-01", "2024-01-04") == 3
+    assert response_days("2024-01-01", "") is None
+    assert response_days("2024-01-05", "2024-01-04") is None
+    assert response_days("날짜 아님", "2024-01-04") is None
+
+
+def test_sketch_quantiles_and_remove():
+    sketch = ResponseTimeSketch()
+    for days in [0, 1, 1, 2, 10]:
+        sketch.add(days)
+    assert sketch.quantile(0.5) == 1 and sketch.quantile(0.99) == 10
+    sketch.remove(10)
+    assert sketch.to_dict()["p99_days"] == 2 and 10 not in sketch.counts
+
+
+@pytest.mark.parametrize("change", ["edit", "append", "delete", "sort"])
+def test_apply_snapshot_matches_full_rebuild(change):
+    values = make_sheet_values("inquiry", 700, seed=1)
+    metrics = SlaMetrics.from_values(values, version=1)
+    new = [list(row) for row in values]
+    if change == "edit":
+        new[10][RESPONSE_IDX] = ""
+        new[500][RESPONSE_IDX] = "잘못된 날짜"
+    elif change == "append":
+        new += [list(row) for row in values[1:40]]
+    elif change == "delete":
+        del new[300:320]
+    else:
+        # 정렬 등으로 행 위치가 모두 바뀐 경우
+        new = new[:1] + new[:0:-1]
+
+    changed = metrics.apply_snapshot(new, block_hashes(new), 2)
+
+    assert changed > 0
+    assert metrics.version == 2
+    assert summary(metrics) == summary(SlaMetrics.from_values(new))
+
+
+def test_apply_snapshot_without_changes_keeps_totals():
+    values = make_sheet_values("inquiry", 300, seed=2)
+    metrics = SlaMetrics.from_values(values, version=1)
+    before = summary(metrics)
+    assert metrics.apply_snapshot(values, block_hashes(values), 2) == 0
+    assert summary(metrics) == before
+
+
+def test_append_rows_then_apply_snapshot_does_not_count_twice():
+    values = make_sheet_values("inquiry", 300, seed=3)
+    metrics = SlaMetrics.from_values(values, version=1)
+    metrics.block_hashes  # 해시를 먼저 계산한 상태에서 추가
+    added = [list(row) for row in values[1:5]]
+    metrics.append_rows(added)
+    new = [list(row) for row in values] + added
+    assert metrics.apply_snapshot(new, block_hashes(new), 2) == 0
+    assert summary(metrics) == summary(SlaMetrics.from_values(new))
@@ -0,0 +1,57 @@
+# 업로드 zip 파일 풀기 테스트
+from io import BytesIO
+import zipfile
+
+import pytest
+
+import sm_sheets
+from sm_sheets import expand_upload_files
+
+
+def make_zip(members):
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_expands_supported_members_and_skips_directories_and_lock_files():
+    data = make_zip([("a.csv", b"x"), ("sub/", b""), ("sub/b.xlsx", b"y"), ("~$c.xlsx", b"z"),
+                     ("__MACOSX/._a.csv", b"m"), ("note.txt", b"t")])
+
+    expanded, skipped = expand_upload_files([("plain.csv", b"p"), ("files.zip", data)])
+
+    assert expanded == [("plain.csv", b"p"), ("files.zip/a.csv", b"x"), ("files.zip/sub/b.xlsx", b"y")]
+    assert skipped == []
+
+
+def test_nested_archives_and_broken_zip_are_reported():
+    data = make_zip([("inner.zip", make_zip([("a.csv", b"x")])), ("a.csv", b"x")])
+
+    expanded, skipped = expand_upload_files([("outer.zip", data), ("broken.zip", b"not a zip")])
+
+    assert expanded == [("outer.zip/a.csv", b"x")]
+    assert [name for name, _ in skipped] == ["outer.zip/inner.zip", "broken.zip"]
+
+
+def test_size_and_member_limits_are_checked_before_reading(monkeypatch):
+    monkeypatch.setattr(sm_sheets, "ZIP_MAX_MEMBERS", 2)
+    monkeypatch.setattr(sm_sheets, "ZIP_MAX_MEMBER_SIZE", 100)
+    monkeypatch.setattr(sm_sheets, "ZIP_MAX_TOTAL_SIZE", 150)
+    # 압축하면 작지만 풀면 제한을 넘는 파일
+    data = make_zip([("big.csv", b"0" * 1000), ("a.csv", b"1" * 80), ("b.csv", b"2" * 80),
+                     ("c.csv", b"3" * 10), ("d.csv", b"4" * 10)])
+    read = []
+    monkeypatch.setattr(zipfile.ZipFile, "read", lambda self, info: read.append(info.filename) or b"")
+
+    expanded, skipped = expand_upload_files([("files.zip", data)])
+
+    assert [name for name, _ in expanded] == ["files.zip/a.csv", "files.zip/c.csv"]
+    assert [name for name, _ in skipped] == ["files.zip/big.csv", "files.zip/b.csv", "files.zip/d.csv"]
+    assert read == ["a.csv", "c.csv"]
+
+
+@pytest.mark.parametrize("name", ["files.zip", "FILES.ZIP"])
+def test_empty_archive(name):
+    assert expand_upload_files([(name, make_zip([]))]) == ([], [])
@@ -0,0 +1,103 @@
+# 업로드 백그라운드 작업 테스트 (메모리 기반 gspread 대체 구현 사용)
+import threading
+
+import pandas as pd
+import pytest
+
+from bench.fake_gspread import FakeClient
+from sm_sheets import (
+    ACTIVITY_DATE_COL_IDX, ACTIVITY_DEDUP_KEY_COLUMNS, ACTIVITY_HEADERS, build_activity_rows, dedup_key_indices,
+)
+from upload_jobs import JOB_COMPLETED, JOB_ROLLED_BACK, UploadJobRunner
+from upload_journal import UploadJournal
+
+KEY_INDICES = dedup_key_indices(ACTIVITY_HEADERS, ACTIVITY_DEDUP_KEY_COLUMNS)
+
+
+def activity_rows(tasks, dates, current_row_count=0):
+    df = pd.DataFrame({
+        "구분": ["정기"] * len(tasks), "작업유형": ["점검"] * len(tasks), "TASK": tasks,
+        "요청일": dates, "요청자": ["홍길동"] * len(tasks), "결과": ["완료"] * len(tasks),
+    })
+    rows, errors = build_activity_rows(df, current_row_count)
+    assert errors == []
+    return rows
+
+
+def make_worksheet(rows):
+    spreadsheet = FakeClient().seed_spreadsheet("문서", {"SM Activity": [ACTIVITY_HEADERS] + rows})
+    return spreadsheet.worksheet("SM Activity")
+
+
+@pytest.fixture
+def runner(tmp_path):
+    return UploadJobRunner(journal_dir=str(tmp_path))
+
+
+def run_job(runner, worksheet, rows, source_key=None):
+    """업로드 작업을 등록하고 끝날 때까지 기다립니다."""
+    journal = UploadJournal.start("ws", "activity", "SM Activity", rows,
+                                  journal_dir=runner.journal_dir, source_key=source_key)
+    done = threading.Event()
+    job = runner.submit(journal, worksheet, KEY_INDICES, ACTIVITY_DATE_COL_IDX, on_complete=lambda job: done.set())
+    assert done.wait(10)
+    return job
+
+
+def test_job_rechecks_fresh_data_when_it_starts(runner):
+    worksheet = make_worksheet(activity_rows(["기존"], ["2024-01-01"]))
+    # 화면의 스냅샷(기존 1행) 기준으로 만든 업로드 행 (NO 2, 3)
+    rows = activity_rows(["새 작업", "다른 세션 작업"], ["2024-01-02", "2024-01-03"], current_row_count=1)
+    # 스냅샷 이후 다른 세션이 같은 작업과 다른 작업을 추가함
+    worksheet.append_rows(activity_rows(["다른 세션 작업", "또 다른 작업"], ["2024-01-03", "2024-01-04"], 1))
+
+    job = run_job(runner, worksheet, rows)
+
+    assert job.status == JOB_COMPLETED
+    assert job.total == 1
+    values = worksheet.get_all_values()[1:]
+    # 중복은 건너뛰고 NO 는 최신 행 수(3) 다음 번호로 다시 매김
+    assert sorted(row[0] for row in values) == ["1", "2", "3", "4"]
+    assert [row[4] for row in values].count("다른 세션 작업") == 1
+    assert next(row[0] for row in values if row[4] == "새 작업") == "4"
+
+
+def test_rollback_deletes_only_the_rows_the_job_added(runner):
+    worksheet = make_worksheet(activity_rows(["기존 1", "기존 2"], ["2024-01-01", "2024-01-02"]))
+    job = run_job(runner, worksheet, activity_rows(["추가 1", "추가 2"], ["2024-01-03", "2024-01-04"], 2))
+    # 업로드 뒤 다른 행이 추가되고 시트가 정렬되어 위치가 바뀜
+    worksheet.append_rows(activity_rows(["나중 작업"], ["2024-01-03"], 4))
+    values = worksheet.get_all_values()
+    worksheet.update(values[:1] + sorted(values[1:], key=lambda row: row[5]), "A1")
+    worksheet.spreadsheet.backend.reset_counters()
+
+    assert [row[4] for row in worksheet.get_all_values()[1:]] == ["기존 1", "기존 2", "추가 1", "나중 작업", "추가 2"]
+
+    remaining, deleted = runner.rollback(job.job_id, worksheet)
+
+    assert deleted == 2
+    assert [row[4] for row in worksheet.get_all_values()[1:]] == ["기존 1", "기존 2", "나중 작업"]
+    assert remaining == worksheet.get_all_values()
+    # 떨어진 두 구간도 한 번의 batch_update 로 삭제
+    assert worksheet.spreadsheet.backend.calls["spreadsheet_batch_update"] == 1
+    assert runner.get(job.job_id).status == JOB_ROLLED_BACK
+    assert not runner.get(job.job_id).can_rollback
+
+
+@pytest.mark.parametrize("change", ["edited", "duplicated"])
+def test_rollback_refuses_when_rows_cannot_be_matched(runner, change):
+    worksheet = make_worksheet(activity_rows(["기존"], ["2024-01-01"]))
+    job = run_job(runner, worksheet, activity_rows(["추가 1", "추가 2"], ["2024-01-02", "2024-01-03"], 1))
+    values = worksheet.get_all_values()
+    if change == "edited":
+        worksheet.update([["보류"]], "M3")
+    else:
+        # 모든 셀이 같은 행을 직접 복사해 붙여 넣음
+        worksheet.append_rows([values[2]])
+    before = worksheet.get_all_values()
+
+    with pytest.raises(Exception, match="되돌리지 않았습니다"):
+        runner.rollback(job.job_id, worksheet)
+
+    assert worksheet.get_all_values() == before
+    assert runner.get(job.job_id).can_rollback
@@ -0,0 +1,69 @@
+# 일괄 업로드 체크포인트 기록(업로드 ID, 이어서 하기) 테스트
+import pytest
+
+from upload_journal import UploadInProgressError, UploadJournal, claim_upload, list_unfinished, make_upload_id
+
+ROWS = [["1", "정기", "점검", "2024-01-01"], ["2", "정기", "백업", "2024-01-02"]]
+
+
+def test_upload_id_ignores_no_column_and_depends_on_worksheet():
+    renumbered = [["11"] + row[1:] for row in ROWS]
+    assert make_upload_id("ws", ROWS) == make_upload_id("ws", renumbered)
+    assert make_upload_id("ws", ROWS) != make_upload_id("other", ROWS)
+    assert make_upload_id("ws", ROWS) != make_upload_id("ws", ROWS[:1])
+
+
+def test_upload_id_uses_source_key_instead_of_rows():
+    assert make_upload_id("ws", ROWS, "hash") == make_upload_id("ws", ROWS[:1], "hash")
+    assert make_upload_id("ws", ROWS, "hash") != make_upload_id("ws", ROWS, "other")
+    assert make_upload_id("ws", ROWS, "hash") != make_upload_id("ws", ROWS)
+
+
+def test_queued_and_direct_uploads_of_the_same_file_share_a_record(tmp_path):
+    queued = UploadJournal.start("ws", "activity", "SM Activity", ROWS, journal_dir=str(tmp_path),
+                                 queued=True, source_key="hash")
+    # 장애가 끝난 뒤 같은 파일을 다시 올리면 (중복이 빠져 행이 달라져도) 대기열 기록을 이어서 사용
+    direct = UploadJournal.start("ws", "activity", "SM Activity", ROWS[1:], journal_dir=str(tmp_path),
+                                 source_key="hash")
+    assert direct.upload_id == queued.upload_id
+    assert direct.queued and direct.total == 2
+
+
+def test_resume_from_last_complete_checkpoint(tmp_path):
+    journal = UploadJournal.start("ws", "activity", "SM Activity", ROWS, journal_dir=str(tmp_path))
+    journal.mark_started()
+    journal.record_commit(1)
+    # 쓰다 만 마지막 줄은 무시
+    with open(journal.log_path, "a", encoding="utf-8") as f:
+        f.write('{"committed": 2')
+
+    loaded = UploadJournal.load(journal.upload_id, str(tmp_path))
+    assert loaded.committed == 1 and loaded.started
+    assert loaded.pending_rows() == ROWS[1:]
+    assert UploadJournal.start("ws", "activity", "SM Activity", ROWS, journal_dir=str(tmp_path)).committed == 1
+
+    loaded.replace_pending_rows([["3", "정기", "백업", "2024-01-02"]])
+    reloaded = UploadJournal.load(journal.upload_id, str(tmp_path))
+    assert reloaded.rows == [ROWS[0], ["3", "정기", "백업", "2024-01-02"]]
+    assert reloaded.total == 2
+
+
+def test_list_unfinished_and_finish(tmp_path):
+    first = UploadJournal.start("ws", "activity", "SM Activity", ROWS, journal_dir=str(tmp_path))
+    UploadJournal.start("other", "inquiry", "현업문의", ROWS, journal_dir=str(tmp_path))
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+
+    assert len(list_unfinished(journal_dir=str(tmp_path))) == 2
+    assert [j.upload_id for j in list_unfinished("ws", str(tmp_path))] == [first.upload_id]
+    first.finish()
+    assert list_unfinished("ws", str(tmp_path)) == []
+    assert list_unfinished(journal_dir=str(tmp_path / "없음")) == []
+
+
+def test_claim_upload_blocks_concurrent_resume():
+    with claim_upload("id"):
+        with pytest.raises(UploadInProgressError):
+            with claim_upload("id"):
+                pass
+    with claim_upload("id"):
+        pass
@@ -0,0 +1,86 @@
+# 업로드 파일 읽기 함수(확장자별 등록)와 요청일 해석 테스트
+from datetime import datetime
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from sm_sheets import (
+    ACTIVITY_REQUIRED_COLUMNS, build_activity_rows, find_upload_reader, parse_upload_date, parse_upload_file,
+)
+
+# 티켓 시스템 내보내기에서 볼 수 있는 요청일 문자열과 기대하는 날짜
+DATE_TEXTS = ["2024-01-05", "2024/01/06", "2024-01-07 09:30", "2024. 1. 8.", "20240109"]
+EXPECTED_DATES = ["2024-01-05", "2024-01-06", "2024-01-07", "2024-01-08", "2024-01-09"]
+
+
+def upload_frame(dates):
+    return pd.DataFrame({
+        "구분": ["정기"] * len(dates),
+        "작업유형": ["점검"] * len(dates),
+        "TASK": [f"작업 {i}" for i in range(len(dates))],
+        "요청일": dates,
+        "요청자": ["홍길동"] * len(dates),
+        "결과": ["완료"] * len(dates),
+    })
+
+
+def to_csv(df):
+    return df.to_csv(index=False).encode("utf-8-sig")
+
+
+def to_parquet(df):
+    buffer = BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def to_xlsx(df):
+    buffer = BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("name, encode, dates", [
+    ("tickets.csv", to_csv, DATE_TEXTS),
+    ("tickets.parquet", to_parquet, DATE_TEXTS),
+    # 엑셀은 날짜 셀로 저장되므로 datetime 값으로 읽힘
+    ("tickets.xlsx", to_xlsx, [datetime.strptime(d, "%Y-%m-%d") for d in EXPECTED_DATES]),
+])
+def test_reader_registry_parses_request_dates(name, encode, dates):
+    assert find_upload_reader(name) is not None
+    _, df, error = parse_upload_file(name, encode(upload_frame(dates)), ACTIVITY_REQUIRED_COLUMNS)
+    assert error is None
+
+    rows, row_errors = build_activity_rows(df, current_row_count=10)
+
+    assert row_errors == []
+    assert [row[5] for row in rows] == EXPECTED_DATES
+    assert [row[1] for row in rows] == ["202401"] * len(EXPECTED_DATES)
+    assert [row[0] for row in rows] == [str(n) for n in range(11, 16)]
+
+
+@pytest.mark.parametrize("name, encode", [("bad.csv", to_csv), ("bad.parquet", to_parquet)])
+def test_unparseable_request_date_is_reported_as_row_error(name, encode):
+    _, df, _ = parse_upload_file(name, encode(upload_frame(["2024-01-05", "다음 주", "2024-01-07"])),
+                                 ACTIVITY_REQUIRED_COLUMNS)
+
+    rows, row_errors = build_activity_rows(df, current_row_count=0)
+
+    # 오늘 날짜로 채우지 않고 오류 행으로 표시, 나머지 행의 NO 는 빈 번호 없이 이어짐
+    assert [index for index, _ in row_errors] == [1]
+    assert [row[5] for row in rows] == ["2024-01-05", "2024-01-07"]
+    assert [row[0] for row in rows] == ["1", "2"]
+
+
+def test_parse_upload_date_formats():
+    assert parse_upload_date("2024년 1월 5일") == datetime(2024, 1, 5)
+    assert parse_upload_date("2024-01-05T09:30:00Z") == datetime(2024, 1, 5)
+    assert parse_upload_date(pd.Timestamp("2024-01-05")) == datetime(2024, 1, 5)
+    # 빈 값은 기존처럼 오늘 날짜
+    assert parse_upload_date(None).date() == datetime.today().date()
+    assert parse_upload_date(float("nan")).date() == datetime.today().date()
+    assert parse_upload_date(pd.NaT).date() == datetime.today().date()
+    for value in ["2024-13-40", "05/01/2024", "45000"]:
+        with pytest.raises(ValueError):
+            parse_upload_date(value)
@@ -0,0 +1,300 @@
+# 일괄 업로드 백그라운드 작업 실행기
+# "데이터 추가하기" 를 누르면 업로드를 화면 실행(rerun)과 분리된 작업자 스레드에서 처리합니다.
+# 작업 상태는 data/upload_journal/<작업 ID>.job.json 에 저장되므로 페이지를 새로 고치거나
+# 다른 세션에서도 진행 상황을 확인할 수 있습니다. 작업 ID는 업로드 체크포인트 기록의 업로드 ID와 같습니다.
+# 작업이 시트에 추가한 행의 내용은 <작업 ID>.batch.json 에 남겨, 작업 ID(배치 ID)로 업로드를 되돌릴 수 있습니다.
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+import threading
+
+from sm_sheets import (
+    UPLOAD_BATCH_SIZE, append_rows_in_batches, build_dedup_index, delete_sheet_rows, find_rows_by_content,
+    row_content, sort_worksheet_by_date, split_duplicate_rows,
+)
+from upload_journal import JOURNAL_DIR, claim_upload, write_json_atomic
+
+# 작업 상태
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SORTING = "sorting"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_INTERRUPTED = "interrupted"  # 서버가 재시작되어 중단된 작업
+JOB_ROLLED_BACK = "rolled_back"  # 추가한 행을 다시 삭제한 작업
+ACTIVE_JOB_STATUSES = {JOB_QUEUED, JOB_RUNNING, JOB_SORTING}
+
+# 화면에 표시할 상태 이름
+JOB_STATUS_LABELS = {
+    JOB_QUEUED: "대기 중",
+    JOB_RUNNING: "추가 중",
+    JOB_SORTING: "정렬 중",
+    JOB_COMPLETED: "완료",
+    JOB_FAILED: "실패",
+    JOB_INTERRUPTED: "중단됨",
+    JOB_ROLLED_BACK: "되돌림",
+}
+
+# 작업자 수 (Sheets API 할당량이 서비스 계정 기준이므로 한 번에 하나씩 처리하고 나머지는 대기)
+UPLOAD_WORKERS = 1
+# 끝난 작업 상태를 보관하는 기간
+JOB_RETENTION = timedelta(days=1)
+
+
+class UploadJob:
+    """업로드 작업 하나의 상태"""
+
+    def __init__(self, job_id, kind, sheet_title, worksheet_key, total, journal_dir=JOURNAL_DIR,
+                 status=JOB_QUEUED, committed=0, added=0, message="", created_at=None, updated_at=None):
+        now = datetime.now().isoformat(timespec="seconds")
+        self.job_id = job_id
+        self.kind = kind
+        self.sheet_title = sheet_title
+        self.worksheet_key = worksheet_key
+        self.total = total
+        self.journal_dir = journal_dir
+        self.status = status
+        self.committed = committed  # 시트에 반영된 행 수 (이전 실행분 포함)
+        self.added = added  # 이번 작업에서 추가한 행 수
+        self.message = message
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
+
+    @property
+    def path(self):
+        return os.path.join(self.journal_dir, f"{self.job_id}.job.json")
+
+    @property
+    def batch_path(self):
+        """이 작업이 시트에 추가한 행 목록 (되돌리기용)"""
+        return os.path.join(self.journal_dir, f"{self.job_id}.batch.json")
+
+    @property
+    def can_rollback(self):
+        return self.status == JOB_COMPLETED and os.path.exists(self.batch_path)
+
+    def load_batch_rows(self):
+        if not os.path.exists(self.batch_path):
+            return []
+        with open(self.batch_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def add_batch_rows(self, rows):
+        """시트에 추가한 것을 확인한 행을 기록에 더합니다."""
+        rows = [list(row) for row in rows]
+        if rows:
+            write_json_atomic(self.batch_path, self.load_batch_rows() + rows)
+
+    def clear_batch_rows(self):
+        if os.path.exists(self.batch_path):
+            os.remove(self.batch_path)
+
+    @property
+    def is_active(self):
+        return self.status in ACTIVE_JOB_STATUSES
+
+    @property
+    def progress(self):
+        return min(1.0, self.committed / self.total) if self.total else 1.0
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "sheet_title": self.sheet_title,
+            "worksheet_key": self.worksheet_key,
+            "total": self.total,
+            "status": self.status,
+            "committed": self.committed,
+            "added": self.added,
+            "message": self.message,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def save(self):
+        self.updated_at = datetime.now().isoformat(timespec="seconds")
+        os.makedirs(self.journal_dir, exist_ok=True)
+        write_json_atomic(self.path, self.to_dict())
+
+    @classmethod
+    def load(cls, path, journal_dir=JOURNAL_DIR):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(journal_dir=journal_dir, **data)
+
+
+class UploadJobRunner:
+    """프로세스 단위 업로드 작업 대기열과 작업자 스레드"""
+
+    def __init__(self, journal_dir=JOURNAL_DIR, max_workers=UPLOAD_WORKERS):
+        self.journal_dir = journal_dir
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._load_saved_jobs()
+
+    def _load_saved_jobs(self):
+        """저장된 작업 상태를 불러옵니다. 진행 중이던 작업은 서버 재시작으로 중단된 것으로 표시합니다."""
+        if not os.path.isdir(self.journal_dir):
+            return
+        expired_before = datetime.now() - JOB_RETENTION
+        for name in os.listdir(self.journal_dir):
+            if not name.endswith(".job.json"):
+                continue
+            path = os.path.join(self.journal_dir, name)
+            try:
+                job = UploadJob.load(path, self.journal_dir)
+            except (OSError, ValueError, TypeError):
+                continue  # 읽을 수 없는 상태 파일은 건너뜀
+            if not job.is_active and datetime.fromisoformat(job.updated_at) < expired_before:
+                os.remove(path)
+                job.clear_batch_rows()
+                continue
+            if job.is_active:
+                job.status = JOB_INTERRUPTED
+                job.message = "서버가 다시 시작되어 작업이 중단되었습니다. 이어서 업로드할 수 있습니다."
+                job.save()
+            self._jobs[job.job_id] = job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, worksheet_key=None):
+        """작업 목록 (최근 순)"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values()
+                    if worksheet_key is None or job.worksheet_key == worksheet_key]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def submit(self, journal, worksheet, key_indices, date_col_idx, on_complete=None,
+               batch_size=UPLOAD_BATCH_SIZE):
+        """
+        체크포인트 기록의 남은 행을 추가하는 작업을 대기열에 넣습니다.
+        같은 업로드가 이미 대기 중이거나 진행 중이면 그 작업을 그대로 반환합니다.
+        on_complete(job): 작업이 끝난 뒤 (성공/실패 모두) 작업자 스레드에서 호출
+        batch_size: 한 번에 추가할 행 수 (정기 작업처럼 행 수가 정해진 경우 한 번에 추가)
+        """
+        with self._lock:
+            existing = self._jobs.get(journal.upload_id)
+            if existing is not None and existing.is_active:
+                return existing
+            # 같은 내용을 완료한 뒤 새로 올린 업로드이면 이전 작업의 되돌리기 기록은 사용하지 않음
+            if existing is not None and existing.status in (JOB_COMPLETED, JOB_ROLLED_BACK):
+                existing.clear_batch_rows()
+            job = UploadJob(
+                journal.upload_id, journal.info["kind"], journal.info["sheet_title"],
+                journal.worksheet_key, journal.total, self.journal_dir, committed=journal.committed,
+            )
+            job.save()
+            self._jobs[job.job_id] = job
+        self._executor.submit(self._run, job, journal, worksheet, key_indices, date_col_idx, on_complete, batch_size)
+        return job
+
+    def _run(self, job, journal, worksheet, key_indices, date_col_idx, on_complete, batch_size=UPLOAD_BATCH_SIZE):
+        try:
+            with claim_upload(job.job_id):
+                job.status = JOB_RUNNING
+                job.save()
+
+                # 화면에서 중복 확인과 NO 계산에 사용한 스냅샷은 몇 분 전 데이터일 수 있으므로 (다른 세션이나 시트에서
+                # 직접 추가한 행) 시작할 때 최신 데이터로 다시 확인하고 NO 를 다시 매김
+                # 이어서 하는 경우에는 마지막 배치가 반영된 뒤 응답만 실패했을 수도 있음
+                latest_values = worksheet.get_all_values()
+                existing_keys = build_dedup_index(latest_values, key_indices, date_col_idx)
+                current_row_count = len(latest_values) - 1 if len(latest_values) > 0 else 0
+                pending_rows, already_added = split_duplicate_rows(
+                    journal.pending_rows(), existing_keys, key_indices, date_col_idx, current_row_count
+                )
+                # 이전 실행에서 추가를 시작한 작업이면, 건너뛰는 행 중 모든 셀(NO 포함)이 같은 행이 시트에 있는 행은
+                # 이 작업이 추가한 행 (체크포인트 기록 전에 중단된 배치)이므로 되돌리기 기록에 남김
+                if journal.started:
+                    sheet_rows = Counter(map(row_content, latest_values[1:]))
+                    written_rows = []
+                    for row, reason in already_added:
+                        content = row_content(row)
+                        if reason == "이미 기록된 데이터" and sheet_rows[content] > 0:
+                            sheet_rows[content] -= 1
+                            written_rows.append(row)
+                    job.add_batch_rows(written_rows)
+                journal.replace_pending_rows(pending_rows)
+                job.total = journal.total
+                if already_added:
+                    job.message = f"이미 시트에 있는 {len(already_added)}개 행은 건너뛰었습니다."
+                job.save()
+
+                already_committed = journal.committed
+
+                def save_checkpoint(done):
+                    journal.record_commit(already_committed + done)
+                    job.committed = already_committed + done
+                    job.added = done
+                    job.save()
+
+                # 배치 단위로 나누어 추가 (API 할당량 고려)
+                journal.mark_started()
+                append_rows_in_batches(worksheet, journal.pending_rows(), batch_size=batch_size,
+                                       on_commit=save_checkpoint)
+
+                # 되돌리기용으로 추가한 행(이전 실행분 포함)을 남기고, 모든 배치가 반영되었으므로 체크포인트 기록 삭제
+                job.add_batch_rows(journal.rows)
+                journal.finish()
+
+                # 요청일 기준으로 데이터 정렬
+                job.status = JOB_SORTING
+                job.save()
+                try:
+                    sort_worksheet_by_date(worksheet, date_col_idx=date_col_idx)
+                    job.status = JOB_COMPLETED
+                    job.message = f"총 {job.added}개 행이 추가되었습니다. {job.message}".strip()
+                except Exception as e:
+                    job.status = JOB_COMPLETED
+                    job.message = f"데이터는 추가되었으나 정렬 중 오류가 발생했습니다: {str(e)[:150]}"
+        except Exception as e:
+            logging.error(f"업로드 작업 {job.job_id} 실패: {str(e)}")
+            job.status = JOB_FAILED
+            job.message = str(e)[:300]
+        finally:
+            job.save()
+            if on_complete:
+                try:
+                    on_complete(job)
+                except Exception as e:
+                    logging.error(f"업로드 작업 완료 처리 중 오류: {str(e)}")
+
+    def rollback(self, job_id, worksheet):
+        """
+        완료된 업로드 작업(배치 ID)으로 추가한 행을 모두 삭제합니다.
+        기록한 행과 모든 셀이 같은 행을 최신 데이터에서 찾아 연속 구간으로 묶고, 한 번의 batch_update 로 삭제합니다.
+        업로드 후 수정·삭제된 행이 있거나 같은 내용의 행이 따로 있어 어느 행인지 알 수 없으면 아무것도 삭제하지 않습니다.
+        반환값: (삭제 후 워크시트 데이터 (헤더 포함), 삭제한 행 수)
+        """
+        job = self.get(job_id)
+        if job is None or not job.can_rollback:
+            raise Exception("되돌릴 수 있는 업로드 작업이 아닙니다.")
+        # 진행 중인 업로드가 있으면 행 위치가 바뀔 수 있으므로 되돌리지 않음
+        if any(other.is_active for other in self.list_jobs(job.worksheet_key)):
+            raise Exception("같은 워크시트에 진행 중인 업로드가 있습니다. 작업이 끝난 뒤 다시 시도해주세요.")
+        with claim_upload(job.job_id):
+            values = worksheet.get_all_values()
+            row_numbers, missing, ambiguous = find_rows_by_content(values, job.load_batch_rows())
+            if missing or ambiguous:
+                problems = []
+                if missing:
+                    problems.append(f"업로드 후 수정되었거나 삭제된 행 {len(missing)}개 "
+                                    f"(NO {', '.join(str(row[0]) for row in missing[:5] if row)})")
+                if ambiguous:
+                    problems.append(f"같은 내용의 행이 따로 있어 구분할 수 없는 행 {len(ambiguous)}개 "
+                                    f"(NO {', '.join(str(row[0]) for row in ambiguous[:5] if row)})")
+                raise Exception(f"{', '.join(problems)}가 있어 되돌리지 않았습니다. 시트에서 직접 확인해주세요.")
+            delete_sheet_rows(worksheet, row_numbers)
+            job.status = JOB_ROLLED_BACK
+            job.message = f"추가했던 {len(row_numbers)}개 행을 삭제했습니다."
+            job.save()
+            job.clear_batch_rows()
+        deleted = set(row_numbers)
+        return [row for row_number, row in enumerate(values, 1) if row_number not in deleted], len(row_numbers)
@@ -0,0 +1,215 @@
+# 일괄 업로드 체크포인트 기록 (중단된 업로드 이어서 하기)
+# 업로드마다 ID를 부여하고, 추가할 행 목록과 시트에 반영된 배치 위치를 로컬 파일에 기록합니다.
+# 할당량 오류 등으로 중간에 실패해도 마지막으로 반영된 배치 다음부터 다시 시작할 수 있습니다.
+#
+# 파일 구성 (data/upload_journal/):
+#   <업로드 ID>.json       - 업로드 정보 (대상 워크시트, 생성 시각, 전체 행 수)
+#   <업로드 ID>.rows.json  - 추가할 행 목록 (화면에 목록을 표시할 때는 읽지 않음)
+#   <업로드 ID>.log        - 배치가 반영될 때마다 한 줄씩 추가되는 체크포인트
+from contextlib import contextmanager
+from datetime import datetime
+import hashlib
+import json
+import os
+import threading
+
+# 체크포인트 파일 저장 위치
+JOURNAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "upload_journal")
+
+# 현재 프로세스에서 진행 중인 업로드 ID (같은 업로드를 두 세션이 동시에 이어서 하지 않도록)
+_active_uploads = set()
+_active_lock = threading.Lock()
+
+
+class UploadInProgressError(Exception):
+    """같은 업로드가 이미 다른 세션에서 진행 중일 때 발생하는 예외"""
+
+
+def make_upload_id(worksheet_key, rows, source_key=None):
+    """
+    대상 워크시트와 업로드 원본으로 업로드 ID를 만듭니다.
+    같은 파일을 같은 워크시트에 다시 올리면 같은 ID가 되어 기존 기록을 이어서 사용합니다.
+    source_key: 업로드한 파일 내용의 해시 (있으면 행 대신 사용)
+      일부만 반영된 뒤 다시 올리면 반영된 행이 중복으로 빠지고 NO 도 다시 매겨지므로 행 내용은 달라짐
+    source_key 가 없으면 NO(첫 열)를 제외한 행 내용을 사용합니다.
+    """
+    digest = hashlib.sha256(worksheet_key.encode("utf-8"))
+    if source_key is not None:
+        digest.update(b"\0" + source_key.encode("utf-8"))
+        return digest.hexdigest()[:16]
+    for row in rows:
+        digest.update(json.dumps(row[1:], ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()[:16]
+
+
+def write_json_atomic(path, data):
+    """임시 파일에 쓴 뒤 교체하여 중간에 중단되어도 파일이 깨지지 않도록 함"""
+    # 작업자 스레드와 화면 실행이 같은 파일을 동시에 저장할 수 있으므로 임시 파일은 스레드마다 따로 사용
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class UploadJournal:
+    """업로드 하나의 체크포인트 기록"""
+
+    def __init__(self, upload_id, info, committed=0, journal_dir=JOURNAL_DIR, rows=None):
+        self.upload_id = upload_id
+        self.info = info
+        self.committed = committed  # 시트에 반영된 행 수
+        self.journal_dir = journal_dir
+        self._rows = rows  # 필요할 때 불러옴
+
+    @property
+    def data_path(self):
+        return os.path.join(self.journal_dir, f"{self.upload_id}.json")
+
+    @property
+    def rows_path(self):
+        return os.path.join(self.journal_dir, f"{self.upload_id}.rows.json")
+
+    @property
+    def log_path(self):
+        return os.path.join(self.journal_dir, f"{self.upload_id}.log")
+
+    @property
+    def total(self):
+        return self.info["total"]
+
+    @property
+    def worksheet_key(self):
+        return self.info["worksheet_key"]
+
+    @property
+    def queued(self):
+        return self.info.get("queued", False)
+
+    @property
+    def started(self):
+        """시트에 추가를 시작한 적이 있는 기록 (체크포인트를 남기기 전에 중단된 배치가 있을 수 있음)"""
+        return self.info.get("started", False)
+
+    @property
+    def rows(self):
+        """추가할 전체 행 목록"""
+        if self._rows is None:
+            with open(self.rows_path, encoding="utf-8") as f:
+                self._rows = json.load(f)
+        return self._rows
+
+    def pending_rows(self):
+        """아직 시트에 반영되지 않은 행 목록"""
+        return self.rows[self.committed:]
+
+    @classmethod
+    def start(cls, worksheet_key, kind, sheet_title, rows, journal_dir=JOURNAL_DIR, queued=False, source_key=None):
+        """
+        새 업로드 기록을 만듭니다. 같은 내용의 미완료 기록이 있으면 그 기록을 그대로 반환합니다.
+        queued: Google Sheets 장애로 바로 추가하지 못하고 대기열에 저장한 기록
+        source_key: 업로드한 파일 내용의 해시 (make_upload_id 참고)
+        """
+        upload_id = make_upload_id(worksheet_key, rows, source_key)
+        existing = cls.load(upload_id, journal_dir)
+        if existing is not None:
+            return existing
+
+        os.makedirs(journal_dir, exist_ok=True)
+        info = {
+            "upload_id": upload_id,
+            "worksheet_key": worksheet_key,
+            "kind": kind,
+            "sheet_title": sheet_title,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "total": len(rows),
+            "queued": queued,
+        }
+        journal = cls(upload_id, info, 0, journal_dir, rows)
+        # 행 목록을 먼저 기록해야 정보 파일만 남는 경우가 생기지 않음
+        write_json_atomic(journal.rows_path, rows)
+        write_json_atomic(journal.data_path, info)
+        return journal
+
+    @classmethod
+    def load(cls, upload_id, journal_dir=JOURNAL_DIR):
+        """저장된 기록을 불러옵니다. 없으면 None을 반환합니다."""
+        data_path = os.path.join(journal_dir, f"{upload_id}.json")
+        if not os.path.exists(data_path):
+            return None
+        with open(data_path, encoding="utf-8") as f:
+            info = json.load(f)
+
+        # 마지막으로 온전히 기록된 체크포인트 위치 읽기 (쓰다 만 마지막 줄은 무시)
+        committed = 0
+        log_path = os.path.join(journal_dir, f"{upload_id}.log")
+        if os.path.exists(log_path):
+            with open(log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        committed = max(committed, json.loads(line)["committed"])
+                    except (ValueError, KeyError):
+                        break
+        return cls(upload_id, info, committed, journal_dir)
+
+    def mark_started(self):
+        """첫 배치를 추가하기 전에 호출합니다."""
+        if not self.started:
+            self.info["started"] = True
+            write_json_atomic(self.data_path, self.info)
+
+    def record_commit(self, committed):
+        """배치가 시트에 반영된 직후 반영된 행 수를 기록합니다."""
+        self.committed = committed
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"committed": committed, "at": datetime.now().isoformat(timespec="seconds")}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def replace_pending_rows(self, rows):
+        """이어서 올리기 전에 확인한 결과로 남은 행 목록을 교체합니다. (이미 반영된 행은 그대로 유지)"""
+        self._rows = self.rows[:self.committed] + rows
+        self.info["total"] = len(self._rows)
+        write_json_atomic(self.rows_path, self._rows)
+        write_json_atomic(self.data_path, self.info)
+
+    def finish(self):
+        """업로드가 끝나면 기록을 삭제합니다."""
+        for path in (self.data_path, self.rows_path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def list_unfinished(worksheet_key=None, journal_dir=JOURNAL_DIR):
+    """미완료 업로드 기록 목록 (오래된 순)"""
+    if not os.path.isdir(journal_dir):
+        return []
+    journals = []
+    for name in os.listdir(journal_dir):
+        # <업로드 ID>.json 만 대상 (행 목록, 작업 상태 등 다른 파일은 제외)
+        upload_id, ext = os.path.splitext(name)
+        if ext != ".json" or "." in upload_id:
+            continue
+        try:
+            journal = UploadJournal.load(upload_id, journal_dir)
+        except (OSError, ValueError):
+            continue  # 읽을 수 없는 기록은 건너뜀
+        if journal and (worksheet_key is None or journal.worksheet_key == worksheet_key):
+            journals.append(journal)
+    return sorted(journals, key=lambda j: j.info["created_at"])
+
+
+@contextmanager
+def claim_upload(upload_id):
+    """업로드를 진행하는 동안 같은 ID의 업로드가 동시에 실행되지 않도록 점유합니다."""
+    with _active_lock:
+        if upload_id in _active_uploads:
+            raise UploadInProgressError(f"업로드 {upload_id} 가 이미 진행 중입니다.")
+        _active_uploads.add(upload_id)
+    try:
+        yield
+    finally:
+        with _active_lock:
+            _active_uploads.discard(upload_id)